@@ -0,0 +1,78 @@
+"""Общие помощники для бенчмарков.
+
+Запуск из корня репозитория: ``python -m benchmarks.<имя>``.
+"""
+import os
+import statistics
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent / 'blogicum'
+
+
+def setup():
+    sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+    os.environ.setdefault('DJANGO_DEBUG', 'False')
+    import django
+    django.setup()
+
+
+def fake_posts(count, text_words=120):
+    """Несохранённые посты со связанными объектами для рендеринга."""
+    from django.utils import timezone
+
+    from blog.models import Category, Location, Post, User
+
+    category = Category(id=1, title='День как день', slug='routine')
+    location = Location(id=1, name='Остров отчаянья')
+    now = timezone.now()
+    posts = []
+    for number in range(1, count + 1):
+        post = Post(
+            id=number,
+            title=f'Пост номер {number}',
+            text=' '.join(['слово'] * text_words),
+            pub_date=now - timedelta(hours=number),
+            author=User(id=number % 7 + 1, username=f'author{number % 7}'),
+            category=category,
+            location=location,
+        )
+        post.comment_count = number % 13
+        posts.append(post)
+    return posts
+
+
+def fake_comments(post, count):
+    from django.utils import timezone
+
+    from blog.models import Comment, User
+
+    return [
+        Comment(
+            id=number,
+            post=post,
+            author=User(id=number, username=f'reader{number}'),
+            text=f'Комментарий {number}. ' * 10,
+            created_at=timezone.now(),
+        )
+        for number in range(1, count + 1)
+    ]
+
+
+def percentile(sorted_samples, fraction):
+    return sorted_samples[round(fraction * (len(sorted_samples) - 1))]
+
+
+def summarize(samples):
+    """p50/p90/p99/среднее в миллисекундах по замерам в секундах."""
+    ordered = sorted(samples)
+    return {
+        'count': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 3),
+        'p50_ms': round(percentile(ordered, 0.5) * 1000, 3),
+        'p90_ms': round(percentile(ordered, 0.9) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 0.99) * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+    }
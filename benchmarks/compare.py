@@ -0,0 +1,42 @@
+"""Сравнение двух JSON-отчётов benchmarks.views.
+
+Запуск::
+
+    python -m benchmarks.compare before.json after.json
+"""
+import argparse
+import json
+from pathlib import Path
+
+METRICS = ('p50_ms', 'p99_ms', 'queries', 'alloc_peak_kb')
+
+
+def change(before, after):
+    if not before:
+        return '     n/a'
+    return f'{(after - before) / before * 100:+7.1f}%'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('before', type=Path)
+    parser.add_argument('after', type=Path)
+    args = parser.parse_args()
+    before = json.loads(args.before.read_text())
+    after = json.loads(args.after.read_text())
+    print(f'{before["meta"]["revision"]} -> {after["meta"]["revision"]}')
+    print(f'{"route":<28}' + ''.join(f'{name:>30}' for name in METRICS))
+    for route, new in after['routes'].items():
+        old = before['routes'].get(route)
+        if old is None:
+            print(f'{route:<28} (новый маршрут)')
+            continue
+        cells = ''.join(
+            f'{old[name]:>9} -> {new[name]:>9} {change(old[name], new[name])}'
+            for name in METRICS
+        )
+        print(f'{route:<28}{cells}')
+
+
+if __name__ == '__main__':
+    main()
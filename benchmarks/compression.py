@@ -0,0 +1,89 @@
+"""Стоимость сжатия страниц ленты и поста: время CPU и экономия байт.
+
+Запуск::
+
+    python -m benchmarks.compression [--repeat 200]
+"""
+import argparse
+import json
+import time
+
+from .common import fake_comments, fake_posts, setup
+
+
+def render_pages():
+    from django.contrib.auth.models import AnonymousUser
+    from django.core.paginator import Paginator
+    from django.template.loader import render_to_string
+    from django.test import RequestFactory
+
+    from blog.forms import CommentForm
+
+    request = RequestFactory().get('/', HTTP_HOST='localhost')
+    posts = fake_posts(100)
+    page_obj = Paginator(posts, 10).page(1)
+    pages = {}
+    request.user = AnonymousUser()
+    pages['index'] = render_to_string(
+        'blog/index.html', {'page_obj': page_obj}, request
+    )
+    post = posts[0]
+    request.user = post.author
+    pages['detail'] = render_to_string(
+        'blog/detail.html',
+        {
+            'post': post,
+            'form': CommentForm(),
+            'comments': fake_comments(post, 50),
+        },
+        request
+    )
+    return {name: html.encode() for name, html in pages.items()}
+
+
+def measure(encoder_factory, content, repeat):
+    started = time.process_time()
+    for _ in range(repeat):
+        encoder = encoder_factory()
+        compressed = encoder.compress(content) + encoder.finish()
+    elapsed = time.process_time() - started
+    return len(compressed), elapsed / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    setup()
+    from blogicum.middleware import GzipEncoder, get_available_encoders
+
+    encoders = dict(get_available_encoders())
+    encoders['gzip+breach'] = lambda: GzipEncoder(max_random_bytes=100)
+
+    results = []
+    for page, content in render_pages().items():
+        for name, factory in encoders.items():
+            size, seconds = measure(factory, content, args.repeat)
+            results.append({
+                'page': page,
+                'encoding': name,
+                'original_bytes': len(content),
+                'compressed_bytes': size,
+                'saved_percent': round(100 * (1 - size / len(content)), 1),
+                'cpu_ms': round(seconds * 1000, 3),
+            })
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+    for row in results:
+        print(
+            '{page:<8} {encoding:<12} {original_bytes:>8} -> '
+            '{compressed_bytes:>7} B ({saved_percent:>5}% saved) '
+            '{cpu_ms:>8} ms CPU'.format(**row)
+        )
+
+
+if __name__ == '__main__':
+    main()
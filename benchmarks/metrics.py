@@ -0,0 +1,111 @@
+"""Накладные расходы MetricsMiddleware на запрос.
+
+Сравнивает задержку запросов без метрик, с метриками без замера
+рендеринга (METRICS_RENDER_SAMPLE_RATE=0) и с замером рендеринга
+каждого шаблона и тега в каждом запросе (rate=1). Страница поста
+запрашивается вошедшим автором: анонимам она отдаётся из кеша.
+
+Запуск::
+
+    python -m benchmarks.metrics [--requests 500] [--posts 200]
+"""
+import argparse
+import json
+import os
+import time
+
+from .common import setup, summarize
+from .views import DATA_DIR
+
+MODES = {
+    'off': {'METRICS_ENABLED': False},
+    'requests': {'METRICS_ENABLED': True, 'METRICS_RENDER_SAMPLE_RATE': 0},
+    'render': {'METRICS_ENABLED': True, 'METRICS_RENDER_SAMPLE_RATE': 1},
+}
+
+
+ROUNDS = 6
+WARMUP_REQUESTS = 50
+
+
+def measure(client, url, requests, samples):
+    for _ in range(requests):
+        started = time.perf_counter()
+        client.get(url)
+        samples.append(time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--posts', type=int, default=200)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    os.environ['DJANGO_DB_NAME'] = str(
+        DATA_DIR / f'metrics-{args.posts}.sqlite3'
+    )
+    setup()
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.test import Client, override_settings
+
+    from blog.datagen import DatasetSpec, generate
+    from blog.models import Post
+    from blog.utils import get_published_posts
+
+    call_command('migrate', verbosity=0)
+    if not Post.objects.exists():
+        generate(DatasetSpec(
+            posts=args.posts, comments=args.posts * 5, users=20,
+            categories=5, locations=5,
+        ))
+    post = get_published_posts().order_by('-comment_count').first()
+    urls = {
+        'rules': '/pages/rules/',
+        'post_detail': f'/posts/{post.id}/',
+    }
+    clients = {}
+    for mode, overrides in MODES.items():
+        # У каждого режима свой клиент: middleware загружается один раз
+        # на обработчик, при первом запросе.
+        with override_settings(**overrides):
+            client = clients[mode] = Client(
+                HTTP_HOST=settings.ALLOWED_HOSTS[0]
+            )
+            client.force_login(post.author)
+            for url in urls.values():
+                measure(client, url, WARMUP_REQUESTS, [])
+    # Режимы чередуются, и каждый раунд начинается со следующего, чтобы
+    # дрейф машины и первый запрос раунда не достались одному режиму.
+    samples = {mode: {name: [] for name in urls} for mode in MODES}
+    modes = list(MODES)
+    for number in range(ROUNDS):
+        for mode in modes[number % len(modes):] + modes[:number % len(modes)]:
+            with override_settings(**MODES[mode]):
+                for name, url in urls.items():
+                    measure(
+                        clients[mode], url, args.requests // ROUNDS,
+                        samples[mode][name],
+                    )
+    results = {
+        mode: {name: summarize(values) for name, values in names.items()}
+        for mode, names in samples.items()
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for name in urls:
+        base = results['off'][name]['p50_ms']
+        for mode, result in results.items():
+            timing = result[name]
+            print(
+                f'{name:<12} {mode:<9} p50 {timing["p50_ms"]:7.3f} ms  '
+                f'p99 {timing["p99_ms"]:7.3f} ms  '
+                f'overhead {timing["p50_ms"] - base:+7.3f} ms'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Время рендеринга includes/paginator.html на больших лентах.
+
+Сравнивает окно страниц (get_elided_page_range) с прежним выводом
+всех номеров из page_range.
+
+    python -m benchmarks.paginator [--sizes 1000 100000 1000000]
+"""
+import argparse
+import json
+import time
+
+from .common import setup
+
+LEGACY_TEMPLATE = """
+{% for i in page_obj.paginator.page_range %}
+  {% if page_obj.number == i %}
+    <li class="page-item active"><span class="page-link">{{ i }}</span></li>
+  {% else %}
+    <li class="page-item">
+      <a class="page-link" href="?page={{ i }}">{{ i }}</a>
+    </li>
+  {% endif %}
+{% endfor %}
+"""
+
+
+def measure(template, context, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        html = template.render(context)
+    elapsed = time.perf_counter() - started
+    return len(html.encode()), elapsed / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[1000, 100000, 1000000]
+    )
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    setup()
+    from django.conf import settings
+    from django.core.paginator import Paginator
+    from django.template import engines
+    from django.template.loader import get_template
+
+    engine = engines['django']
+    templates = {
+        'elided': get_template('includes/paginator.html'),
+        'legacy': engine.from_string(LEGACY_TEMPLATE),
+    }
+    results = []
+    for posts in args.sizes:
+        paginator = Paginator(range(posts), settings.PAGINATION_COUNT)
+        page_obj = paginator.page(paginator.num_pages // 2)
+        for name, template in templates.items():
+            size, seconds = measure(
+                template, {'page_obj': page_obj}, args.repeat
+            )
+            results.append({
+                'posts': posts,
+                'template': name,
+                'bytes': size,
+                'render_ms': round(seconds * 1000, 3),
+            })
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for row in results:
+        print(
+            '{posts:>8} posts {template:<7} {bytes:>10} B '
+            '{render_ms:>10} ms'.format(**row)
+        )
+
+
+if __name__ == '__main__':
+    main()
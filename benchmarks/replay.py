@@ -0,0 +1,218 @@
+"""Воспроизведение журнала доступа против локальной копии блога.
+
+Разбирает журнал в формате common или combined, оставляет GET-запросы
+к маршрутам blog и pages и повторяет их в N параллельных клиентах
+с исходными интервалами, ускоренными в --speed раз (0 — без пауз).
+Ответ сверяется со статусом из журнала (304 считается за 200).
+Результат — распределение задержек по маршрутам и самые медленные
+адреса::
+
+    python -m benchmarks.replay access.log --snapshot blog.jsonl.gz --speed 10
+
+Снимок из dump_blog загружается один раз в benchmarks/.data.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from collections import Counter, defaultdict
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from .common import setup
+
+DATA_DIR = Path(__file__).resolve().parent / '.data'
+NAMESPACES = ('blog', 'pages')
+LOG_LINE = re.compile(
+    r'^(?P<host>\S+) \S+ \S+ \[(?P<time>[^\]]+)\] '
+    r'"(?P<method>[A-Z]+) (?P<target>\S+)[^"]*" (?P<status>\d{3}) \S+'
+)
+LOG_TIME_FORMAT = '%d/%b/%Y:%H:%M:%S %z'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('log', type=Path)
+    parser.add_argument('--snapshot', type=Path, default=None,
+                        help='Обезличенный снимок dump_blog.')
+    parser.add_argument('--db', type=Path, default=None)
+    parser.add_argument('--url', default=None,
+                        help='Адрес запущенного сервера вместо встроенного.')
+    parser.add_argument('--speed', type=float, default=1,
+                        help='Ускорение исходных интервалов; 0 — без пауз.')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--limit', type=int, default=None,
+                        help='Воспроизвести не больше стольких запросов.')
+    parser.add_argument('--slowest', type=int, default=20)
+    parser.add_argument('--output', type=Path, default=None)
+    args = parser.parse_args()
+    if args.db is None:
+        name = args.snapshot.name.split('.')[0] if args.snapshot else 'blog'
+        args.db = DATA_DIR / f'replay-{name}.sqlite3'
+    return args
+
+
+def prepare_database(snapshot):
+    from django.core.management import call_command
+
+    from blog.models import Post
+    from blog.snapshot import load, open_snapshot
+
+    call_command('migrate', verbosity=0)
+    if snapshot is None or Post.objects.exists():
+        return
+    with open_snapshot(snapshot, 'r') as stream:
+        counts = load(stream)
+    print(f'Снимок загружен: {counts}')
+
+
+def parse_log(lines):
+    """Пары (время, метод, путь с запросом, статус) из строк журнала."""
+    for line in lines:
+        match = LOG_LINE.match(line)
+        if match is None:
+            continue
+        target = urlsplit(match['target'])
+        path = target.path + (f'?{target.query}' if target.query else '')
+        yield (
+            datetime.strptime(match['time'], LOG_TIME_FORMAT),
+            match['method'],
+            path,
+            int(match['status']),
+        )
+
+
+def route_name(path):
+    """Имя маршрута blog или pages для пути или None."""
+    from django.urls import Resolver404, resolve
+
+    try:
+        match = resolve(urlsplit(path).path)
+    except Resolver404:
+        return None
+    return match.view_name if match.namespace in NAMESPACES else None
+
+
+def replay_jobs(entries, speed, limit, skipped):
+    """Задания loadgen из записей журнала; пропуски считаются в skipped."""
+    from blog.loadgen import Job
+
+    first = None
+    replayed = 0
+    for logged_at, method, path, status in entries:
+        if limit is not None and replayed >= limit:
+            return
+        if method != 'GET':
+            skipped['не GET'] += 1
+            continue
+        route = route_name(path)
+        if route is None:
+            skipped['вне blog и pages'] += 1
+            continue
+        if first is None:
+            first = logged_at
+        replayed += 1
+        yield Job(
+            route,
+            path,
+            due=(
+                (logged_at - first).total_seconds() / speed if speed else None
+            ),
+            expect=200 if status == 304 else status,
+        )
+
+
+def slowest_samples(samples, limit):
+    return [
+        {
+            'route': sample.route,
+            'path': sample.path,
+            'status': sample.status,
+            'latency_ms': round(sample.latency * 1000, 2),
+        }
+        for sample in sorted(
+            samples, key=lambda sample: sample.latency, reverse=True
+        )[:limit]
+    ]
+
+
+def main():
+    args = parse_args()
+    args.db.parent.mkdir(parents=True, exist_ok=True)
+    os.environ['DJANGO_DB_NAME'] = str(args.db)
+    setup()
+    from blog.loadgen import Runner, start_server, summarize
+
+    prepare_database(args.snapshot)
+    server = None
+    base_url = args.url
+    if base_url is None:
+        server = start_server()
+        host, port = server.server_address[:2]
+        base_url = f'http://{host}:{port}'
+    skipped = Counter()
+    with open(args.log, encoding='utf-8', errors='replace') as lines:
+        runner = Runner(
+            base_url,
+            replay_jobs(parse_log(lines), args.speed, args.limit, skipped),
+            concurrency=args.concurrency,
+        )
+        try:
+            samples = runner.run()
+        finally:
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+    if not samples:
+        sys.exit('В журнале нет запросов к маршрутам blog и pages.')
+
+    routes = summarize(samples, runner.elapsed)
+    statuses = defaultdict(Counter)
+    for sample in samples:
+        statuses[sample.route][sample.status] += 1
+    total = routes.pop('total')
+    routes = dict(sorted(
+        routes.items(), key=lambda item: item[1]['p99_ms'], reverse=True
+    ))
+    for route, result in routes.items():
+        result['statuses'] = dict(statuses[route])
+    routes['total'] = total
+    for route, result in routes.items():
+        print(
+            f'{route:<22} {result["count"]:7} '
+            f'несовпадений {result["errors"]:5}  '
+            f'p50 {result["p50_ms"]:8.2f} ms  p90 {result["p90_ms"]:8.2f} ms'
+            f'  p99 {result["p99_ms"]:8.2f} ms  max {result["max_ms"]:8.2f} ms'
+        )
+    slowest = slowest_samples(samples, args.slowest)
+    print('\nСамые медленные адреса:')
+    for sample in slowest:
+        print(
+            f'{sample["latency_ms"]:9.2f} ms  {sample["status"]}  '
+            f'{sample["path"]}'
+        )
+    if skipped:
+        print('\nПропущено: ' + ', '.join(
+            f'{reason} {count}' for reason, count in skipped.items()
+        ))
+    if args.output:
+        args.output.write_text(json.dumps({
+            'meta': {
+                'log': str(args.log),
+                'speed': args.speed,
+                'concurrency': args.concurrency,
+                'elapsed': round(runner.elapsed, 3),
+                'skipped': dict(skipped),
+            },
+            'routes': routes,
+            'slowest': slowest,
+        }, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
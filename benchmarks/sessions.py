@@ -0,0 +1,88 @@
+"""Накладные расходы аутентифицированного запроса при разных SESSION_MODE.
+
+Для каждого режима хранения сессий измеряет задержку запроса вошедшего
+пользователя, число запросов к БД и из них — к django_session, а также
+разницу с анонимным запросом той же страницы.
+
+Запуск::
+
+    python -m benchmarks.sessions [--requests 500] [--url /pages/rules/]
+"""
+import argparse
+import json
+import os
+import time
+
+from .common import setup, summarize
+from .views import DATA_DIR
+
+
+def measure(client, url, requests):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    for _ in range(3):
+        client.get(url)
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        client.get(url)
+        samples.append(time.perf_counter() - started)
+    with CaptureQueriesContext(connection) as queries:
+        client.get(url)
+    return {
+        'queries': len(queries),
+        'session_queries': sum(
+            'django_session' in query['sql'] for query in queries
+        ),
+        **summarize(samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--url', default='/pages/rules/')
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    os.environ['DJANGO_DB_NAME'] = str(DATA_DIR / 'sessions.sqlite3')
+    setup()
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.test import Client, override_settings
+
+    from blog.models import User
+
+    call_command('migrate', verbosity=0)
+    user, _ = User.objects.get_or_create(username='session-bench')
+    host = settings.ALLOWED_HOSTS[0]
+    anonymous = measure(Client(HTTP_HOST=host), args.url, args.requests)
+    results = {'anonymous': anonymous}
+    for mode, engine in settings.SESSION_ENGINES.items():
+        # Клиент создаётся заново: SessionMiddleware читает движок
+        # при загрузке middleware.
+        with override_settings(SESSION_ENGINE=engine):
+            client = Client(HTTP_HOST=host)
+            client.force_login(user)
+            result = measure(client, args.url, args.requests)
+        result['overhead_p50_ms'] = round(
+            result['p50_ms'] - anonymous['p50_ms'], 3
+        )
+        results[mode] = result
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for mode, result in results.items():
+        print(
+            f'{mode:<16} p50 {result["p50_ms"]:7.3f} ms  '
+            f'p99 {result["p99_ms"]:7.3f} ms  '
+            f'overhead {result.get("overhead_p50_ms", 0):7.3f} ms  '
+            f'queries {result["queries"]}  '
+            f'session {result["session_queries"]}'
+        )
+
+
+if __name__ == '__main__':
+    main()
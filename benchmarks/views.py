@@ -0,0 +1,218 @@
+"""Бенчмарк всех маршрутов blog.urls и pages.urls на синтетических данных.
+
+Для каждого маршрута измеряет перцентили задержки, число запросов к БД
+и пик выделенной памяти, результат сохраняет в JSON::
+
+    python -m benchmarks.views --posts 10000 --output before.json
+    python -m benchmarks.compare before.json after.json
+
+База данных создаётся один раз в benchmarks/.data и переиспользуется
+для того же размера набора данных.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from pathlib import Path
+
+from .common import setup, summarize
+
+DATA_DIR = Path(__file__).resolve().parent / '.data'
+NAMESPACES = ('blog', 'pages')
+ROUTE_CLIENTS = {
+    'blog:create_post': 'author',
+    'blog:edit_profile': 'author',
+    'blog:edit_post': 'author',
+    'blog:delete_post': 'author',
+    'blog:add_comment': 'author',
+    'blog:edit_comment': 'commenter',
+    'blog:delete_comment': 'commenter',
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=10000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--categories', type=int, default=50)
+    parser.add_argument('--locations', type=int, default=200)
+    parser.add_argument('--comments', type=int, default=None,
+                        help='По умолчанию — пять на пост.')
+    parser.add_argument('--comment-skew', type=float, default=1.1)
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--db', type=Path, default=None)
+    parser.add_argument('--output', type=Path, default=None)
+    args = parser.parse_args()
+    if args.comments is None:
+        args.comments = args.posts * 5
+    if args.db is None:
+        args.db = DATA_DIR / (
+            f'bench-{args.posts}-{args.comments}-{args.users}-'
+            f'{args.categories}-{args.locations}.sqlite3'
+        )
+    return args
+
+
+def prepare_database(args):
+    from django.core.management import call_command
+
+    from blog.datagen import DatasetSpec, generate
+    from blog.models import Post
+
+    call_command('migrate', verbosity=0)
+    if Post.objects.exists():
+        return
+    started = time.perf_counter()
+    counts = generate(DatasetSpec(
+        posts=args.posts,
+        users=args.users,
+        categories=args.categories,
+        locations=args.locations,
+        comments=args.comments,
+        comment_skew=args.comment_skew,
+    ))
+    print(f'Данные сгенерированы за {time.perf_counter() - started:.1f} с:'
+          f' {counts}')
+
+
+def pick_objects():
+    """Самый обсуждаемый опубликованный пост, его автор и комментатор."""
+    from blog.models import Comment
+    from blog.utils import get_published_posts
+
+    post = get_published_posts().order_by('-comment_count').first()
+    comment = Comment.objects.filter(post=post).select_related(
+        'author'
+    ).first()
+    return post, comment
+
+
+def build_routes(post, comment):
+    from django.urls import URLResolver, get_resolver, reverse
+
+    values = {
+        'post_id': post.id,
+        'comment_id': comment.id,
+        'category_slug': post.category.slug,
+        'profile': post.author.username,
+    }
+    routes = []
+    for namespace in NAMESPACES:
+        resolver = get_resolver().namespace_dict[namespace][1]
+        for pattern in resolver.url_patterns:
+            if isinstance(pattern, URLResolver):
+                continue
+            name = f'{namespace}:{pattern.name}'
+            kwargs = {
+                key: values[key] for key in pattern.pattern.converters
+            }
+            routes.append((
+                name,
+                reverse(name, kwargs=kwargs),
+                ROUTE_CLIENTS.get(name, 'anonymous'),
+            ))
+    return routes
+
+
+def measure_route(client, url, requests):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    for _ in range(3):
+        response = client.get(url)
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        client.get(url)
+        samples.append(time.perf_counter() - started)
+    with CaptureQueriesContext(connection) as queries:
+        client.get(url)
+    # Следующий запрос очистит connection.queries через request_started.
+    query_count = len(queries)
+    tracemalloc.start()
+    client.get(url)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'url': url,
+        'status': response.status_code,
+        'queries': query_count,
+        'alloc_peak_kb': round(peak / 1024, 1),
+        **summarize(samples),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    args = parse_args()
+    args.db.parent.mkdir(parents=True, exist_ok=True)
+    os.environ['DJANGO_DB_NAME'] = str(args.db)
+    setup()
+    from django.conf import settings
+    from django.core.paginator import Paginator
+    from django.test import Client
+
+    from blog.utils import get_published_posts
+
+    prepare_database(args)
+    post, comment = pick_objects()
+    clients = {
+        'anonymous': Client(HTTP_HOST=settings.ALLOWED_HOSTS[0]),
+        'author': Client(HTTP_HOST=settings.ALLOWED_HOSTS[0]),
+        'commenter': Client(HTTP_HOST=settings.ALLOWED_HOSTS[0]),
+    }
+    clients['author'].force_login(post.author)
+    clients['commenter'].force_login(comment.author)
+
+    routes = build_routes(post, comment)
+    last_page = Paginator(
+        get_published_posts(), settings.PAGINATION_COUNT
+    ).num_pages
+    routes.append((
+        'blog:index (deep page)',
+        f'/?page={max(last_page // 2, 1)}',
+        'anonymous'
+    ))
+
+    results = {}
+    for name, url, client_name in routes:
+        result = measure_route(clients[client_name], url, args.requests)
+        result['client'] = client_name
+        results[name] = result
+        print(
+            f'{name:<28} {result["status"]} '
+            f'p50 {result["p50_ms"]:8.2f} ms  p99 {result["p99_ms"]:8.2f} ms'
+            f'  queries {result["queries"]:3}'
+            f'  alloc {result["alloc_peak_kb"]:9.1f} KB'
+        )
+
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'posts': args.posts,
+            'comments': args.comments,
+            'users': args.users,
+            'categories': args.categories,
+            'locations': args.locations,
+            'requests': args.requests,
+        },
+        'routes': results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
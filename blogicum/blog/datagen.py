@@ -0,0 +1,275 @@
+"""Генерация синтетических данных блога для бенчмарков.
+
+Объекты создаются с заранее назначенными id, поэтому комментарии
+ссылаются на посты без дополнительных запросов, а пачки можно строить
+и записывать параллельно в нескольких процессах; после вставки
+последовательности первичных ключей сдвигаются за новые строки.
+Имена пользователей и слаги категорий получают суффикс запуска, чтобы
+не совпасть с уже существующими. Число комментариев к посту
+распределено по степенному закону: немногие популярные посты собирают
+большую часть обсуждений.
+"""
+import math
+import multiprocessing
+import random
+import secrets
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import Category, Comment, Location, Post, User
+from .postcache import forget_posts
+from .snapshot import reset_sequences
+
+DEFAULT_PASSWORD = 'password'
+HISTORY_DAYS = 3 * 365
+FUTURE_DAYS = 30
+SQLITE_BUSY_TIMEOUT = 120
+WORDS = (
+    'утро день вечер молоко кот дождь поезд остров море лес город книга '
+    'кофе письмо звезда ветер дорога дом сад окно'
+).split()
+
+
+@dataclass
+class DatasetSpec:
+    posts: int = 10000
+    users: int = 1000
+    categories: int = 50
+    locations: int = 200
+    comments: int = 50000
+    comment_skew: float = 1.1
+    unpublished_ratio: float = 0.05
+    future_ratio: float = 0.02
+    unpublished_category_ratio: float = 0.1
+    seed: int = 0
+
+
+@dataclass
+class Plan:
+    """Спецификация и первые свободные id каждой таблицы."""
+
+    spec: DatasetSpec
+    first_ids: dict
+    password_hash: str
+    now: datetime
+    run: str
+
+    def ids(self, kind):
+        first = self.first_ids[kind]
+        return range(first, first + getattr(self.spec, kind))
+
+
+def text(rng, words):
+    return ' '.join(rng.choices(WORDS, k=words))
+
+
+def next_id(model):
+    return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+
+def power_law_index(rng, size, skew):
+    """Ранг от 0 до size - 1 с вероятностью, убывающей как 1 / ранг^skew.
+
+    Обратное преобразование непрерывного распределения не требует
+    таблицы весов, поэтому память не зависит от числа постов.
+    """
+    u = rng.random()
+    if skew == 1:
+        rank = size ** u
+    else:
+        rank = ((size ** (1 - skew) - 1) * u + 1) ** (1 / (1 - skew))
+    return min(int(rank) - 1, size - 1)
+
+
+def scramble(index, size):
+    """Перестановка рангов, чтобы популярные посты не шли подряд."""
+    step = 2654435761 % size or 1
+    while math.gcd(step, size) != 1:
+        step += 1
+    return index * step % size
+
+
+def make_users(plan, ids, rng):
+    for user_id in ids:
+        yield User(
+            id=user_id,
+            username=f'user{user_id}-{plan.run}',
+            email=f'user{user_id}-{plan.run}@example.com',
+            password=plan.password_hash,
+        )
+
+
+def make_categories(plan, ids, rng):
+    for category_id in ids:
+        yield Category(
+            id=category_id,
+            title=f'Категория {category_id}',
+            description=text(rng, 20),
+            slug=f'category-{category_id}-{plan.run}',
+            is_published=(
+                rng.random() >= plan.spec.unpublished_category_ratio
+            ),
+        )
+
+
+def make_locations(plan, ids, rng):
+    for location_id in ids:
+        yield Location(
+            id=location_id,
+            name=f'Место {location_id}',
+            is_published=rng.random() >= 0.1,
+        )
+
+
+def make_posts(plan, ids, rng):
+    user_ids = plan.ids('users')
+    category_ids = plan.ids('categories')
+    location_ids = plan.ids('locations')
+    for post_id in ids:
+        if rng.random() < plan.spec.future_ratio:
+            pub_date = plan.now + timedelta(
+                minutes=rng.randint(1, FUTURE_DAYS * 1440)
+            )
+        else:
+            pub_date = plan.now - timedelta(
+                minutes=rng.randint(1, HISTORY_DAYS * 1440)
+            )
+        yield Post(
+            id=post_id,
+            title=text(rng, 4).capitalize(),
+            text=text(rng, rng.randint(30, 300)),
+            pub_date=pub_date,
+            author_id=rng.choice(user_ids),
+            category_id=rng.choice(category_ids),
+            location_id=(
+                rng.choice(location_ids) if rng.random() < 0.7 else None
+            ),
+            is_published=rng.random() >= plan.spec.unpublished_ratio,
+        )
+
+
+def make_comments(plan, ids, rng):
+    post_ids = plan.ids('posts')
+    user_ids = plan.ids('users')
+    for comment_id in ids:
+        rank = power_law_index(rng, len(post_ids), plan.spec.comment_skew)
+        yield Comment(
+            id=comment_id,
+            text=text(rng, rng.randint(3, 40)),
+            post_id=post_ids[scramble(rank, len(post_ids))],
+            author_id=rng.choice(user_ids),
+        )
+
+
+# Порядок важен: так удовлетворяются внешние ключи.
+TABLES = {
+    'users': (User, make_users),
+    'categories': (Category, make_categories),
+    'locations': (Location, make_locations),
+    'posts': (Post, make_posts),
+    'comments': (Comment, make_comments),
+}
+
+
+def insert_rows(model, objects):
+    """Записывает объекты одной транзакцией.
+
+    На SQLite значения готовятся полями модели и вставляются одним
+    executemany, минуя построение запросов bulk_create.
+    """
+    connection = connections[DEFAULT_DB_ALIAS]
+    if connection.vendor != 'sqlite':
+        model.objects.bulk_create(objects)
+        return
+    fields = model._meta.concrete_fields
+    rows = [
+        tuple(
+            field.get_db_prep_save(field.pre_save(obj, True), connection)
+            for field in fields
+        )
+        for obj in objects
+    ]
+    quote = connection.ops.quote_name
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote(model._meta.db_table),
+        ', '.join(quote(field.column) for field in fields),
+        ', '.join(['%s'] * len(fields)),
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+
+
+def write_chunk(plan, kind, start, count):
+    model, make = TABLES[kind]
+    rng = random.Random(f'{plan.spec.seed}-{kind}-{start}')
+    objects = list(make(plan, range(start, start + count), rng))
+    with transaction.atomic():
+        insert_rows(model, objects)
+    return count
+
+
+def _write_task(task):
+    return write_chunk(*task)
+
+
+def _init_worker():
+    django.setup()
+    connection = connections[DEFAULT_DB_ALIAS]
+    if connection.vendor == 'sqlite':
+        connection.settings_dict['OPTIONS']['timeout'] = SQLITE_BUSY_TIMEOUT
+
+
+def make_plan(spec):
+    return Plan(
+        spec=spec,
+        first_ids={
+            kind: next_id(model) for kind, (model, _) in TABLES.items()
+        },
+        password_hash=make_password(DEFAULT_PASSWORD),
+        now=timezone.now(),
+        run=secrets.token_hex(3),
+    )
+
+
+def generate(spec, batch_size=5000, workers=1, progress=None):
+    """Добавляет в БД данные по спецификации и возвращает их количество.
+
+    С workers > 1 пачки строятся и записываются в отдельных процессах;
+    таблицы заполняются по очереди, чтобы внешние ключи были валидны.
+    """
+    plan = make_plan(spec)
+    counts = {}
+    pool = None
+    if workers > 1:
+        connections.close_all()
+        pool = multiprocessing.Pool(workers, initializer=_init_worker)
+    try:
+        for kind in TABLES:
+            ids = plan.ids(kind)
+            tasks = [
+                (plan, kind, start, min(batch_size, ids.stop - start))
+                for start in range(ids.start, ids.stop, batch_size)
+            ]
+            results = (
+                pool.imap_unordered(_write_task, tasks) if pool
+                else map(_write_task, tasks)
+            )
+            counts[kind] = 0
+            for written in results:
+                counts[kind] += written
+                if progress:
+                    progress(kind, counts[kind], len(ids))
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+    reset_sequences([model for model, _ in TABLES.values()], DEFAULT_DB_ALIAS)
+    # Строки записаны в обход сигналов моделей.
+    forget_posts()
+    return counts
@@ -0,0 +1,398 @@
+"""Нагрузочное тестирование блога без внешних инструментов.
+
+Приложение запускается в этом же процессе на многопоточном WSGI-сервере
+Django (или берётся уже запущенный сервер по адресу), а клиенты — потоки
+с постоянными соединениями http.client — выполняют задания из общего
+источника. У задания может быть плановое время: тогда нагрузка открытая,
+и задержка считается от планового времени, а не от фактической
+отправки, чтобы очередь к перегруженному серверу не пряталась
+в паузах клиентов. Без планового времени каждый клиент шлёт следующий
+запрос сразу после ответа.
+"""
+import http.client
+import itertools
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.core.wsgi import get_wsgi_application
+from django.db.models import Count
+from django.urls import reverse
+from django.utils import timezone
+
+from .datagen import DEFAULT_PASSWORD
+from .models import Category, Post, User
+from .utils import get_published_posts
+
+DEFAULT_MIX = {
+    'feed': 40,
+    'post_detail': 25,
+    'category': 10,
+    'profile': 10,
+    'comment': 10,
+    'edit_post': 5,
+}
+SAMPLE_LIMIT = 1000
+
+
+class LoadError(Exception):
+    pass
+
+
+@dataclass
+class Job:
+    route: str
+    path: str
+    method: str = 'GET'
+    form: dict = None
+    auth: bool = False
+    # Секунды от начала прогона; None — отправить сразу.
+    due: float = None
+    # Ожидаемый статус, например из журнала доступа.
+    expect: int = None
+
+    def succeeded(self, status, location):
+        """GET отдаёт страницу, POST — перенаправление не на вход."""
+        if self.expect is not None:
+            return status == self.expect
+        if self.method != 'POST':
+            return status == 200
+        return status == 302 and not (location or '').startswith(
+            settings.LOGIN_URL
+        )
+
+
+@dataclass
+class Sample:
+    route: str
+    path: str
+    status: int
+    ok: bool
+    latency: float
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(host='127.0.0.1', port=0):
+    """Многопоточный WSGI-сервер приложения в фоновом потоке."""
+    server = ThreadedWSGIServer((host, port), QuietRequestHandler)
+    server.set_app(get_wsgi_application())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+class Session:
+    """Постоянное соединение с сервером и cookies одного клиента."""
+
+    def __init__(self, base_url, timeout=30):
+        url = urlsplit(base_url)
+        self.host = url.hostname
+        self.port = url.port
+        self.timeout = timeout
+        self.cookies = SimpleCookie()
+        self.connection = None
+
+    def connect(self):
+        self.connection = http.client.HTTPConnection(
+            self.host, self.port, timeout=self.timeout
+        )
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def request(self, method, path, form=None):
+        """Выполняет запрос и возвращает (статус, Location, тело)."""
+        headers = {}
+        body = None
+        if form is not None:
+            form = {'csrfmiddlewaretoken': self.csrf_token(), **form}
+            body = urlencode(form)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        if self.cookies:
+            headers['Cookie'] = '; '.join(
+                f'{name}={morsel.value}'
+                for name, morsel in self.cookies.items()
+            )
+        # Сервер мог закрыть простаивающее соединение: одна повторная
+        # попытка на новом.
+        for attempt in (1, 2):
+            if self.connection is None:
+                self.connect()
+            try:
+                self.connection.request(method, path, body, headers)
+                response = self.connection.getresponse()
+                content = response.read()
+                break
+            except (ConnectionError, http.client.HTTPException):
+                self.close()
+                if attempt == 2:
+                    raise
+        for header in response.headers.get_all('Set-Cookie') or ():
+            self.cookies.load(header)
+        if response.will_close:
+            self.close()
+        return response.status, response.getheader('Location'), content
+
+    def csrf_token(self):
+        morsel = self.cookies.get(settings.CSRF_COOKIE_NAME)
+        return morsel.value if morsel else ''
+
+    def login(self, username, password):
+        """Входит через форму; её страница выставляет cookie CSRF."""
+        path = reverse('login')
+        status, _, _ = self.request('GET', path)
+        if status != 200:
+            raise LoadError(f'Форма входа недоступна: {status}')
+        status, _, _ = self.request('POST', path, {
+            'username': username, 'password': password
+        })
+        if status != 302 or settings.SESSION_COOKIE_NAME not in self.cookies:
+            raise LoadError(f'Не удалось войти как {username}: {status}')
+
+
+@dataclass
+class Account:
+    username: str
+    password: str
+    # Пары (id поста, данные формы редактирования).
+    posts: list = field(default_factory=list)
+
+
+@dataclass
+class Targets:
+    """Опубликованные объекты, к которым обращается смесь маршрутов."""
+
+    posts: list
+    categories: list
+    authors: list
+    pages: int
+    accounts: list
+
+
+def discover(users=8, password=DEFAULT_PASSWORD, sample=SAMPLE_LIMIT):
+    """Выбирает объекты для запросов и авторов для входа из текущей БД."""
+    published = get_published_posts()
+    posts = list(published.values_list('id', flat=True)[:sample])
+    if not posts:
+        raise LoadError('В БД нет опубликованных постов.')
+    accounts = [
+        Account(user.username, password)
+        for user in User.objects.annotate(
+            post_count=Count('posts')
+        ).filter(post_count__gt=0).order_by('-post_count')[:users]
+    ]
+    own_posts = Post.objects.filter(
+        author__username__in=[account.username for account in accounts]
+    ).select_related('author').order_by('-pub_date')
+    by_username = {account.username: account for account in accounts}
+    for post in own_posts[:sample]:
+        form = {
+            'title': post.title,
+            'pub_date': timezone.localtime(post.pub_date).strftime(
+                '%Y-%m-%d %H:%M:%S'
+            ),
+            'category': post.category_id,
+            'location': post.location_id or '',
+        }
+        if post.is_published:
+            form['is_published'] = 'on'
+        by_username[post.author.username].posts.append((post.id, form))
+    return Targets(
+        posts=posts,
+        categories=list(Category.objects.filter(
+            is_published=True
+        ).values_list('slug', flat=True)[:sample]),
+        authors=list(published.order_by().values_list(
+            'author__username', flat=True
+        ).distinct()[:sample]),
+        pages=Paginator(
+            published.values('pk'), settings.PAGINATION_COUNT
+        ).num_pages,
+        accounts=accounts,
+    )
+
+
+def make_job(route, targets, account, rng):
+    """Задание маршрута смеси; None, если для него нет данных."""
+    if route == 'feed':
+        page = min(int(rng.expovariate(0.3)) + 1, targets.pages)
+        path = reverse('blog:index')
+        return Job(route, path if page == 1 else f'{path}?page={page}')
+    if route == 'post_detail':
+        return Job(route, reverse('blog:post_detail', args=[
+            rng.choice(targets.posts)
+        ]))
+    if route == 'category' and targets.categories:
+        return Job(route, reverse('blog:category_posts', args=[
+            rng.choice(targets.categories)
+        ]))
+    if route == 'profile' and targets.authors:
+        return Job(route, reverse('blog:profile', args=[
+            rng.choice(targets.authors)
+        ]))
+    if route == 'comment' and account is not None:
+        return Job(
+            route,
+            reverse('blog:add_comment', args=[rng.choice(targets.posts)]),
+            method='POST',
+            form={'text': f'Нагрузочный комментарий {rng.random():.6f}'},
+            auth=True,
+        )
+    if route == 'edit_post' and account is not None and account.posts:
+        post_id, form = rng.choice(account.posts)
+        return Job(
+            route,
+            reverse('blog:edit_post', args=[post_id]),
+            method='POST',
+            form={**form, 'text': f'Отредактировано {rng.random():.6f}'},
+            auth=True,
+        )
+    return None
+
+
+def mix_jobs(targets, mix, rate=0, duration=None, requests=None, seed=0):
+    """Бесконечная смесь заданий, обрезанная по времени или числу.
+
+    С rate > 0 задания получают плановое время с равным интервалом.
+    """
+    rng = random.Random(seed)
+    routes = list(mix)
+    weights = [mix[route] for route in routes]
+    accounts = itertools.cycle(targets.accounts or [None])
+    started = time.monotonic()
+    for number in itertools.count():
+        if requests is not None and number >= requests:
+            return
+        due = number / rate if rate else None
+        elapsed = due if due is not None else time.monotonic() - started
+        if duration is not None and elapsed >= duration:
+            return
+        job = make_job(
+            rng.choices(routes, weights)[0], targets, next(accounts), rng
+        )
+        if job is not None:
+            job.due = due
+            yield job
+
+
+class Runner:
+    """Раздаёт задания клиентам-потокам и собирает замеры."""
+
+    def __init__(self, base_url, jobs, concurrency=8, accounts=()):
+        self.base_url = base_url
+        self.jobs = iter(jobs)
+        self.concurrency = concurrency
+        self.accounts = list(accounts)
+        self.lock = threading.Lock()
+        self.samples = []
+        self.started = None
+        self.elapsed = None
+
+    def next_job(self):
+        with self.lock:
+            return next(self.jobs, None)
+
+    def login_sessions(self):
+        sessions = []
+        for number in range(self.concurrency):
+            session = None
+            if self.accounts:
+                account = self.accounts[number % len(self.accounts)]
+                session = Session(self.base_url)
+                session.login(account.username, account.password)
+            sessions.append(session)
+        return sessions
+
+    def run(self):
+        auth_sessions = self.login_sessions()
+        threads = [
+            threading.Thread(
+                target=self.work, args=(Session(self.base_url), auth_session)
+            )
+            for auth_session in auth_sessions
+        ]
+        self.started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.elapsed = time.monotonic() - self.started
+        return self.samples
+
+    def work(self, session, auth_session):
+        samples = []
+        while True:
+            job = self.next_job()
+            if job is None:
+                break
+            if job.due is not None:
+                delay = self.started + job.due - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                sent = self.started + job.due
+            else:
+                sent = time.monotonic()
+            client = auth_session if job.auth else session
+            status = 0
+            location = None
+            if client is not None:
+                try:
+                    status, location, _ = client.request(
+                        job.method, job.path, job.form
+                    )
+                except (OSError, http.client.HTTPException):
+                    pass
+            samples.append(Sample(
+                job.route,
+                job.path,
+                status,
+                job.succeeded(status, location),
+                time.monotonic() - sent,
+            ))
+        session.close()
+        if auth_session is not None:
+            auth_session.close()
+        with self.lock:
+            self.samples.extend(samples)
+
+
+def percentile(ordered, fraction):
+    return ordered[round(fraction * (len(ordered) - 1))]
+
+
+def summarize(samples, elapsed):
+    """Пропускная способность, доля ошибок и перцентили по маршрутам."""
+    routes = {}
+    for sample in samples:
+        routes.setdefault(sample.route, []).append(sample)
+    routes['total'] = samples
+    report = {}
+    for route, route_samples in routes.items():
+        if not route_samples:
+            continue
+        latencies = sorted(sample.latency for sample in route_samples)
+        errors = sum(not sample.ok for sample in route_samples)
+        report[route] = {
+            'count': len(route_samples),
+            'errors': errors,
+            'error_rate': round(errors / len(route_samples), 4),
+            'rps': round(len(route_samples) / elapsed, 2) if elapsed else 0,
+            'p50_ms': round(percentile(latencies, 0.5) * 1000, 2),
+            'p90_ms': round(percentile(latencies, 0.9) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+            'max_ms': round(latencies[-1] * 1000, 2),
+        }
+    return report
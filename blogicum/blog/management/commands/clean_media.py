@@ -0,0 +1,100 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+
+DEFAULT_GRACE_HOURS = 24
+DEFAULT_BATCH_SIZE = 500
+
+
+def iter_files(directory):
+    """Обходит каталог через os.scandir, не собирая список файлов."""
+    stack = [directory]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет из MEDIA_ROOT изображения постов, '
+        'на которые больше не ссылается ни одна публикация.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать файлы, которые будут удалены.'
+        )
+        parser.add_argument(
+            '--grace-hours',
+            type=float,
+            default=DEFAULT_GRACE_HOURS,
+            help='Не трогать файлы моложе указанного числа часов.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Сколько имён файлов проверять одним запросом к БД.'
+        )
+
+    def handle(self, *args, **options):
+        self.dry_run = options['dry_run']
+        self.removed = self.freed = self.checked = 0
+        media_root = os.path.abspath(settings.MEDIA_ROOT)
+        upload_to = Post._meta.get_field('image').upload_to
+        cutoff = time.time() - options['grace_hours'] * 3600
+
+        batch = []
+        for entry in iter_files(os.path.join(media_root, upload_to)):
+            stat = entry.stat(follow_symlinks=False)
+            if stat.st_mtime > cutoff:
+                continue
+            name = os.path.relpath(entry.path, media_root).replace(
+                os.sep, '/'
+            )
+            batch.append((name, entry.path, stat.st_size))
+            if len(batch) >= options['batch_size']:
+                self.collect(batch)
+                batch = []
+        if batch:
+            self.collect(batch)
+
+        verb = 'Будет удалено' if self.dry_run else 'Удалено'
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено файлов: {self.checked}. '
+            f'{verb}: {self.removed} ({self.freed} байт).'
+        ))
+
+    def collect(self, batch):
+        self.checked += len(batch)
+        referenced = set(
+            Post.objects.filter(
+                image__in=[name for name, _, _ in batch]
+            ).values_list('image', flat=True)
+        )
+        for name, path, size in batch:
+            if name in referenced:
+                continue
+            if self.dry_run:
+                self.stdout.write(name)
+            else:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    continue
+            self.removed += 1
+            self.freed += size
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from blogicum.templating import precompile_templates
+
+
+class Command(BaseCommand):
+    help = 'Компилирует все шаблоны и выводит время компиляции каждого.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help='Показать только N самых медленных шаблонов.'
+        )
+
+    def handle(self, *args, **options):
+        timings = precompile_templates()
+        total = sum(seconds for _, seconds in timings)
+        for name, seconds in timings[:options['limit']]:
+            self.stdout.write(f'{seconds * 1000:9.2f} мс  {name}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Шаблонов: {len(timings)}, всего {total * 1000:.1f} мс.'
+        ))
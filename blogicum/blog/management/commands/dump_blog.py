@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.snapshot import dump, open_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково выгружает категории, местоположения, пользователей, '
+        'посты и комментарии в JSON Lines. Пользователи обезличиваются: '
+        'пароли непригодны для входа, почта заменена, прав персонала нет.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'output',
+            nargs='?',
+            default='-',
+            help='Файл снимка; .gz сжимается. По умолчанию stdout.'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Строк, читаемых из БД за один запрос.'
+        )
+        parser.add_argument(
+            '--keep-credentials',
+            action='store_true',
+            help=(
+                'Не обезличивать пользователей. Снимок будет содержать хеши '
+                'паролей и почту: храните его как резервную копию БД.'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        dump_options = {
+            'chunk_size': options['chunk_size'],
+            'sanitize': not options['keep_credentials'],
+        }
+        if options['output'] == '-':
+            self.stdout.ending = ''
+            dump(self.stdout, **dump_options)
+            return
+        with open_snapshot(options['output'], 'w') as stream:
+            counts = dump(stream, **dump_options)
+        elapsed = time.perf_counter() - started
+        self.stderr.write(self.style.SUCCESS(
+            f'Выгружено за {elapsed:.1f} с: '
+            + ', '.join(f'{label} {count}' for label, count in counts.items())
+        ))
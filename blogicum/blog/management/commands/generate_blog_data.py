@@ -0,0 +1,67 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.datagen import DatasetSpec, generate
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет БД синтетическими пользователями, категориями, '
+        'местоположениями, постами и комментариями.'
+    )
+
+    def add_arguments(self, parser):
+        defaults = DatasetSpec()
+        for name in ('posts', 'comments', 'users', 'categories', 'locations'):
+            parser.add_argument(
+                f'--{name}', type=int, default=getattr(defaults, name)
+            )
+        parser.add_argument(
+            '--comment-skew',
+            type=float,
+            default=defaults.comment_skew,
+            help='Показатель степенного распределения комментариев.'
+        )
+        parser.add_argument('--seed', type=int, default=defaults.seed)
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=20000,
+            help='Строк в одной пачке и транзакции.'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='Число процессов, строящих и записывающих пачки.'
+        )
+
+    def handle(self, *args, **options):
+        spec = DatasetSpec(
+            posts=options['posts'],
+            comments=options['comments'],
+            users=options['users'],
+            categories=options['categories'],
+            locations=options['locations'],
+            comment_skew=options['comment_skew'],
+            seed=options['seed'],
+        )
+        started = time.perf_counter()
+        counts = generate(
+            spec,
+            batch_size=options['batch_size'],
+            workers=options['workers'],
+            progress=self.progress,
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано за {elapsed:.1f} с: '
+            + ', '.join(f'{kind} {count}' for kind, count in counts.items())
+        ))
+
+    def progress(self, kind, done, total):
+        self.stdout.write(f'\r{kind}: {done}/{total}', ending='')
+        self.stdout.flush()
@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.snapshot import load, open_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково загружает снимок JSON Lines, созданный dump_blog, '
+        'пачками в порядке внешних ключей.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help='Файл снимка; .gz распаковывается.')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Объектов в одной пачке и транзакции.'
+        )
+        parser.add_argument(
+            '--ignore-conflicts',
+            action='store_true',
+            help='Пропускать строки с уже существующими ключами.'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        with open_snapshot(options['input'], 'r') as stream:
+            counts = load(
+                stream,
+                batch_size=options['batch_size'],
+                ignore_conflicts=options['ignore_conflicts'],
+                progress=self.progress,
+            )
+        elapsed = time.perf_counter() - started
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено за {elapsed:.1f} с: '
+            + ', '.join(f'{label} {count}' for label, count in counts.items())
+        ))
+
+    def progress(self, label, done):
+        self.stdout.write(f'\r{label}: {done}', ending='')
+        self.stdout.flush()
@@ -0,0 +1,129 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.datagen import DEFAULT_PASSWORD
+from blog.loadgen import (
+    DEFAULT_MIX, LoadError, Runner, discover, mix_jobs, start_server,
+    summarize
+)
+
+
+def parse_mix(value):
+    """Смесь маршрутов вида feed=40,comment=10."""
+    mix = {}
+    for item in value.split(','):
+        route, _, weight = item.partition('=')
+        if route not in DEFAULT_MIX:
+            raise CommandError(
+                f'Неизвестный маршрут {route!r}, доступны: '
+                + ', '.join(DEFAULT_MIX)
+            )
+        try:
+            mix[route] = float(weight)
+        except ValueError:
+            raise CommandError(f'Неверный вес маршрута {route}: {weight!r}')
+    return mix
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагружает блог смесью маршрутов: лента, пост, категория, профиль, '
+        'комментарии и правка постов от имени вошедших авторов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            help='Адрес запущенного сервера (WSGI или ASGI); по умолчанию '
+                 'приложение запускается в этом процессе.'
+        )
+        parser.add_argument(
+            '--duration', type=float, default=30,
+            help='Длительность прогона в секундах.'
+        )
+        parser.add_argument(
+            '--requests', type=int, default=None,
+            help='Число запросов вместо длительности.'
+        )
+        parser.add_argument(
+            '--rate', type=float, default=0,
+            help='Запросов в секунду; 0 — без пауз между запросами.'
+        )
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument(
+            '--users', type=int, default=8,
+            help='Число авторов, от имени которых идут POST-запросы.'
+        )
+        parser.add_argument('--password', default=DEFAULT_PASSWORD)
+        parser.add_argument(
+            '--mix', type=parse_mix, default=DEFAULT_MIX,
+            help='Веса маршрутов, например feed=40,post_detail=25,comment=5.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', type=Path, default=None)
+
+    def handle(self, *args, **options):
+        try:
+            targets = discover(options['users'], options['password'])
+        except LoadError as error:
+            raise CommandError(error)
+        server = None
+        base_url = options['url']
+        if base_url is None:
+            server = start_server()
+            host, port = server.server_address[:2]
+            base_url = f'http://{host}:{port}'
+        requests = options['requests']
+        runner = Runner(
+            base_url,
+            mix_jobs(
+                targets,
+                options['mix'],
+                rate=options['rate'],
+                duration=None if requests else options['duration'],
+                requests=requests,
+                seed=options['seed'],
+            ),
+            concurrency=options['concurrency'],
+            accounts=targets.accounts,
+        )
+        self.stdout.write(f'Нагрузка на {base_url}...')
+        try:
+            samples = runner.run()
+        except LoadError as error:
+            raise CommandError(error)
+        finally:
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+        report = summarize(samples, runner.elapsed)
+        self.print_report(report)
+        if options['output']:
+            options['output'].write_text(json.dumps({
+                'meta': {
+                    'url': base_url,
+                    'elapsed': round(runner.elapsed, 3),
+                    'rate': options['rate'],
+                    'concurrency': options['concurrency'],
+                    'mix': options['mix'],
+                },
+                'routes': report,
+            }, indent=2))
+
+    def print_report(self, report):
+        for route, result in report.items():
+            line = (
+                f'{route:<12} {result["count"]:7} запросов '
+                f'{result["rps"]:8.1f}/с  ошибок {result["error_rate"]:6.1%}'
+                f'  p50 {result["p50_ms"]:8.2f} мс'
+                f'  p90 {result["p90_ms"]:8.2f} мс'
+                f'  p99 {result["p99_ms"]:8.2f} мс'
+                f'  max {result["max_ms"]:8.2f} мс'
+            )
+            if route == 'total':
+                line = self.style.SUCCESS(line)
+            elif result['errors']:
+                line = self.style.WARNING(line)
+            self.stdout.write(line)
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blogicum.sessions import purge_expired
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет просроченные сессии пачками, не блокируя таблицу '
+        'сессий надолго.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сессий в одной пачке и транзакции.'
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.05,
+            help='Пауза между пачками в секундах.'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        deleted = purge_expired(
+            batch_size=options['batch_size'],
+            pause=options['pause'],
+            progress=self.progress,
+        )
+        elapsed = time.perf_counter() - started
+        if deleted:
+            self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено сессий: {deleted} за {elapsed:.1f} с'
+        ))
+
+    def progress(self, deleted):
+        self.stdout.write(f'\rУдалено: {deleted}', ending='')
+        self.stdout.flush()
@@ -0,0 +1,44 @@
+import base64
+import hashlib
+from pathlib import Path
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django_bootstrap5.core import get_bootstrap_setting
+
+from blog.templatetags.assets import BOOTSTRAP_CSS
+
+# Шаблоны подключают только стили Bootstrap, скрипты сайту не нужны.
+ASSETS = {
+    'css_url': BOOTSTRAP_CSS,
+}
+
+
+def check_integrity(data, integrity):
+    algorithm, _, expected = integrity.partition('-')
+    digest = hashlib.new(algorithm, data).digest()
+    return base64.b64encode(digest).decode() == expected
+
+
+class Command(BaseCommand):
+    help = (
+        'Скачивает стили Bootstrap с CDN из настроек django_bootstrap5 '
+        'в STATICFILES_DIRS, чтобы сайт не зависел от CDN.'
+    )
+
+    def handle(self, *args, **options):
+        static_dir = Path(settings.STATICFILES_DIRS[0])
+        for setting, name in ASSETS.items():
+            asset = get_bootstrap_setting(setting)
+            with urlopen(asset['url'], timeout=30) as response:
+                data = response.read()
+            integrity = asset.get('integrity')
+            if integrity and not check_integrity(data, integrity):
+                raise CommandError(
+                    f'Контрольная сумма {asset["url"]} не совпала.'
+                )
+            path = static_dir / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+            self.stdout.write(f'{asset["url"]} -> {path}')
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.warmup import warmup
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогревает URL-резолвер, шаблоны, справочники и первые '
+        'страницы ленты перед приёмом трафика.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pages',
+            type=int,
+            default=settings.WARMUP_PAGES,
+            help='Сколько первых страниц ленты отрендерить.'
+        )
+
+    def handle(self, *args, **options):
+        for name, seconds in warmup(options['pages']).items():
+            self.stdout.write(f'{name:<10} {seconds * 1000:9.1f} мс')
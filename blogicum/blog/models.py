@@ -117,6 +117,23 @@ class Post(PublishedModel):
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         default_related_name = 'posts'
+        # Ленты главной, категории и профиля читаются по убыванию даты;
+        # лента главной — только по опубликованным постам.
+        indexes = [
+            models.Index(
+                fields=['-pub_date'],
+                name='post_feed_idx',
+                condition=models.Q(is_published=True),
+            ),
+            models.Index(
+                fields=['category', '-pub_date'],
+                name='post_category_feed_idx',
+            ),
+            models.Index(
+                fields=['author', '-pub_date'],
+                name='post_author_feed_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.title[:MAX_LENGTH_STR]
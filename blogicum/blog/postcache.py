@@ -0,0 +1,169 @@
+"""Кеш страниц лент get_published_posts().
+
+Лента, категория и профиль читают одни и те же срезы постов тысячи раз
+в минуту. CachedPostPaginator хранит число постов и каждую страницу
+в кеше: страница — кортеж id постов и кортежи строк с полями поста,
+автора, категории и места, из которых собираются объекты моделей.
+
+Ключ задаётся лентой (PostScope), размером и номером страницы, а версия
+записи — поколениями, которые сдвигают сигналы blog.signals: изменение
+поста устаревает только общую ленту, его категорию и автора, а смена
+имени автора — ещё и общую ленту, категории его постов и страницы
+постов, где он писал или комментировал. Посты, у которых наступило
+время публикации, появляются после истечения POST_LIST_CACHE_TIMEOUT.
+"""
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage
+from django.utils.functional import cached_property
+
+from blogicum.cache import get_or_refresh
+
+from .models import Category, Location, Post, User
+from .utils import PostPaginator
+
+KEY = 'blog:posts:{}:{}'
+# Поколения, от которых зависят все ленты.
+COMMON_GENERATIONS = ('categories', 'locations')
+FEED_GENERATION = 'posts'
+# Пароль и прочие служебные поля пользователя в кеш не попадают.
+AUTHOR_FIELDS = ('id', 'username', 'first_name', 'last_name')
+
+
+def attnames(model):
+    return tuple(field.attname for field in model._meta.concrete_fields)
+
+
+# (модель, имя поля у поста, поля строки); первой идёт сам пост.
+ROW_MODELS = (
+    (Post, None, attnames(Post)),
+    (User, 'author', AUTHOR_FIELDS),
+    (Category, 'category', attnames(Category)),
+    (Location, 'location', attnames(Location)),
+)
+
+
+def category_generation(category_id):
+    return f'category:{category_id}'
+
+
+def author_generation(author_id):
+    return f'author:{author_id}'
+
+
+def forget_posts():
+    """Устаревает все ленты после записи в обход сигналов моделей."""
+    cache.bump(FEED_GENERATION, *COMMON_GENERATIONS)
+
+
+@dataclass(frozen=True)
+class PostScope:
+    """Лента постов: общая, категории или автора."""
+
+    generation: str = FEED_GENERATION
+    filter_published: bool = True
+
+    @classmethod
+    def category(cls, category_id):
+        return cls(category_generation(category_id))
+
+    @classmethod
+    def author(cls, author_id, filter_published=True):
+        return cls(author_generation(author_id), filter_published)
+
+    def key(self, per_page, part):
+        scope = f'{self.generation}:{int(self.filter_published)}:{per_page}'
+        return KEY.format(scope, part)
+
+    def version(self):
+        return cache.generations(self.generation, *COMMON_GENERATIONS)
+
+
+def value_names():
+    names = []
+    for _, field, fields in ROW_MODELS:
+        prefix = f'{field}__' if field else ''
+        names.extend(prefix + name for name in fields)
+    return names + ['comment_count']
+
+
+def load_rows(queryset):
+    """Строки страницы: кортеж id и кортеж значений полей."""
+    rows = tuple(queryset.values_list(*value_names()))
+    return tuple(row[0] for row in rows), rows
+
+
+def build_post(row, using):
+    """Пост со связанными объектами из строки load_rows()."""
+    values = iter(row)
+    post = None
+    for model, field, fields in ROW_MODELS:
+        data = [next(values) for _ in fields]
+        if post is None:
+            post = model.from_db(using, fields, data)
+            continue
+        related = None if data[0] is None else model.from_db(
+            using, fields, data
+        )
+        Post._meta.get_field(field).set_cached_value(post, related)
+    post.comment_count = next(values)
+    return post
+
+
+class CachedPostPaginator(PostPaginator):
+    """Пагинатор, читающий число постов и страницы из кеша."""
+
+    def __init__(self, object_list, per_page, scope, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.scope = scope
+
+    def cached(self, part, compute):
+        return get_or_refresh(
+            self.scope.key(self.per_page, part),
+            compute,
+            version=self.scope.version(),
+            timeout=settings.POST_LIST_CACHE_TIMEOUT,
+            stale_timeout=settings.POST_LIST_STALE_TIMEOUT,
+        )
+
+    @cached_property
+    def count(self):
+        return self.cached(
+            'count', lambda: self.object_list.values('pk').count()
+        )
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        if top + self.orphans >= self.count:
+            top = self.count
+        _, rows = self.cached(
+            f'page:{number}',
+            lambda: load_rows(self.object_list[bottom:top]),
+        )
+        if not rows and number > 1:
+            # Посты удалили между чтением числа и страницы.
+            raise EmptyPage('That page contains no results')
+        using = self.object_list.db
+        return self._get_page(
+            [build_post(row, using) for row in rows], number, self
+        )
+
+
+class CachedPostsMixin:
+    """Миксин ListView, пагинирующий get_published_posts() через кеш."""
+
+    paginator_class = CachedPostPaginator
+
+    def get_post_scope(self):
+        return PostScope()
+
+    def get_paginator(self, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True, **kwargs):
+        return self.paginator_class(
+            queryset, per_page, self.get_post_scope(), orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page, **kwargs
+        )
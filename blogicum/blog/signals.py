@@ -0,0 +1,134 @@
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from blogicum.auth import forget_user
+from blogicum.metrics import registry
+
+from .models import Category, Comment, Location, Post, User
+from .postcache import (
+    AUTHOR_FIELDS,
+    FEED_GENERATION,
+    author_generation,
+    category_generation,
+)
+
+
+@receiver(post_save, sender=Post)
+def count_created_post(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        registry.inc('blogicum_posts_created_total')
+
+
+@receiver(post_save, sender=Comment)
+def count_created_comment(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        registry.inc('blogicum_comments_created_total')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    forget_user(instance.pk)
+
+
+def feed_generations(post):
+    """Поколения лент, в которых показан пост."""
+    return (
+        FEED_GENERATION,
+        category_generation(post.category_id),
+        author_generation(post.author_id),
+    )
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_feeds(sender, instance, raw, **kwargs):
+    # Пост, перенесённый в другую категорию, уходит и из прежней ленты.
+    instance.previous_feeds = ()
+    if instance.pk is None or raw:
+        return
+    previous = Post.objects.filter(pk=instance.pk).only(
+        'category_id', 'author_id'
+    ).first()
+    if previous is not None:
+        instance.previous_feeds = feed_generations(previous)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def bump_post_generation(sender, instance, **kwargs):
+    cache.bump(
+        f'post:{instance.pk}',
+        *set(feed_generations(instance))
+        | set(getattr(instance, 'previous_feeds', ())),
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_commented_post_generation(sender, instance, **kwargs):
+    # Ленты показывают число комментариев.
+    post = Post.objects.filter(pk=instance.post_id).only(
+        'category_id', 'author_id'
+    ).first()
+    feeds = feed_generations(post) if post is not None else ()
+    cache.bump(f'post:{instance.post_id}', *feeds)
+
+
+def author_pages(user_id):
+    """Поколения страниц с именем автора: лент и страниц постов."""
+    posts = Post.objects.filter(author_id=user_id)
+    categories = posts.values_list('category_id', flat=True).distinct()
+    post_ids = set(posts.values_list('pk', flat=True)) | set(
+        Comment.objects.filter(author_id=user_id).values_list(
+            'post_id', flat=True
+        )
+    )
+    return (
+        FEED_GENERATION,
+        *(category_generation(pk) for pk in categories if pk is not None),
+        *(f'post:{pk}' for pk in post_ids),
+    )
+
+
+@receiver(pre_save, sender=User)
+def remember_author_fields(
+    sender, instance, raw, update_fields=None, **kwargs
+):
+    # Имя автора показано в общей ленте, лентах категорий и на страницах
+    # постов; без его изменения достаточно сдвинуть ленту автора.
+    instance.author_fields_changed = False
+    if instance.pk is None or raw:
+        return
+    if update_fields == frozenset({'last_login'}):
+        return
+    previous = User.objects.filter(pk=instance.pk).values_list(
+        *AUTHOR_FIELDS
+    ).first()
+    instance.author_fields_changed = previous != tuple(
+        getattr(instance, name) for name in AUTHOR_FIELDS
+    )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def bump_author_generation(sender, instance, update_fields=None, **kwargs):
+    # Вход обновляет только last_login, его в лентах нет.
+    if update_fields == frozenset({'last_login'}):
+        return
+    pages = ()
+    if getattr(instance, 'author_fields_changed', False):
+        pages = author_pages(instance.pk)
+    cache.bump(author_generation(instance.pk), *pages)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def bump_categories_generation(sender, **kwargs):
+    cache.bump('categories')
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def bump_locations_generation(sender, **kwargs):
+    cache.bump('locations')
@@ -0,0 +1,155 @@
+"""Потоковые снимки данных блога в формате JSON Lines.
+
+В отличие от dumpdata/loaddata документ не держится в памяти целиком:
+объекты пишутся и читаются по одной строке, а вставляются пачками
+в порядке зависимостей внешних ключей. Файлы с суффиксом .gz сжимаются
+на лету.
+
+По умолчанию dump() обезличивает пользователей: пароли непригодны для
+входа, почта заменена, прав персонала нет. Снимок с sanitize=False
+содержит хеши паролей и почту и хранится как резервная копия БД.
+"""
+import datetime
+import gzip
+
+from django.apps import apps
+from django.contrib.auth.hashers import make_password
+from django.core import serializers
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from .models import Category, Comment, Location, Post, User
+from .postcache import forget_posts
+
+# Порядок важен: каждая модель ссылается только на предыдущие.
+SNAPSHOT_MODELS = (Category, Location, User, Post, Comment)
+
+
+class SnapshotEncoder(DjangoJSONEncoder):
+    """Сохраняет микросекунды, которые DjangoJSONEncoder отбрасывает."""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def open_snapshot(path, mode):
+    """Открывает снимок как текст; файлы .gz сжимаются и распаковываются."""
+    if str(path).endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def snapshot_fields(model):
+    """Поля без связей многие-ко-многим: они дали бы запрос на объект."""
+    return [
+        field.name for field in model._meta.concrete_fields
+        if not field.primary_key
+    ]
+
+
+def sanitize_user(user):
+    """Пользователь без пароля, почты и прав персонала."""
+    user.password = make_password(None)
+    user.email = f'user{user.pk}@example.invalid'
+    user.is_staff = user.is_superuser = False
+    return user
+
+
+SANITIZERS = {User: sanitize_user}
+
+
+def dump(stream, chunk_size=2000, using=DEFAULT_DB_ALIAS, sanitize=True):
+    """Пишет модели SNAPSHOT_MODELS в stream и возвращает число объектов."""
+    serializer = serializers.get_serializer('jsonl')()
+    counts = {}
+    for model in SNAPSHOT_MODELS:
+        queryset = model._base_manager.using(using).order_by('pk')
+        counts[model._meta.label_lower] = 0
+        clean = SANITIZERS.get(model) if sanitize else None
+
+        def objects(queryset=queryset, label=model._meta.label_lower,
+                    clean=clean):
+            for obj in queryset.iterator(chunk_size=chunk_size):
+                counts[label] += 1
+                yield clean(obj) if clean else obj
+
+        serializer.serialize(
+            objects(),
+            stream=stream,
+            fields=snapshot_fields(model),
+            cls=SnapshotEncoder,
+        )
+    return counts
+
+
+def insert_batch(model, objects, using, ignore_conflicts=False):
+    """Вставляет пачку как loaddata, сохраняя created_at и первичные ключи.
+
+    bulk_create вызвал бы pre_save полей и перезаписал бы даты
+    auto_now_add, поэтому строки вставляются в raw-режиме пачками
+    допустимого для БД размера.
+    """
+    connection = connections[using]
+    fields = model._meta.concrete_fields
+    step = connection.ops.bulk_batch_size(fields, objects) or len(objects)
+    for start in range(0, len(objects), step):
+        model._base_manager._insert(
+            objects[start:start + step],
+            fields=fields,
+            raw=True,
+            using=using,
+            ignore_conflicts=ignore_conflicts,
+        )
+
+
+def reset_sequences(models, using):
+    connection = connections[using]
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+
+def load(stream, batch_size=5000, ignore_conflicts=False,
+         using=DEFAULT_DB_ALIAS, progress=None):
+    """Загружает снимок из stream и возвращает число объектов по моделям.
+
+    Строки разбираются по одной, в памяти держится не больше одной
+    пачки. Пачка сбрасывается при заполнении и при смене модели, так что
+    порядок моделей в файле должен соответствовать внешним ключам, как
+    его пишет dump(). Каждая пачка записывается своей транзакцией.
+    """
+    counts = {}
+    batch = []
+    model = None
+
+    def flush():
+        if not batch:
+            return
+        with transaction.atomic(using=using):
+            insert_batch(model, batch, using, ignore_conflicts)
+        label = model._meta.label_lower
+        counts[label] = counts.get(label, 0) + len(batch)
+        if progress:
+            progress(label, counts[label])
+        batch.clear()
+
+    for deserialized in serializers.deserialize(
+        'jsonl', stream, using=using, ignorenonexistent=True
+    ):
+        obj = deserialized.object
+        if type(obj) is not model:
+            flush()
+            model = type(obj)
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    reset_sequences([apps.get_model(label) for label in counts], using)
+    # Строки записаны в обход сигналов моделей.
+    forget_posts()
+    return counts
@@ -0,0 +1,26 @@
+from functools import lru_cache
+
+from django import template
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+from django.utils.html import format_html
+from django_bootstrap5.templatetags.django_bootstrap5 import bootstrap_css
+
+register = template.Library()
+
+BOOTSTRAP_CSS = 'vendor/bootstrap/bootstrap.min.css'
+
+
+@lru_cache(maxsize=None)
+def is_vendored(path):
+    return finders.find(path) is not None
+
+
+@register.simple_tag
+def vendored_bootstrap_css():
+    """Подключает локальную копию Bootstrap, если она есть, иначе CDN."""
+    if is_vendored(BOOTSTRAP_CSS):
+        return format_html(
+            '<link href="{}" rel="stylesheet">', static(BOOTSTRAP_CSS)
+        )
+    return bootstrap_css()
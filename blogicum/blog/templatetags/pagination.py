@@ -0,0 +1,16 @@
+from django import template
+from django.conf import settings
+
+register = template.Library()
+
+
+@register.simple_tag
+def elided_page_range(page_obj, on_each_side=None, on_ends=None):
+    """Номера страниц вокруг текущей и по краям, остальное — многоточие."""
+    if on_each_side is None:
+        on_each_side = settings.PAGINATION_ON_EACH_SIDE
+    if on_ends is None:
+        on_ends = settings.PAGINATION_ON_ENDS
+    return list(page_obj.paginator.get_elided_page_range(
+        page_obj.number, on_each_side=on_each_side, on_ends=on_ends
+    ))
@@ -1,37 +1,80 @@
 from django.contrib.auth.mixins import UserPassesTestMixin
-from django.db.models import Count
+from django.core.paginator import Paginator
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.shortcuts import redirect
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.functional import cached_property
 
 from .models import Post, Comment
 
 
+def published_posts_filter():
+    """Условие видимости поста для всех, кроме автора."""
+    return Q(
+        pub_date__lte=timezone.now(),
+        category__is_published=True,
+        is_published=True
+    )
+
+
+def comment_count():
+    """Число комментариев коррелированным подзапросом.
+
+    В отличие от Count('comments') не требует GROUP BY по всем постам,
+    поэтому ленту можно читать по индексу и остановиться на LIMIT.
+    """
+    return Coalesce(
+        Subquery(
+            Comment.objects.filter(
+                post=OuterRef('pk')
+            ).order_by().values('post').annotate(
+                count=Count('pk')
+            ).values('count'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
 def get_published_posts(posts=Post.objects.all(), filter_published=True):
     posts = posts.annotate(
-        comment_count=Count('comments')
-    ). select_related(
+        comment_count=comment_count()
+    ).select_related(
         'author', 'location', 'category'
     ).order_by(
         *Post._meta.ordering
     )
     if filter_published:
-        posts = posts.filter(
-            pub_date__lte=timezone.now(),
-            category__is_published=True,
-            is_published=True
-        )
+        posts = posts.filter(published_posts_filter())
     return posts
 
 
+class PostPaginator(Paginator):
+    """Пагинатор ленты, считающий посты без подзапроса comment_count."""
+
+    @cached_property
+    def count(self):
+        return self.object_list.values('pk').count()
+
+
 class OnlyAuthorMixin(UserPassesTestMixin):
     """
     Миксин для подтвеждения возможностей
     пользователя на удаление и редактирование.
     """
 
+    checked_object = None
+
+    def get_object(self, queryset=None):
+        # Объект нужен и проверке, и самому представлению.
+        if self.checked_object is None:
+            self.checked_object = super().get_object(queryset)
+        return self.checked_object
+
     def test_func(self):
-        return self.get_object().author == self.request.user
+        return self.get_object().author_id == self.request.user.id
 
 
 class CommentMixin:
@@ -43,8 +86,8 @@ class CommentMixin:
 
     def dispatch(self, request, *args, **kwargs):
         comment = self.get_object()
-        if comment.author != self.request.user:
-            return redirect('blog:post_detail', post_id=comment.post.id)
+        if comment.author_id != self.request.user.id:
+            return redirect('blog:post_detail', post_id=comment.post_id)
         return super().dispatch(request, *args, **kwargs)
 
     def get_success_url(self):
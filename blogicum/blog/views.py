@@ -1,6 +1,9 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
 
 from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse, reverse_lazy
 from django.views.generic import (
@@ -11,22 +14,31 @@ from django.views.generic import (
     UpdateView,
 )
 
+from blogicum.cache import get_or_refresh
+
 from .forms import CommentForm, PostCreateForm, PostDeleteForm, UserProfileForm
 from .models import Category, Comment, Post, User
+from .postcache import CachedPostsMixin, PostScope
 from .utils import (
     OnlyAuthorMixin,
     get_published_posts,
+    published_posts_filter,
     CommentMixin
 )
 
+POST_PAGE_KEY = 'blog:post_page:{}'
+
 
-class PostListView(ListView):
+class PostListView(CachedPostsMixin, ListView):
     """CBV для отображения списка всех постов."""
 
     model = Post
     template_name = 'blog/index.html'
     paginate_by = settings.PAGINATION_COUNT
-    queryset = get_published_posts()
+
+    def get_queryset(self):
+        # Не атрибутом класса: условие на pub_date берёт текущее время.
+        return get_published_posts()
 
 
 class PostCreateView(LoginRequiredMixin, CreateView):
@@ -53,22 +65,43 @@ class SinglePostView(DetailView):
     template_name = 'blog/detail.html'
     pk_url_kwarg = 'post_id'
 
-    def get_post(self):
-        post = self.get_object()
-        if post.author != self.request.user:
-            post = get_object_or_404(
-                get_published_posts(),
-                pk=self.kwargs.get(self.pk_url_kwarg)
+    def get(self, request, *args, **kwargs):
+        """Анонимам страница отдаётся из кеша, см. get_or_refresh()."""
+        if request.user.is_authenticated:
+            return super().get(request, *args, **kwargs)
+        post_id = self.kwargs[self.pk_url_kwarg]
+        key = POST_PAGE_KEY.format(post_id)
+        try:
+            content, content_type = get_or_refresh(
+                key,
+                lambda: self.render_page(request, *args, **kwargs),
+                version=cache.generations(
+                    f'post:{post_id}', 'categories', 'locations'
+                ),
+                timeout=settings.POST_PAGE_CACHE_TIMEOUT,
+                stale_timeout=settings.POST_PAGE_STALE_TIMEOUT,
             )
-        return post
+        except Http404:
+            cache.delete(key)
+            raise
+        return HttpResponse(content, content_type=content_type)
+
+    def render_page(self, request, *args, **kwargs):
+        response = super().get(request, *args, **kwargs)
+        response.render()
+        return response.content, response['Content-Type']
+
+    def get_queryset(self):
+        visible = published_posts_filter()
+        if self.request.user.is_authenticated:
+            visible |= Q(author=self.request.user)
+        return get_published_posts(filter_published=False).filter(visible)
 
     def get_context_data(self, **kwargs):
-        post = self.get_post()
         return super().get_context_data(
             **kwargs,
-            post=post,
             form=CommentForm(),
-            comments=post.comments.prefetch_related('post')
+            comments=self.object.comments.select_related('author')
         )
 
 
@@ -103,7 +136,7 @@ class PostDeleteView(OnlyAuthorMixin, DeleteView):
         return redirect('blog:post_detail', post_id=self.kwargs['post_id'])
 
 
-class CategoryView(ListView):
+class CategoryView(CachedPostsMixin, ListView):
     """
     CBV для отображения списка всех постов
     в определенной категории.
@@ -115,13 +148,16 @@ class CategoryView(ListView):
     paginate_by = settings.PAGINATION_COUNT
     slug_url_kwarg = 'category_slug'
     context_object_name = 'category'
+    category = None
 
     def get_category(self):
-        return get_object_or_404(
-            Category,
-            slug=self.kwargs[self.slug_url_kwarg],
-            is_published=True
-        )
+        if self.category is None:
+            self.category = get_object_or_404(
+                Category,
+                slug=self.kwargs[self.slug_url_kwarg],
+                is_published=True
+            )
+        return self.category
 
     def get_queryset(self):
         category = self.get_category()
@@ -129,8 +165,11 @@ class CategoryView(ListView):
             get_published_posts(posts=category.posts.all())
         )
 
+    def get_post_scope(self):
+        return PostScope.category(self.get_category().pk)
+
 
-class ProfileView(ListView):
+class ProfileView(CachedPostsMixin, ListView):
     """
     CBV для отображения профиля пользователя
     и списка опубликованных им постов.
@@ -142,19 +181,28 @@ class ProfileView(ListView):
     slug_field = 'username'
     slug_url_kwarg = 'profile'
     paginate_by = settings.PAGINATION_COUNT
+    author = None
 
     def get_author(self):
-        return get_object_or_404(
-            User,
-            username=self.kwargs[self.slug_url_kwarg]
-        )
+        if self.author is None:
+            self.author = get_object_or_404(
+                User,
+                username=self.kwargs[self.slug_url_kwarg]
+            )
+        return self.author
 
     def get_queryset(self):
         return get_published_posts(
             posts=self.get_author().posts.all(),
-            filter_published=(
-                self.request.user != self.get_author()
-            )
+            filter_published=self.filter_published()
+        )
+
+    def filter_published(self):
+        return self.request.user != self.get_author()
+
+    def get_post_scope(self):
+        return PostScope.author(
+            self.get_author().pk, self.filter_published()
         )
 
     def get_context_data(self, **kwargs):
@@ -171,7 +219,9 @@ class ProfileEditView(LoginRequiredMixin, UpdateView):
     template_name = 'blog/user.html'
 
     def get_object(self):
-        return self.request.user
+        # Свежая строка, а не пользователь из кеша: форма сохраняет
+        # все поля, и устаревшие значения перезаписали бы новые.
+        return User.objects.get(pk=self.request.user.pk)
 
     def get_success_url(self):
         return reverse(
@@ -0,0 +1,98 @@
+"""Прогрев воркера перед приёмом трафика.
+
+Строит резолвер URL, компилирует шаблоны, выполняет первые запросы
+к категориям и местоположениям и проводит первые страницы ленты
+и категорий через весь стек middleware, заполняя кеши, если они
+подключены. Ошибка одной страницы пишется в лог и не мешает воркеру
+стартовать; в метрики запросы прогрева не попадают.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.test import Client
+from django.urls import URLResolver, get_resolver, resolve, reverse
+from django.urls.converters import IntConverter, SlugConverter
+
+from blogicum.middleware import WARMUP_ENVIRON_KEY
+from blogicum.templating import precompile_templates
+
+from .models import Category, Location
+
+logger = logging.getLogger('blogicum.warmup')
+
+WARMUP_NAMESPACES = ('blog', 'pages')
+SAMPLE_VALUES = {IntConverter: 1, SlugConverter: 'slug'}
+
+
+def resolve_urls():
+    """Разрешает все маршруты blog и pages туда и обратно."""
+    count = 0
+    for namespace in WARMUP_NAMESPACES:
+        resolver = get_resolver().namespace_dict[namespace][1]
+        for pattern in resolver.url_patterns:
+            if isinstance(pattern, URLResolver) or not pattern.name:
+                continue
+            kwargs = {
+                name: SAMPLE_VALUES.get(type(converter), 'sample')
+                for name, converter in pattern.pattern.converters.items()
+            }
+            resolve(reverse(f'{namespace}:{pattern.name}', kwargs=kwargs))
+            count += 1
+    return count
+
+
+def prime_lookups():
+    categories = list(Category.objects.filter(is_published=True))
+    locations = list(Location.objects.filter(is_published=True))
+    return categories, locations
+
+
+def render_pages(categories, pages):
+    """Запрашивает страницы и возвращает число отрендеренных."""
+    client = Client(
+        HTTP_HOST=settings.ALLOWED_HOSTS[0], **{WARMUP_ENVIRON_KEY: True}
+    )
+    urls = [
+        f'{reverse("blog:index")}?page={number}'
+        for number in range(1, pages + 1)
+    ]
+    urls += [
+        reverse('blog:category_posts', args=[category.slug])
+        for category in categories[:pages]
+    ]
+    rendered = 0
+    for url in urls:
+        try:
+            client.get(url)
+        except Exception:
+            logger.exception('Прогрев страницы %s не удался', url)
+        else:
+            rendered += 1
+    return rendered
+
+
+def warmup(pages=None):
+    """Выполняет все шаги прогрева и возвращает их длительность."""
+    if pages is None:
+        pages = settings.WARMUP_PAGES
+    timings = {}
+
+    def step(name, func, *args):
+        started = time.perf_counter()
+        result = func(*args)
+        timings[name] = time.perf_counter() - started
+        return result
+
+    step('urls', resolve_urls)
+    step('templates', precompile_templates)
+    try:
+        categories, _ = step('lookups', prime_lookups)
+        step('pages', render_pages, categories, pages)
+    except DatabaseError as error:
+        logger.warning('Прогрев БД пропущен: %s', error)
+    logger.info(
+        'Прогрев завершён за %.1f мс', sum(timings.values()) * 1000
+    )
+    return timings
@@ -9,8 +9,27 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+from blogicum import startup
+
+startup_profiler = startup.install('asgi')
+
+from django.conf import settings  # noqa: E402
+from django.core.asgi import get_asgi_application  # noqa: E402
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
 application = get_asgi_application()
+
+# Not in AppConfig.ready(): the admin registry and URLconf must be
+# complete, and management commands should not pay for the warmup.
+if settings.WARMUP_ON_START:
+    from blog.warmup import warmup
+
+    warmup()
+elif settings.TEMPLATE_PRECOMPILE:
+    from .templating import warm_templates
+
+    warm_templates()
+
+if startup_profiler:
+    startup_profiler.finish()
@@ -0,0 +1,81 @@
+"""Загрузка вошедшего пользователя из кеша.
+
+AuthenticationMiddleware читает строку auth_user на каждом запросе.
+CachedAuthenticationMiddleware держит пользователя в кеше
+AUTH_USER_CACHE_TTL секунд и при каждом запросе сверяет хеш
+аутентификации из сессии с хешем, посчитанным при записи в кеш: сессии,
+выданные до смены пароля, не принимаются. Хеш пароля в кеш не пишется:
+у кешированного пользователя поле password отложено и читается из БД
+при обращении, например в форме смены пароля. Кеш сбрасывается при
+сохранении и удалении пользователя (blog.signals), в том числе при
+правке профиля и смене пароля.
+
+С локальным кешем (LocMemCache) сброс виден только своему процессу:
+другие воркеры могут видеть прежние данные до истечения TTL.
+"""
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+CACHE_KEY = 'auth:user:v2:{}'
+
+
+def forget_user(user_id):
+    cache.delete(CACHE_KEY.format(user_id))
+
+
+def cacheable(user):
+    """Копия пользователя без хеша пароля."""
+    fields = [
+        field.attname for field in user._meta.concrete_fields
+        if field.attname != 'password'
+    ]
+    return type(user).from_db(
+        user._state.db, fields, [getattr(user, name) for name in fields]
+    )
+
+
+def get_user(request):
+    """Пользователь сессии из кеша, при промахе — из БД с проверкой."""
+    ttl = settings.AUTH_USER_CACHE_TTL
+    user_id = request.session.get(auth.SESSION_KEY)
+    if not ttl or user_id is None:
+        return auth.get_user(request)
+    key = CACHE_KEY.format(user_id)
+    cached = cache.get(key)
+    if cached is None:
+        user = auth.get_user(request)
+        if user.is_authenticated:
+            cache.set(
+                key, (cacheable(user), user.get_session_auth_hash()), ttl
+            )
+        return user
+    user, auth_hash = cached
+    session_hash = request.session.get(auth.HASH_SESSION_KEY)
+    backend_path = request.session.get(auth.BACKEND_SESSION_KEY)
+    if (
+        backend_path not in settings.AUTHENTICATION_BACKENDS
+        or not constant_time_compare(session_hash, auth_hash)
+    ):
+        # Так же поступает auth.get_user() при несовпадении хеша.
+        request.session.flush()
+        return AnonymousUser()
+    user.backend = backend_path
+    return user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: self.get_user(request))
+
+    @staticmethod
+    def get_user(request):
+        if not hasattr(request, '_cached_user'):
+            request._cached_user = get_user(request)
+        return request._cached_user
@@ -0,0 +1,503 @@
+"""Двухуровневый кеш: LRU в памяти процесса перед общим кешем.
+
+TieredCache — бэкенд Django. LOCATION — псевдоним общего кеша (L2):
+memcached, redis или LockedFileBasedCache на узле. Перед ним стоит
+L1 — общий для потоков процесса LRU с ограничением по числу записей
+и по байтам, записи которого живут не дольше L1_TIMEOUT секунд.
+
+L2 должен выполнять add() и incr() атомарно: на них держатся счётчики
+поколений и аренды. FileBasedCache Django проверяет и записывает
+значение в два шага, поэтому для файлового L2 есть LockedFileBasedCache.
+С LocMemCache, как в настройках по умолчанию, L2 у каждого процесса
+свой: удаления, поколения и аренды видны только внутри процесса,
+а значения в L1 других процессов живут до истечения L1_TIMEOUT.
+
+Инвалидация доходит до всех L1 с общим L2 через счётчик поколений.
+delete() увеличивает счётчик и записывает удалённый ключ в журнал под
+номером поколения; процесс не чаще раза в GENERATION_CHECK_INTERVAL секунд
+сверяет счётчик и выбрасывает из L1 ключи из журнала, а если журнал
+неполон — весь L1. set() поколение не меняет: перезаписанное значение
+в чужих L1 остаётся до истечения L1_TIMEOUT. Поэтому данные,
+зависящие от моделей, удобнее хранить под ключами с именованными
+поколениями (generations() и bump()): после bump() старые ключи просто
+перестают читаться.
+
+get_or_refresh() защищает дорогие значения от лавины пересчётов:
+при промахе значение считает один поток процесса и один процесс
+(аренда в L2), остальные ждут его; устаревшее значение отдаётся,
+пока один запрос считает новое. Аренда — атомарный add() в L2: с общим
+L2 пересчёт единственен на все процессы, с локальным — в процессе.
+"""
+import os
+import pickle
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.core.cache import cache as default_cache
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.files import locks
+
+from .metrics import record_cache_lookup
+
+GENERATION_KEY = 'tiered:generation'
+INVALIDATION_KEY = 'tiered:invalidated:{}'
+NAMED_GENERATION_KEY = 'tiered:generation:{}'
+# Сколько поколений журнала удалений читается при сверке; если процесс
+# отстал сильнее, L1 очищается целиком.
+INVALIDATION_LOG_DEPTH = 100
+LEASE_KEY = 'tiered:lease:{}'
+LEASE_POLL_INTERVAL = 0.05
+
+# L1 общий для всех потоков процесса: Django создаёт экземпляр бэкенда
+# на поток, поэтому состояние хранится здесь по LOCATION.
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+class L1Store:
+    """LRU с TTL и учётом размера сериализованных значений.
+
+    Прочитанные именованные поколения хранятся в отдельном LRU с тем же
+    ограничением числа записей: имён столько же, сколько объектов.
+    """
+
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.lock = threading.Lock()
+        self.generation = None
+        self.checked = float('-inf')
+        self.named = OrderedDict()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                self._pop(key)
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, pickled, timeout):
+        size = len(pickled)
+        with self.lock:
+            self._pop(key)
+            if size > self.max_bytes:
+                return
+            self.entries[key] = (time.monotonic() + timeout, pickled)
+            self.bytes += size
+            while (
+                len(self.entries) > self.max_entries
+                or self.bytes > self.max_bytes
+            ):
+                self._pop(next(iter(self.entries)))
+
+    def pop(self, *keys):
+        with self.lock:
+            for key in keys:
+                self._pop(key)
+
+    def _remember(self, name, generation, checked):
+        """Запоминает поколение; вызывается под self.lock."""
+        self.named[name] = (generation, checked)
+        self.named.move_to_end(name)
+        while len(self.named) > self.max_entries:
+            self.named.popitem(last=False)
+
+    def _pop(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= len(entry[1])
+
+    def clear(self, generations=False):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+            if generations:
+                self.generation = None
+                self.checked = float('-inf')
+                self.named.clear()
+
+
+class TieredCache(BaseCache):
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.l2_alias = location
+        self.l1_timeout = options.get('L1_TIMEOUT', 5)
+        self.check_interval = options.get('GENERATION_CHECK_INTERVAL', 1)
+        self.metrics_alias = params.get('METRICS_ALIAS', 'default')
+        with _stores_lock:
+            self.l1 = _stores.setdefault(location, L1Store(
+                options.get('L1_MAX_ENTRIES', 10000),
+                options.get('L1_MAX_BYTES', 64 * 1024 * 1024),
+            ))
+
+    @property
+    def l2(self):
+        return caches[self.l2_alias]
+
+    def l1_timeout_for(self, timeout):
+        timeout = self.get_backend_timeout(timeout)
+        if timeout is None:
+            return self.l1_timeout
+        return max(min(timeout - time.time(), self.l1_timeout), 0)
+
+    def get(self, key, default=None, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        self.sync()
+        pickled = self.l1.get(key)
+        record_cache_lookup(f'{self.metrics_alias}:l1', pickled is not None)
+        if pickled is not None:
+            return pickle.loads(pickled)
+        value = self.l2.get(key, self._missing_key)
+        record_cache_lookup(
+            f'{self.metrics_alias}:l2', value is not self._missing_key
+        )
+        if value is self._missing_key:
+            return default
+        self.l1.set(
+            key, pickle.dumps(value, self.pickle_protocol), self.l1_timeout
+        )
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        self.l2.set(key, value, self.l2_timeout(timeout))
+        self.l1.set(
+            key,
+            pickle.dumps(value, self.pickle_protocol),
+            self.l1_timeout_for(timeout),
+        )
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        if not self.l2.add(key, value, self.l2_timeout(timeout)):
+            return False
+        self.l1.set(
+            key,
+            pickle.dumps(value, self.pickle_protocol),
+            self.l1_timeout_for(timeout),
+        )
+        return True
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return self.l2.touch(key, self.l2_timeout(timeout))
+
+    def delete(self, key, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        self.l1.pop(key)
+        deleted = self.l2.delete(key)
+        self.invalidate(key)
+        return deleted
+
+    def incr(self, key, delta=1, version=None):
+        """Счётчик живёт только в L2; приращение атомарно, как в L2."""
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        self.l1.pop(key)
+        return self.l2.incr(key, delta)
+
+    def reload(self, key, default=None, version=None):
+        """Значение из L2 в обход L1; L1 обновляется прочитанным."""
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        value = self.l2.get(key, self._missing_key)
+        if value is self._missing_key:
+            self.l1.pop(key)
+            return default
+        self.l1.set(
+            key, pickle.dumps(value, self.pickle_protocol), self.l1_timeout
+        )
+        return value
+
+    def has_key(self, key, version=None):
+        return self.get(key, self._missing_key, version) is not (
+            self._missing_key
+        )
+
+    def clear(self):
+        self.l2.clear()
+        self.l1.clear(generations=True)
+
+    def l2_timeout(self, timeout):
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def invalidate(self, key):
+        """Записывает удаление в журнал, чтобы его увидели чужие L1."""
+        generation = self.increment(GENERATION_KEY)
+        self.l2.set(
+            INVALIDATION_KEY.format(generation),
+            key,
+            max(self.check_interval * INVALIDATION_LOG_DEPTH, 60),
+        )
+        with self.l1.lock:
+            if self.l1.generation == generation - 1:
+                self.l1.generation = generation
+                return
+        # Были и чужие удаления: разбираем журнал сейчас.
+        self.sync(force=True)
+
+    def sync(self, force=False):
+        """Сверяет поколение L2 и убирает из L1 удалённые ключи."""
+        store = self.l1
+        now = time.monotonic()
+        with store.lock:
+            if not force and now - store.checked < self.check_interval:
+                return
+            store.checked = now
+            known = store.generation
+        current = self.read_generation(GENERATION_KEY)
+        # При первой сверке в L1 только что записанные значения.
+        if known is not None and known != current:
+            self.forget_invalidated(known, current)
+        with store.lock:
+            store.generation = current
+
+    def forget_invalidated(self, known, current):
+        """Убирает из L1 ключи, удалённые после поколения known."""
+        if not 0 < current - known <= INVALIDATION_LOG_DEPTH:
+            self.l1.clear()
+            return
+        log_keys = [
+            INVALIDATION_KEY.format(number)
+            for number in range(known + 1, current + 1)
+        ]
+        removed = self.l2.get_many(log_keys)
+        if len(removed) < len(log_keys):
+            self.l1.clear()
+        else:
+            self.l1.pop(*removed.values())
+
+    def read_generation(self, key):
+        """Поколение из L2; отсутствующее заводится заново.
+
+        Начальное значение — текущее время в миллисекундах: если L2
+        вытеснит счётчик, номера не начнутся сначала и ключи прежних
+        поколений не станут снова читаемыми.
+        """
+        generation = self.l2.get(key)
+        if generation is None:
+            self.l2.add(key, int(time.time() * 1000), None)
+            generation = self.l2.get(key)
+        return generation
+
+    def increment(self, key):
+        try:
+            return self.l2.incr(key)
+        except ValueError:
+            self.read_generation(key)
+            return self.l2.incr(key)
+
+    def generations(self, *names):
+        """Текущие именованные поколения; L2 читается не чаще интервала."""
+        store = self.l1
+        now = time.monotonic()
+        with store.lock:
+            known = {}
+            for name in names:
+                known[name] = store.named.get(name, (0, float('-inf')))
+                if name in store.named:
+                    store.named.move_to_end(name)
+        stale = [
+            name for name, (_, checked) in known.items()
+            if now - checked >= self.check_interval
+        ]
+        if stale:
+            keys = [NAMED_GENERATION_KEY.format(name) for name in stale]
+            found = self.l2.get_many(keys)
+            for key in keys:
+                if key not in found:
+                    found[key] = self.read_generation(key)
+            with store.lock:
+                for name, key in zip(stale, keys):
+                    known[name] = (found[key], now)
+                    store._remember(name, found[key], now)
+        return tuple(known[name][0] for name in names)
+
+    def bump(self, *names):
+        """Увеличивает поколения: ключи с прежними номерами устаревают."""
+        now = time.monotonic()
+        for name in names:
+            generation = self.increment(NAMED_GENERATION_KEY.format(name))
+            with self.l1.lock:
+                self.l1._remember(name, generation, now)
+
+
+class LockedFileBasedCache(FileBasedCache):
+    """Файловый кеш с атомарными add() и incr().
+
+    Проверка и запись идут под блокировкой файла в каталоге кеша,
+    общей для потоков и процессов узла. Там, где django.core.files.locks
+    не умеет блокировать файлы, блокировки нет, как в FileBasedCache.
+    """
+
+    lock_name = 'lock'
+
+    @contextmanager
+    def locked(self):
+        self._createdir()
+        with open(os.path.join(self._dir, self.lock_name), 'ab') as file:
+            locks.lock(file, locks.LOCK_EX)
+            try:
+                yield
+            finally:
+                locks.unlock(file)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        with self.locked():
+            return super().add(key, value, timeout, version)
+
+    def incr(self, key, delta=1, version=None):
+        with self.locked():
+            return super().incr(key, delta, version)
+
+
+class Flight:
+    """Блокировка пересчёта одного ключа внутри процесса."""
+
+    __slots__ = ('lock', '__weakref__')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+
+
+_flights = weakref.WeakValueDictionary()
+_flights_lock = threading.Lock()
+
+
+def get_flight(key):
+    with _flights_lock:
+        flight = _flights.get(key)
+        if flight is None:
+            flight = _flights[key] = Flight()
+        return flight
+
+
+def lease_store(cache):
+    """Аренды нужны всем процессам сразу, поэтому живут в L2.
+
+    Аренду получает тот, чей add() удался, поэтому add() хранилища
+    должен быть атомарным (см. LockedFileBasedCache).
+    """
+    return getattr(cache, 'l2', cache)
+
+
+def is_fresh(entry, version):
+    return (
+        entry is not None and entry[0] == version and time.time() < entry[1]
+    )
+
+
+class Refresh:
+    """Пересчёт одного ключа для get_or_refresh()."""
+
+    def __init__(
+        self, cache, key, compute, version, timeout, stale_timeout,
+        lease_timeout,
+    ):
+        self.cache = cache
+        self.key = key
+        self.compute = compute
+        self.version = version
+        self.timeout = timeout
+        self.stale_timeout = stale_timeout
+        self.lease_timeout = lease_timeout
+        self.leases = lease_store(cache)
+        self.lease_key = LEASE_KEY.format(key)
+        self.flight = get_flight(key)
+
+    def reload(self):
+        return getattr(self.cache, 'reload', self.cache.get)(self.key)
+
+    def store(self):
+        value = self.compute()
+        self.cache.set(
+            self.key,
+            (self.version, time.time() + self.timeout, value),
+            self.timeout + self.stale_timeout,
+        )
+        return value
+
+    def store_leased(self):
+        """Новое значение под арендой; None, если аренда занята."""
+        if not self.leases.add(self.lease_key, True, self.lease_timeout):
+            return None
+        try:
+            entry = self.reload()
+            if is_fresh(entry, self.version):
+                return entry
+            return (self.version, None, self.store())
+        finally:
+            self.leases.delete(self.lease_key)
+
+    def stale(self, entry):
+        """Пересчёт устаревшего значения без ожидания."""
+        if not self.flight.lock.acquire(blocking=False):
+            return entry[2]
+        try:
+            return (self.store_leased() or entry)[2]
+        finally:
+            self.flight.lock.release()
+
+    def missing(self):
+        """Пересчёт отсутствующего значения с ожиданием чужого."""
+        with self.flight.lock:
+            entry = self.reload()
+            if is_fresh(entry, self.version):
+                return entry[2]
+            entry = self.store_leased()
+            if entry is not None:
+                return entry[2]
+            deadline = time.monotonic() + self.lease_timeout
+            while time.monotonic() < deadline:
+                time.sleep(LEASE_POLL_INTERVAL)
+                entry = self.reload()
+                if is_fresh(entry, self.version):
+                    return entry[2]
+            # Держатель аренды не успел: считаем сами.
+            return self.store()
+
+
+def get_or_refresh(
+    key, compute, version=None, timeout=60, stale_timeout=30,
+    lease_timeout=10, cache=None,
+):
+    """Значение ключа с единственным пересчётом и отдачей устаревшего.
+
+    Запись считается свежей timeout секунд и пока version совпадает
+    с версией, с которой её посчитали (например, кортежем поколений).
+    Устаревшую запись ещё stale_timeout секунд отдают всем, кроме
+    одного запроса, получившего блокировку процесса и аренду в L2:
+    он считает новое значение. При промахе остальные потоки процесса
+    ждут на блокировке, а другие процессы — пока держатель аренды
+    не запишет значение, но не дольше lease_timeout. Другие процессы
+    видят аренду, только если L2 у них общий.
+    """
+    cache = cache or default_cache
+    entry = cache.get(key)
+    if is_fresh(entry, version):
+        return entry[2]
+    refresh = Refresh(
+        cache, key, compute, version, timeout, stale_timeout, lease_timeout
+    )
+    if entry is not None:
+        return refresh.stale(entry)
+    return refresh.missing()
@@ -0,0 +1,266 @@
+"""Метрики в текстовом формате Prometheus.
+
+Каждый процесс копит счётчики и гистограммы в памяти. Если задан
+METRICS_DIR, процесс раз в METRICS_FLUSH_INTERVAL секунд и при выходе
+сбрасывает их в METRICS_DIR/<pid>.json, а /metrics суммирует файлы
+всех воркеров узла: опрос любого воркера видит весь узел. Каталог
+нужно очищать перед запуском сервера, иначе в сумму попадут счётчики
+прошлых запусков.
+
+/metrics отдаётся только с заголовком «Authorization: Bearer
+<METRICS_TOKEN>» или на адреса из METRICS_ALLOWED_IPS; без этих
+настроек он закрыт.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+METRICS = {
+    'blogicum_http_requests_total': (
+        'counter', 'Обработанные запросы по маршруту, методу и статусу.'
+    ),
+    'blogicum_http_request_duration_seconds': (
+        'histogram', 'Время обработки запроса по маршруту.'
+    ),
+    'blogicum_db_queries_total': (
+        'counter', 'Запросы к БД по маршруту.'
+    ),
+    'blogicum_cache_requests_total': (
+        'counter', 'Обращения к кешу: попадания и промахи.'
+    ),
+    'blogicum_render_sampled_requests_total': (
+        'counter', 'Запросы, для которых замерялся рендеринг шаблонов.'
+    ),
+    'blogicum_template_renders_total': ('counter', 'Рендеринги шаблона.'),
+    'blogicum_template_render_seconds_total': (
+        'counter',
+        'Собственное время рендеринга шаблона без вложенных шаблонов и тегов.',
+    ),
+    'blogicum_node_renders_total': (
+        'counter', 'Вызовы {% include %} и пользовательских тегов.'
+    ),
+    'blogicum_node_render_seconds_total': (
+        'counter', 'Полное время {% include %} и пользовательских тегов.'
+    ),
+    'blogicum_posts_created_total': ('counter', 'Созданные публикации.'),
+    'blogicum_comments_created_total': ('counter', 'Созданные комментарии.'),
+}
+
+
+class Registry:
+    """Метрики одного процесса.
+
+    Ключ метрики — пара (имя, кортеж пар меток). Гистограмма хранит
+    число наблюдений в каждом интервале, сумму и общее число.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = defaultdict(float)
+        self.histograms = {}
+        self.flushed = time.monotonic()
+
+    def inc(self, name, labels=(), value=1):
+        with self.lock:
+            self.counters[name, labels] += value
+        self.maybe_flush()
+
+    def observe(self, name, labels, value, buckets=LATENCY_BUCKETS):
+        with self.lock:
+            histogram = self.histograms.get((name, labels))
+            if histogram is None:
+                histogram = self.histograms[name, labels] = [
+                    [0] * (len(buckets) + 1), 0.0, list(buckets)
+                ]
+            histogram[0][bisect_left(buckets, value)] += 1
+            histogram[1] += value
+        self.maybe_flush()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'counters': [
+                    [name, list(labels), value]
+                    for (name, labels), value in self.counters.items()
+                ],
+                'histograms': [
+                    [name, list(labels), list(counts), total, buckets]
+                    for (name, labels), (counts, total, buckets)
+                    in self.histograms.items()
+                ],
+            }
+
+    def maybe_flush(self):
+        if not settings.METRICS_DIR:
+            return
+        now = time.monotonic()
+        if now - self.flushed >= settings.METRICS_FLUSH_INTERVAL:
+            self.flushed = now
+            self.flush()
+
+    def flush(self):
+        """Атомарно перезаписывает файл процесса в METRICS_DIR."""
+        directory = Path(settings.METRICS_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'{os.getpid()}.json'
+        temporary = path.with_suffix('.tmp')
+        temporary.write_text(json.dumps(self.snapshot()))
+        os.replace(temporary, path)
+
+
+registry = Registry()
+
+
+@atexit.register
+def _flush_on_exit():
+    if settings.configured and settings.METRICS_DIR:
+        registry.flush()
+
+
+def load_snapshots():
+    """Снимки всех процессов узла; свой берётся из памяти, а не с диска."""
+    snapshots = [registry.snapshot()]
+    if settings.METRICS_DIR:
+        own = f'{os.getpid()}.json'
+        for path in Path(settings.METRICS_DIR).glob('*.json'):
+            if path.name == own:
+                continue
+            try:
+                snapshots.append(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                continue
+    return snapshots
+
+
+def merge(snapshots):
+    counters = defaultdict(float)
+    histograms = {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot['counters']:
+            counters[name, tuple(map(tuple, labels))] += value
+        for name, labels, counts, total, buckets in snapshot['histograms']:
+            key = name, tuple(map(tuple, labels))
+            merged = histograms.setdefault(
+                key, [[0] * len(counts), 0.0, buckets]
+            )
+            merged[0] = [a + b for a, b in zip(merged[0], counts)]
+            merged[1] += total
+    return counters, histograms
+
+
+def format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(
+        '{}="{}"'.format(
+            key,
+            str(value).replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n'),
+        )
+        for key, value in pairs
+    ) + '}'
+
+
+def format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def render(counters, histograms):
+    """Текстовый формат экспозиции Prometheus 0.0.4."""
+    samples = defaultdict(list)
+    for (name, labels), value in sorted(counters.items()):
+        samples[name].append(
+            f'{name}{format_labels(labels)} {format_value(value)}'
+        )
+    for (name, labels), (counts, total, buckets) in sorted(
+        histograms.items()
+    ):
+        cumulative = 0
+        for bound, count in zip(list(buckets) + ['+Inf'], counts):
+            cumulative += count
+            samples[name].append(
+                f'{name}_bucket{format_labels(labels, [("le", bound)])} '
+                f'{cumulative}'
+            )
+        samples[name].append(
+            f'{name}_sum{format_labels(labels)} {format_value(total)}'
+        )
+        samples[name].append(
+            f'{name}_count{format_labels(labels)} {cumulative}'
+        )
+    lines = []
+    for name, (kind, description) in METRICS.items():
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {kind}')
+        lines.extend(samples.pop(name, ()))
+    for name, lines_of_metric in samples.items():
+        lines.append(f'# TYPE {name} untyped')
+        lines.extend(lines_of_metric)
+    return '\n'.join(lines) + '\n'
+
+
+def may_scrape(request):
+    """Доступ к /metrics только по токену или с разрешённого адреса."""
+    token = settings.METRICS_TOKEN
+    if token:
+        header = request.META.get('HTTP_AUTHORIZATION', '')
+        if constant_time_compare(header, f'Bearer {token}'):
+            return True
+    return request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS
+
+
+def metrics_view(request):
+    if not may_scrape(request):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        render(*merge(load_snapshots())),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
+
+
+def record_cache_lookup(alias, hit):
+    registry.inc(
+        'blogicum_cache_requests_total',
+        (('cache', alias), ('result', 'hit' if hit else 'miss')),
+    )
+
+
+class MeteredCacheMixin:
+    """Считает попадания и промахи get и get_many кеш-бэкенда."""
+
+    _missing = object()
+
+    def __init__(self, location, params):
+        super().__init__(location, params)
+        self.metrics_alias = params.get('METRICS_ALIAS', 'default')
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, self._missing, version)
+        record_cache_lookup(self.metrics_alias, value is not self._missing)
+        return default if value is self._missing else value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = super().get_many(keys, version)
+        for key in keys:
+            record_cache_lookup(self.metrics_alias, key in found)
+        return found
+
+
+class MeteredLocMemCache(MeteredCacheMixin, LocMemCache):
+    pass
@@ -0,0 +1,402 @@
+import json
+import logging
+import random
+import secrets
+import struct
+import time
+import zlib
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+
+from . import rendertiming
+from .metrics import registry
+from .serve import get_accepted_encodings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger('blogicum.timing')
+
+# Сколько шаблонов и тегов с наибольшим временем попадает в Server-Timing.
+SERVER_TIMING_TEMPLATES = 5
+
+# Ключ окружения WSGI у запросов прогрева (blog.warmup). Заголовок
+# клиента сюда не попадает: заголовки получают префикс HTTP_.
+WARMUP_ENVIRON_KEY = 'blogicum.warmup'
+
+
+class GzipEncoder:
+    """Потоковый gzip со случайным дополнением заголовка.
+
+    Имя файла (поле FNAME) случайной длины меняет размер ответа от
+    запроса к запросу и мешает атаке BREACH (Heal The Breach).
+    """
+
+    def __init__(self, level=6, max_random_bytes=0):
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+        self.crc = 0
+        self.size = 0
+        flags = 0
+        filename = b''
+        if max_random_bytes:
+            flags = 0x08
+            filename = b'a' * secrets.randbelow(max_random_bytes) + b'\0'
+        self.header = (
+            b'\x1f\x8b\x08' + bytes([flags]) + b'\0\0\0\0\0\xff' + filename
+        )
+
+    def compress(self, data):
+        self.crc = zlib.crc32(data, self.crc)
+        self.size += len(data)
+        output = self.header + self.compressor.compress(data)
+        self.header = b''
+        return output
+
+    def flush(self):
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return (
+            self.header
+            + self.compressor.flush()
+            + struct.pack('<II', self.crc, self.size & 0xffffffff)
+        )
+
+
+class BrotliEncoder:
+
+    def __init__(self, quality=5):
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self.compressor.process(data)
+
+    def flush(self):
+        return self.compressor.flush()
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+class ZstdEncoder:
+
+    def __init__(self, level=3):
+        self.compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def flush(self):
+        return self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+def get_available_encoders():
+    """Кодировки в порядке предпочтения сервера."""
+    encoders = {}
+    if brotli is not None:
+        encoders['br'] = BrotliEncoder
+    if zstandard is not None:
+        encoders['zstd'] = ZstdEncoder
+    encoders['gzip'] = GzipEncoder
+    return encoders
+
+
+class CompressionMiddleware:
+    """Сжимает ответы в br, zstd или gzip, в том числе потоковые.
+
+    Страницы, на которых выдан CSRF-токен, сжимаются только gzip
+    со случайным дополнением заголовка, чтобы защититься от BREACH.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.encoders = get_available_encoders()
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self.is_compressible(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        accepted = get_accepted_encodings(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        if request.META.get('CSRF_COOKIE_USED'):
+            if 'gzip' not in accepted:
+                return response
+            encoding = 'gzip'
+            encoder = GzipEncoder(
+                max_random_bytes=settings.COMPRESSION_MAX_RANDOM_BYTES
+            )
+        else:
+            encoding = next(
+                (name for name in self.encoders if name in accepted), None
+            )
+            if encoding is None:
+                return response
+            encoder = self.encoders[encoding]()
+
+        if response.streaming:
+            response.streaming_content = self.compress_stream(
+                encoder, response.streaming_content
+            )
+            del response['Content-Length']
+        else:
+            content = encoder.compress(response.content) + encoder.finish()
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response['Content-Length'] = str(len(content))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
+
+    def is_compressible(self, response):
+        if response.has_header('Content-Encoding'):
+            return False
+        if response.status_code == 206:
+            return False
+        # Файлы уходят через sendfile или уже сжаты заранее.
+        if getattr(response, 'file_to_stream', None) is not None:
+            return False
+        content_type = response.get('Content-Type', '').split(';')[0]
+        if content_type not in settings.COMPRESSION_CONTENT_TYPES:
+            return False
+        return response.streaming or (
+            len(response.content) >= settings.COMPRESSION_MIN_SIZE
+        )
+
+    @staticmethod
+    def compress_stream(encoder, chunks):
+        for chunk in chunks:
+            output = encoder.compress(chunk) + encoder.flush()
+            if output:
+                yield output
+        yield encoder.finish()
+
+
+class RequestTiming:
+    """Замеры одного запроса; сам служит обёрткой execute_wrapper."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db = 0.0
+        self.queries = 0
+        self.view_started = None
+        self.view = None
+        self.render = None
+        self.total = None
+        self.templates = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - started
+            self.queries += 1
+
+    def finish(self):
+        now = time.perf_counter()
+        self.total = now - self.started
+        if self.view is None and self.view_started is not None:
+            self.view = now - self.view_started
+
+    def metrics(self):
+        """Пары (имя, секунды) для заголовка Server-Timing и лога."""
+        metrics = [('db', self.db)]
+        if self.view is not None:
+            metrics.append(('view', self.view))
+        if self.render is not None:
+            metrics.append(('render', self.render))
+        metrics.append(('total', self.total))
+        return metrics
+
+    def header(self):
+        parts = []
+        for name, seconds in self.metrics():
+            part = f'{name};dur={seconds * 1000:.1f}'
+            if name == 'db':
+                part += f';desc="{self.queries} queries"'
+            parts.append(part)
+        if self.templates is not None:
+            parts.extend(self.template_parts())
+        return ', '.join(parts)
+
+    def template_parts(self):
+        """Шаблоны по собственному времени, include и теги по полному."""
+        templates = self.templates
+        rows = [
+            ('tpl', name, count, own)
+            for name, count, _, own in templates.top(
+                templates.templates, SERVER_TIMING_TEMPLATES, by_self=True
+            )
+        ] + [
+            ('node', key, count, total)
+            for key, count, total, _ in templates.top(
+                templates.nodes, SERVER_TIMING_TEMPLATES
+            )
+        ]
+        for metric, key, count, seconds in rows:
+            description = key.replace('"', "'")
+            yield (
+                f'{metric};dur={seconds * 1000:.1f};'
+                f'desc="{description} x{count}"'
+            )
+
+
+class ServerTimingMiddleware:
+    """Время SQL, представления и рендеринга шаблона для доли запросов.
+
+    Доля задаётся SERVER_TIMING_SAMPLE_RATE. Замеры уходят в заголовок
+    Server-Timing и строкой JSON в лог blogicum.timing, вместе с
+    временем самых затратных шаблонов и тегов (blogicum.rendertiming).
+    Время представления без рендеринга известно только для
+    TemplateResponse; для остальных ответов рендеринг входит во время
+    представления.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rate = settings.SERVER_TIMING_SAMPLE_RATE
+        if rate <= 0 or random.random() >= rate:
+            return self.get_response(request)
+        timing = request.timing = RequestTiming()
+        with ExitStack() as stack:
+            timing.templates = stack.enter_context(rendertiming.collect())
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timing))
+            response = self.get_response(request)
+        timing.finish()
+        response['Server-Timing'] = timing.header()
+        if logger.isEnabledFor(logging.INFO):
+            self.log(request, response, timing)
+        return response
+
+    @staticmethod
+    def log(request, response, timing):
+        match = request.resolver_match
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'queries': timing.queries,
+            **{
+                f'{name}_ms': round(seconds * 1000, 2)
+                for name, seconds in timing.metrics()
+            },
+            **timing.templates.as_dict(),
+        }, ensure_ascii=False))
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timing = getattr(request, 'timing', None)
+        if timing is not None:
+            timing.view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        timing = getattr(request, 'timing', None)
+        if timing is None or timing.view_started is None:
+            return response
+        render_started = time.perf_counter()
+        timing.view = render_started - timing.view_started
+
+        def rendered(response):
+            timing.render = time.perf_counter() - render_started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+
+class QueryCounter:
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class MetricsMiddleware:
+    """Число и время запросов, запросы к БД и рендеринг шаблонов.
+
+    Рендеринг шаблонов и тегов замеряется только для доли запросов
+    METRICS_RENDER_SAMPLE_RATE; их число пишется в
+    blogicum_render_sampled_requests_total. Запросы прогрева
+    не учитываются.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.META.get(WARMUP_ENVIRON_KEY):
+            return self.get_response(request)
+        started = time.perf_counter()
+        queries = QueryCounter()
+        rate = settings.METRICS_RENDER_SAMPLE_RATE
+        templates = None
+        with ExitStack() as stack:
+            if rate > 0 and random.random() < rate:
+                templates = stack.enter_context(rendertiming.collect())
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(queries))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        registry.inc('blogicum_http_requests_total', (
+            ('view', view),
+            ('method', request.method),
+            ('status', str(response.status_code)),
+        ))
+        registry.observe(
+            'blogicum_http_request_duration_seconds',
+            (('view', view),),
+            duration,
+        )
+        if queries.count:
+            registry.inc(
+                'blogicum_db_queries_total', (('view', view),), queries.count
+            )
+        if templates is not None:
+            self.record_templates(templates)
+        return response
+
+    @staticmethod
+    def record_templates(templates):
+        registry.inc('blogicum_render_sampled_requests_total')
+        for kind, table, seconds in (
+            ('template', templates.templates, 3),
+            ('node', templates.nodes, 2),
+        ):
+            for row in templates.top(table):
+                labels = ((kind, row[0]),)
+                registry.inc(f'blogicum_{kind}_renders_total', labels, row[1])
+                registry.inc(
+                    f'blogicum_{kind}_render_seconds_total',
+                    labels,
+                    row[seconds],
+                )
@@ -0,0 +1,109 @@
+"""Обнаружение N+1: одинаковых запросов из одного места за один запрос.
+
+Запросы к БД группируются по нормализованному SQL и месту вызова:
+строке шаблона, если запрос сделан при рендеринге, или строке кода
+проекта. Группа из NPLUSONE_THRESHOLD и более запросов — признак
+ленивой загрузки в цикле. В разработке NPlusOneMiddleware пишет
+предупреждение, с NPLUSONE_RAISE выбрасывает NPlusOneError; в тестах
+это включает маркер nplusone (tests/plugins/nplusone.py).
+"""
+import logging
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.template.base import Node
+
+from .slowqueries import caller_frames, normalize_sql
+
+logger = logging.getLogger('blogicum.nplusone')
+
+
+class NPlusOneError(Exception):
+    pass
+
+
+def find_location():
+    """Строка шаблона или первый кадр кода проекта, сделавший запрос."""
+    # Корень репозитория: код проекта, тесты и бенчмарки.
+    base_dir = str(Path(settings.BASE_DIR).parent)
+    for frame in caller_frames():
+        node = frame.f_locals.get('self')
+        # type() вместо isinstance: isinstance вычислил бы ленивые объекты.
+        if issubclass(type(node), Node) and getattr(node, 'token', None):
+            origin = getattr(node, 'origin', None)
+            name = origin.template_name if origin else '<unknown>'
+            return f'{name}:{node.token.lineno} {node.token.contents}'
+        filename = frame.f_code.co_filename
+        if (
+            filename.startswith(base_dir)
+            and filename != __file__
+            and 'site-packages' not in filename
+        ):
+            return (
+                f'{filename[len(base_dir) + 1:]}:{frame.f_lineno} '
+                f'in {frame.f_code.co_name}'
+            )
+    return '<unknown>'
+
+
+class QueryRecorder:
+    """Обёртка execute_wrapper, считающая SELECT по SQL и месту вызова."""
+
+    def __init__(self):
+        self.queries = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many and sql.lstrip()[:6].upper() == 'SELECT':
+            self.queries[normalize_sql(sql), find_location()] += 1
+        return execute(sql, params, many, context)
+
+    def offenders(self, threshold=None):
+        threshold = threshold or settings.NPLUSONE_THRESHOLD
+        return [
+            (sql, location, count)
+            for (sql, location), count in self.queries.most_common()
+            if count >= threshold
+        ]
+
+
+def format_offenders(offenders):
+    return '\n'.join(
+        f'{count} одинаковых запросов из {location}:\n    {sql}'
+        for sql, location, count in offenders
+    )
+
+
+@contextmanager
+def detect(raise_error=True):
+    """Записывает запросы блока; при N+1 выбрасывает NPlusOneError."""
+    recorder = QueryRecorder()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        yield recorder
+    offenders = recorder.offenders()
+    if offenders and raise_error:
+        raise NPlusOneError(format_offenders(offenders))
+
+
+class NPlusOneMiddleware:
+    """Ищет N+1 в каждом запросе, если включён NPLUSONE_ENABLED."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.NPLUSONE_ENABLED:
+            return self.get_response(request)
+        with detect(raise_error=False) as recorder:
+            response = self.get_response(request)
+        offenders = recorder.offenders()
+        if offenders:
+            message = f'N+1 в {request.path}:\n{format_offenders(offenders)}'
+            if settings.NPLUSONE_RAISE:
+                raise NPlusOneError(message)
+            logger.warning(message)
+        return response
@@ -0,0 +1,238 @@
+"""Профилирование отдельного запроса по требованию сотрудника.
+
+Запрос с подписанным токеном в параметре _profile или заголовке
+X-Profile выполняется под cProfile и/или tracemalloc, если его делает
+сотрудник (is_staff). Токен выдаёт страница admin/profiles/ и действует
+PROFILE_TOKEN_MAX_AGE секунд. Результат пишется в PROFILE_CAPTURE_DIR:
+файл .prof для pstats или snakeviz, снимок tracemalloc и JSON
+с данными запроса и временем рендеринга шаблонов. Там же в админке
+снимки можно скачать.
+"""
+import cProfile
+import io
+import json
+import linecache
+import pstats
+import re
+import secrets
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.conf import settings
+from django.core import signing
+from django.http import FileResponse, Http404
+from django.template.response import TemplateResponse
+from django.utils import timezone
+
+from . import rendertiming
+
+QUERY_PARAM = '_profile'
+HEADER = 'HTTP_X_PROFILE'
+SALT = 'blogicum.profiling'
+MODES = {
+    'cpu': ('cpu',),
+    'memory': ('memory',),
+    'all': ('cpu', 'memory'),
+}
+TOP_LIMIT = 20
+TRACEMALLOC_FRAMES = 10
+CAPTURE_NAME = re.compile(r'^[\w-]+\.(?:prof|tracemalloc|json)$')
+
+# cProfile и tracemalloc глобальны для процесса: одновременно
+# профилируется только один запрос, остальные выполняются как обычно.
+capture_lock = threading.Lock()
+
+
+def make_token(mode='all'):
+    return signing.TimestampSigner(salt=SALT).sign(mode)
+
+
+def read_token(request):
+    """Режим из действующего токена запроса или None."""
+    token = request.GET.get(QUERY_PARAM) or request.META.get(HEADER)
+    if not token:
+        return None
+    try:
+        mode = signing.TimestampSigner(salt=SALT).unsign(
+            token, max_age=settings.PROFILE_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        return None
+    return mode if mode in MODES else None
+
+
+def capture_dir():
+    path = Path(settings.PROFILE_CAPTURE_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def top_functions(profile, limit=TOP_LIMIT):
+    """Строки pstats самых затратных функций по накопленному времени."""
+    output = io.StringIO()
+    stats = pstats.Stats(profile, stream=output)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+    return output.getvalue().strip().splitlines()
+
+
+def top_allocations(snapshot, limit=TOP_LIMIT):
+    lines = []
+    for stat in snapshot.statistics('lineno')[:limit]:
+        frame = stat.traceback[0]
+        source = linecache.getline(frame.filename, frame.lineno).strip()
+        lines.append(
+            f'{frame.filename}:{frame.lineno}: '
+            f'{stat.size / 1024:.1f} KiB в {stat.count} блоках  {source}'
+        )
+    return lines
+
+
+def prune_captures(directory):
+    """Оставляет PROFILE_CAPTURE_KEEP последних снимков."""
+    metadata = sorted(directory.glob('*.json'), reverse=True)
+    for path in metadata[settings.PROFILE_CAPTURE_KEEP:]:
+        for capture_file in directory.glob(f'{path.stem}.*'):
+            capture_file.unlink(missing_ok=True)
+
+
+def top_templates(templates, limit=TOP_LIMIT):
+    rows = [
+        f'{own * 1000:8.1f} мс  x{count:<3} {name}'
+        for name, count, _, own in templates.top(
+            templates.templates, limit, by_self=True
+        )
+    ]
+    rows += [
+        f'{total * 1000:8.1f} мс  x{count:<3} {key}'
+        for key, count, total, _ in templates.top(templates.nodes, limit)
+    ]
+    return rows
+
+
+def save_capture(
+    request, response, mode, duration, profile, snapshot, peak, templates
+):
+    directory = capture_dir()
+    now = timezone.now()
+    capture_id = f'{now:%Y%m%d-%H%M%S}-{secrets.token_hex(4)}'
+    files = []
+    top = {'templates': top_templates(templates)}
+    if profile is not None:
+        profile.dump_stats(directory / f'{capture_id}.prof')
+        files.append(f'{capture_id}.prof')
+        top['cpu'] = top_functions(profile)
+    if snapshot is not None:
+        snapshot.dump(str(directory / f'{capture_id}.tracemalloc'))
+        files.append(f'{capture_id}.tracemalloc')
+        top['memory'] = top_allocations(snapshot)
+    query = request.GET.copy()
+    query.pop(QUERY_PARAM, None)
+    match = request.resolver_match
+    (directory / f'{capture_id}.json').write_text(json.dumps({
+        'id': capture_id,
+        'time': now.isoformat(),
+        'mode': mode,
+        'method': request.method,
+        'path': request.path,
+        'query': query.urlencode(),
+        'view': match.view_name if match else None,
+        'status': response.status_code,
+        'user': request.user.get_username(),
+        'duration_ms': round(duration * 1000, 2),
+        'peak_memory_kib': None if peak is None else round(peak / 1024, 1),
+        **templates.as_dict(),
+        'files': files,
+        'top': top,
+    }, ensure_ascii=False))
+    prune_captures(directory)
+    return capture_id
+
+
+class ProfilingMiddleware:
+    """Профилирует запрос сотрудника с подписанным токеном.
+
+    Должна идти после AuthenticationMiddleware. Сессия читается только
+    для запросов с действующим токеном.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = read_token(request)
+        if mode is None or not request.user.is_staff:
+            return self.get_response(request)
+        if not capture_lock.acquire(blocking=False):
+            response = self.get_response(request)
+            response['X-Profile-Capture'] = 'busy'
+            return response
+        try:
+            return self.profile(request, mode)
+        finally:
+            capture_lock.release()
+
+    def profile(self, request, mode):
+        profile = cProfile.Profile() if 'cpu' in MODES[mode] else None
+        trace_memory = 'memory' in MODES[mode]
+        snapshot = peak = None
+        if trace_memory:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        started = time.perf_counter()
+        try:
+            if profile is not None:
+                profile.enable()
+            try:
+                with rendertiming.collect() as templates:
+                    response = self.get_response(request)
+            finally:
+                if profile is not None:
+                    profile.disable()
+            duration = time.perf_counter() - started
+            if trace_memory:
+                snapshot = tracemalloc.take_snapshot()
+                peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            if trace_memory:
+                tracemalloc.stop()
+        response['X-Profile-Capture'] = save_capture(
+            request, response, mode, duration, profile, snapshot, peak,
+            templates,
+        )
+        return response
+
+
+def iter_captures(directory=None):
+    """Данные снимков, новые первыми."""
+    directory = Path(directory or settings.PROFILE_CAPTURE_DIR)
+    if not directory.exists():
+        return
+    for path in sorted(directory.glob('*.json'), reverse=True):
+        try:
+            yield json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+
+
+def profiles_view(request):
+    """Страница админки со снимками и токенами для новых."""
+    from django.contrib import admin
+
+    return TemplateResponse(request, 'admin/profiles.html', {
+        **admin.site.each_context(request),
+        'title': 'Профили запросов',
+        'query_param': QUERY_PARAM,
+        'tokens': {mode: make_token(mode) for mode in MODES},
+        'token_max_age': settings.PROFILE_TOKEN_MAX_AGE,
+        'captures': list(iter_captures()),
+    })
+
+
+def profile_download_view(request, name):
+    if not CAPTURE_NAME.match(name):
+        raise Http404
+    path = Path(settings.PROFILE_CAPTURE_DIR) / name
+    if not path.is_file():
+        raise Http404
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=name)
@@ -0,0 +1,134 @@
+"""Время рендеринга по шаблонам, {% include %} и пользовательским тегам.
+
+install() оборачивает Template._render, IncludeNode.render и render
+тегов simple_tag и inclusion_tag. Замеры пишутся в сборщик текущего
+запроса, который открывает collect() (он же ставит обёртки при первом
+вызове); вне collect() обёртки лишь вызывают исходный метод. Для
+шаблона считается и собственное время — без вложенных шаблонов и
+тегов: вывод переменных вроде {{ post.text|linebreaksbr }} входит
+именно в него.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.template.base import Template
+from django.template.library import InclusionNode, SimpleNode
+from django.template.loader_tags import IncludeNode
+
+current = ContextVar('render_timings', default=None)
+
+
+class RenderTimings:
+    """Число вызовов, полное и собственное время по ключам."""
+
+    def __init__(self):
+        self.templates = {}
+        self.nodes = {}
+        self.stack = []
+
+    def measure(self, table, key, render, *args):
+        self.stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            return render(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            children = self.stack.pop()
+            if self.stack:
+                self.stack[-1] += elapsed
+            entry = table.setdefault(key, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] += elapsed - children
+
+    @staticmethod
+    def top(table, limit=None, by_self=False):
+        """[(ключ, вызовы, секунды, собственные секунды)] по убыванию."""
+        rows = [(key, *entry) for key, entry in table.items()]
+        rows.sort(key=lambda row: row[3 if by_self else 2], reverse=True)
+        return rows[:limit]
+
+    def as_dict(self):
+        return {
+            kind: {
+                key: {
+                    'count': count,
+                    'total_ms': round(total * 1000, 2),
+                    'self_ms': round(own * 1000, 2),
+                }
+                for key, count, total, own in self.top(table)
+            }
+            for kind, table in (
+                ('templates', self.templates), ('nodes', self.nodes)
+            )
+        }
+
+
+@contextmanager
+def collect():
+    """Сборщик запроса; вложенный вызов возвращает уже открытый."""
+    collector = current.get()
+    if collector is not None:
+        yield collector
+        return
+    install()
+    collector = RenderTimings()
+    token = current.set(collector)
+    try:
+        yield collector
+    finally:
+        current.reset(token)
+
+
+def template_name(template):
+    if template.origin is not None and template.origin.template_name:
+        return str(template.origin.template_name)
+    return template.name or '<string>'
+
+
+def node_key(node):
+    origin = getattr(node, 'origin', None)
+    name = origin.template_name if origin else '<unknown>'
+    return f'{name}:{node.token.lineno} {node.token.contents}'
+
+
+def wrap_template_render(render):
+
+    def _render(self, context):
+        collector = current.get()
+        if collector is None:
+            return render(self, context)
+        return collector.measure(
+            collector.templates, template_name(self), render, self, context
+        )
+
+    _render.original = render
+    return _render
+
+
+def wrap_node_render(render):
+
+    def node_render(self, context):
+        collector = current.get()
+        if collector is None or getattr(self, 'token', None) is None:
+            return render(self, context)
+        return collector.measure(
+            collector.nodes, node_key(self), render, self, context
+        )
+
+    node_render.original = render
+    return node_render
+
+
+def install():
+    """Ставит обёртки; повторный вызов ничего не меняет.
+
+    Окружение тестов Django подменяет Template._render своей версией,
+    поэтому collect() вызывает install() заново и оборачивает её.
+    """
+    if not hasattr(Template._render, 'original'):
+        Template._render = wrap_template_render(Template._render)
+    for node_class in (IncludeNode, SimpleNode, InclusionNode):
+        if not hasattr(node_class.render, 'original'):
+            node_class.render = wrap_node_render(node_class.render)
@@ -0,0 +1,253 @@
+"""Отдача загруженных пользователями файлов и статики в production.
+
+Файл либо передаётся фронтенд-серверу через X-Sendfile/X-Accel-Redirect,
+либо отдаётся через FileResponse: WSGI-сервер с wsgi.file_wrapper
+(например, gunicorn) отправит его через os.sendfile без копирования
+в Python.
+"""
+import mimetypes
+import re
+from pathlib import Path
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseNotModified,
+)
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_etags
+from django.views.static import was_modified_since
+
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{8,}\.[^./]+$')
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+PRECOMPRESSED_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+class RangeFile:
+    """Файл, чтение из которого ограничено диапазоном байт.
+
+    fileno() отдаёт дескриптор исходного файла, уже сдвинутый на начало
+    диапазона, поэтому sendfile в WSGI-сервере тоже работает.
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """Возвращает (start, end) для одного диапазона или None.
+
+    Несколько диапазонов не поддерживаются: такой запрос
+    получит файл целиком, что допускает RFC 7233.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    start, end = match.groups()
+    if not start:
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    if start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def get_cache_control(path, max_age, hashed_names=False):
+    """Cache-Control файла.
+
+    Неизменяемыми считаются только имена с хешем содержимого, которые
+    даёт ManifestStaticFilesStorage. Имена медиафайлов выбирают
+    пользователи, и после clean_media имя может достаться другому файлу.
+    """
+    if hashed_names and HASHED_NAME_RE.search(path):
+        return f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    return f'public, max-age={max_age}'
+
+
+def get_accepted_encodings(header):
+    """Возвращает кодировки из Accept-Encoding, кроме запрещённых q=0."""
+    accepted = set()
+    for item in header.split(','):
+        coding, _, params = item.partition(';')
+        params = params.replace(' ', '')
+        if params.startswith('q='):
+            try:
+                if float(params[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def find_precompressed(request, fullpath):
+    """Выбирает предсжатую копию файла по Accept-Encoding."""
+    accepted = get_accepted_encodings(
+        request.META.get('HTTP_ACCEPT_ENCODING', '')
+    )
+    for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+        if encoding in accepted:
+            variant = fullpath.with_name(fullpath.name + suffix)
+            if variant.is_file():
+                return variant, encoding
+    return fullpath, None
+
+
+def pick_variant(request, fullpath, path, encoding):
+    """Путь и кодировка предсжатой копии, если клиент её принимает."""
+    variant, variant_encoding = find_precompressed(request, fullpath)
+    if variant_encoding:
+        return variant, path + variant.suffix, variant_encoding
+    return fullpath, path, encoding
+
+
+def is_not_modified(request, etag, mtime):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match is not None:
+        etags = parse_etags(if_none_match)
+        return '*' in etags or etag in etags
+    return not was_modified_since(
+        request.META.get('HTTP_IF_MODIFIED_SINCE'), mtime
+    )
+
+
+def sendfile_response(path, fullpath, content_type):
+    """Пустой ответ, передачу файла выполнит фронтенд-сервер."""
+    header = settings.MEDIA_SENDFILE_HEADER
+    response = HttpResponse(content_type=content_type)
+    if header == 'X-Accel-Redirect':
+        response[header] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + quote(path)
+    else:
+        response[header] = str(fullpath)
+    return response
+
+
+def serve_file(
+    request, path, document_root, max_age,
+    precompressed=False, sendfile=False, hashed_names=False
+):
+    """Отдаёт файл с поддержкой ETag, If-Modified-Since и Range.
+
+    С precompressed=True вместо файла отдаётся его .br или .gz копия,
+    если клиент её принимает. С sendfile=True передача делегируется
+    фронтенд-серверу, если задан MEDIA_SENDFILE_HEADER. С
+    hashed_names=True файлы с хешем в имени кешируются на год.
+    """
+    fullpath = Path(safe_join(document_root, path))
+    if not fullpath.is_file():
+        raise Http404
+    filename = fullpath.name
+    content_type, encoding = mimetypes.guess_type(filename)
+    content_type = content_type or 'application/octet-stream'
+    headers = {
+        'Cache-Control': get_cache_control(path, max_age, hashed_names),
+        'Accept-Ranges': 'bytes',
+    }
+    if precompressed:
+        headers['Vary'] = 'Accept-Encoding'
+        fullpath, path, encoding = pick_variant(
+            request, fullpath, path, encoding
+        )
+    stat = fullpath.stat()
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    headers['ETag'] = etag
+    headers['Last-Modified'] = http_date(stat.st_mtime)
+    if encoding:
+        headers['Content-Encoding'] = encoding
+
+    if is_not_modified(request, etag, stat.st_mtime):
+        return with_headers(HttpResponseNotModified(), headers)
+
+    if sendfile and settings.MEDIA_SENDFILE_HEADER:
+        return with_headers(
+            sendfile_response(path, fullpath, content_type), headers
+        )
+
+    try:
+        byte_range = requested_range(request, etag, stat.st_size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return response
+    return with_headers(
+        file_response(
+            fullpath, filename, content_type, byte_range, stat.st_size
+        ),
+        headers,
+    )
+
+
+def with_headers(response, headers):
+    for header, value in headers.items():
+        response[header] = value
+    return response
+
+
+def requested_range(request, etag, size):
+    """Диапазон из заголовка Range или None, если нужен весь файл."""
+    range_header = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if range_header and (if_range is None or if_range == etag):
+        return parse_range(range_header, size)
+    return None
+
+
+def file_response(fullpath, filename, content_type, byte_range, size):
+    file = fullpath.open('rb')
+    if byte_range is None:
+        return FileResponse(
+            file, content_type=content_type, filename=filename
+        )
+    start, end = byte_range
+    length = end - start + 1
+    response = FileResponse(
+        RangeFile(file, start, length),
+        content_type=content_type,
+        filename=filename,
+        status=206
+    )
+    response['Content-Length'] = length
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
+
+
+def serve_media(request, path):
+    return serve_file(
+        request,
+        path,
+        settings.MEDIA_ROOT,
+        settings.MEDIA_CACHE_MAX_AGE,
+        sendfile=True
+    )
+
+
+def serve_static(request, path):
+    return serve_file(
+        request,
+        path,
+        settings.STATIC_ROOT,
+        settings.STATIC_CACHE_MAX_AGE,
+        precompressed=True,
+        hashed_names=True
+    )
@@ -0,0 +1,46 @@
+"""Удаление просроченных сессий небольшими транзакциями.
+
+clearsessions удаляет все просроченные строки django_session одним
+DELETE, который на большой таблице надолго блокирует запись. Здесь
+ключи выбираются по индексу expire_date пачками, каждая пачка
+удаляется своей транзакцией, а между пачками можно сделать паузу,
+чтобы запросы пользователей успевали записать свои сессии.
+"""
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.db import transaction
+from django.utils import timezone
+
+DB_ENGINES = (
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+)
+
+
+def purge_expired(batch_size=1000, pause=0.0, now=None, progress=None):
+    """Удаляет сессии, истёкшие к now, и возвращает их число.
+
+    Для движков без таблицы сессий вызывает clear_expired() движка.
+    """
+    if settings.SESSION_ENGINE not in DB_ENGINES:
+        import_module(settings.SESSION_ENGINE).SessionStore.clear_expired()
+        return 0
+    now = now or timezone.now()
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            keys = list(
+                Session.objects.filter(expire_date__lt=now)
+                .order_by('expire_date')
+                .values_list('session_key', flat=True)[:batch_size]
+            )
+            if not keys:
+                return deleted
+            deleted += Session.objects.filter(session_key__in=keys).delete()[0]
+        if progress:
+            progress(deleted)
+        if pause:
+            time.sleep(pause)
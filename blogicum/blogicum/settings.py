@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 ALLOWED_HOSTS = ['localhost', '127.0.0.1']
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -26,12 +29,15 @@ STATICFILES_DIRS = [BASE_DIR / 'static_dev']
 SECRET_KEY = 'django-insecure-i0)s6rx%@@3pc7sc1o5&m=ri8752kp2_=3hc!(ibs4_vvan_(n'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.getenv('DJANGO_DEBUG', 'True') == 'True'
+
+# Set BLOGICUM_ADMIN=0 on nodes that do not serve the admin site to skip
+# importing django.contrib.admin at startup.
+ADMIN_ENABLED = os.getenv('BLOGICUM_ADMIN', '1') == '1'
 
 INSTALLED_APPS = [
     'blog.apps.BlogConfig',
     'pages.apps.PagesConfig',
-    'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -40,26 +46,50 @@ INSTALLED_APPS = [
     'django_bootstrap5',
 ]
 
+if ADMIN_ENABLED:
+    INSTALLED_APPS.append('django.contrib.admin')
+
 MIDDLEWARE = [
+    'blogicum.middleware.MetricsMiddleware',
+    'blogicum.middleware.ServerTimingMiddleware',
+    'blogicum.nplusone.NPlusOneMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'blogicum.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'blogicum.auth.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'blogicum.profiling.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'blogicum.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
 
+# Keep compiled templates in memory; on by default when DEBUG is off.
+TEMPLATE_CACHE = os.getenv('DJANGO_TEMPLATE_CACHE', str(not DEBUG)) == 'True'
+
+# Compile every template when a WSGI/ASGI worker starts.
+TEMPLATE_PRECOMPILE = TEMPLATE_CACHE
+
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+if TEMPLATE_CACHE:
+    TEMPLATE_LOADERS = [
+        ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+    ]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -80,7 +110,7 @@ WSGI_APPLICATION = 'blogicum.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.getenv('DJANGO_DB_NAME', BASE_DIR / 'db.sqlite3'),
     }
 }
 
@@ -123,6 +153,19 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+STATIC_ROOT = BASE_DIR / 'static'
+
+# Fingerprinted, gzip/brotli precompressed static files served by
+# blogicum.serve.serve_static; requires `manage.py collectstatic`.
+STATIC_MANIFEST = os.getenv('DJANGO_STATIC_MANIFEST') == '1'
+
+if STATIC_MANIFEST:
+    STATICFILES_STORAGE = (
+        'blogicum.storage.CompressedManifestStaticFilesStorage'
+    )
+
+STATIC_CACHE_MAX_AGE = 60 * 60
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -134,8 +177,195 @@ CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+MEDIA_URL = '/media/'
+
+# Delegate file transfer to the front-end server: 'X-Sendfile' (Apache,
+# lighttpd) or 'X-Accel-Redirect' (nginx, see MEDIA_ACCEL_REDIRECT_PREFIX).
+MEDIA_SENDFILE_HEADER = None
+
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+
+MEDIA_CACHE_MAX_AGE = 60 * 60
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
 PAGINATION_COUNT = 10
+
+# Page links shown around the current page and at both ends of the range.
+PAGINATION_ON_EACH_SIDE = 2
+
+PAGINATION_ON_ENDS = 1
+
+# Run blog.warmup when a WSGI/ASGI worker starts (it also compiles the
+# templates). It renders pages and queries the database.
+WARMUP_ON_START = os.getenv('BLOGICUM_WARMUP') == '1'
+
+WARMUP_PAGES = 3
+
+COMPRESSION_MIN_SIZE = 512
+
+COMPRESSION_CONTENT_TYPES = (
+    'text/html',
+    'text/plain',
+    'text/css',
+    'text/javascript',
+    'application/javascript',
+    'application/json',
+    'application/xml',
+    'image/svg+xml',
+)
+
+# Upper bound of random gzip header padding on CSRF-bearing pages (BREACH).
+COMPRESSION_MAX_RANDOM_BYTES = 100
+
+# Share of requests measured by ServerTimingMiddleware, from 0 to 1.
+SERVER_TIMING_SAMPLE_RATE = float(
+    os.getenv('BLOGICUM_SERVER_TIMING_RATE', '0')
+)
+
+# Log queries slower than this to SLOW_QUERY_LOG with their plan; 0 disables.
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv('BLOGICUM_SLOW_QUERY_MS', '0'))
+
+SLOW_QUERY_LOG = BASE_DIR / 'logs' / 'slow_queries.log'
+
+SLOW_QUERY_LOG_MAX_BYTES = 10 * 1024 * 1024
+
+SLOW_QUERY_LOG_BACKUPS = 5
+
+# Metrics are collected by default, but /metrics denies every request
+# until METRICS_TOKEN or METRICS_ALLOWED_IPS is set.
+METRICS_ENABLED = os.getenv('BLOGICUM_METRICS', '1') == '1'
+
+# Share of requests whose template and tag render times go to /metrics.
+# Only these requests pay for wrapping every render (benchmarks.metrics).
+METRICS_RENDER_SAMPLE_RATE = float(
+    os.getenv('BLOGICUM_METRICS_RENDER_RATE', '0.1')
+)
+
+# Shared directory for per-worker metric files of a prefork server;
+# clear it before the server starts. None keeps metrics per process.
+METRICS_DIR = os.getenv('BLOGICUM_METRICS_DIR')
+
+METRICS_FLUSH_INTERVAL = 5
+
+# Scrapers send "Authorization: Bearer <METRICS_TOKEN>".
+METRICS_TOKEN = os.getenv('BLOGICUM_METRICS_TOKEN')
+
+# Addresses allowed to scrape /metrics without the token. Behind a reverse
+# proxy every client has the proxy's address, so list addresses only when
+# the application server is reachable directly by the scraper alone.
+METRICS_ALLOWED_IPS = tuple(filter(None, os.getenv(
+    'BLOGICUM_METRICS_ALLOWED_IPS', ''
+).split(',')))
+
+# The shared cache (L2) is a directory visible to all workers of a node
+# when BLOGICUM_CACHE_DIR is set, and per-process memory otherwise: then
+# invalidations and refresh leases of the default cache stay within one
+# process. Point it to memcached or redis to share it between nodes; the
+# backend must implement add() and incr() atomically.
+CACHE_DIR = os.getenv('BLOGICUM_CACHE_DIR')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'blogicum.cache.TieredCache',
+        'LOCATION': 'shared',
+        'OPTIONS': {
+            'L1_MAX_ENTRIES': 10000,
+            'L1_MAX_BYTES': 64 * 1024 * 1024,
+            'L1_TIMEOUT': 5,
+            'GENERATION_CHECK_INTERVAL': 1,
+        },
+    },
+    'shared': {
+        'BACKEND': 'blogicum.metrics.MeteredLocMemCache',
+        'METRICS_ALIAS': 'shared',
+    } if CACHE_DIR is None else {
+        'BACKEND': 'blogicum.cache.LockedFileBasedCache',
+        'LOCATION': CACHE_DIR,
+    },
+}
+
+# Session storage: 'cached_db' reads sessions from the cache and falls back
+# to the database; 'cache' and 'signed_cookies' never touch the database,
+# but sessions are lost with the cache or cannot be revoked on the server.
+# The cache modes need a 'shared' cache visible to every worker: with a
+# per-process one, a session deleted on logout stays valid in the caches
+# of the other workers.
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+
+SESSION_MODE = os.getenv('BLOGICUM_SESSION_MODE', 'db')
+
+SESSION_ENGINE = SESSION_ENGINES[SESSION_MODE]
+
+# Sessions change often; keep them out of the in-process L1.
+SESSION_CACHE_ALIAS = 'shared'
+
+PROCESS_LOCAL_CACHES = (
+    'blogicum.metrics.MeteredLocMemCache',
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+if (
+    SESSION_MODE in ('cache', 'cached_db')
+    and CACHES[SESSION_CACHE_ALIAS]['BACKEND'] in PROCESS_LOCAL_CACHES
+):
+    raise ImproperlyConfigured(
+        f'BLOGICUM_SESSION_MODE={SESSION_MODE} needs a cache shared by all '
+        'workers: set BLOGICUM_CACHE_DIR or point the "shared" cache to '
+        'memcached or redis.'
+    )
+
+# Seconds blogicum.auth keeps the signed-in user in the cache; 0 disables.
+AUTH_USER_CACHE_TTL = 60
+
+# Anonymous post pages are cached for POST_PAGE_CACHE_TIMEOUT seconds and,
+# once stale or invalidated, served for POST_PAGE_STALE_TIMEOUT more while
+# a single request renders the new version.
+POST_PAGE_CACHE_TIMEOUT = 60
+
+POST_PAGE_STALE_TIMEOUT = 30
+
+# The same for pages of the feed, category and profile post lists
+# (blog.postcache).
+POST_LIST_CACHE_TIMEOUT = 60
+
+POST_LIST_STALE_TIMEOUT = 30
+
+# Report SELECTs repeated NPLUSONE_THRESHOLD times from one template line
+# or code location within a request; NPLUSONE_RAISE turns it into an error.
+NPLUSONE_ENABLED = DEBUG
+
+NPLUSONE_RAISE = False
+
+NPLUSONE_THRESHOLD = 2
+
+# Captures of requests profiled by staff with a token from admin/profiles/.
+PROFILE_CAPTURE_DIR = BASE_DIR / 'logs' / 'profiles'
+
+PROFILE_CAPTURE_KEEP = 50
+
+PROFILE_TOKEN_MAX_AGE = 60 * 60
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'blogicum': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
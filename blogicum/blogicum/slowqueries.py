@@ -0,0 +1,238 @@
+"""Журнал медленных SQL-запросов с планом выполнения.
+
+Обёртка execute_wrapper ставится на каждое соединение с БД, если задан
+SLOW_QUERY_THRESHOLD_MS. Запросы дольше порога пишутся строкой JSON
+в ротируемый файл SLOW_QUERY_LOG: нормализованный SQL, параметры,
+представление, место вызова в коде проекта и план из EXPLAIN QUERY PLAN.
+Строки и байты среди параметров — пароли, сессии, почта — заменяются
+типом и длиной.
+Страница admin/slow-queries/ показывает самые затратные запросы.
+"""
+import json
+import logging
+import re
+import sys
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.backends.utils import CursorWrapper
+from django.http import HttpRequest
+from django.template.response import TemplateResponse
+from django.utils import timezone
+
+logger = logging.getLogger('blogicum.slow_queries')
+
+TOP_LIMIT = 50
+# Параметры, которые пишутся в журнал как есть.
+PLAIN_PARAM_TYPES = (
+    type(None), bool, int, float, Decimal, date, datetime, timedelta
+)
+EXECUTE_WITH_WRAPPERS = CursorWrapper._execute_with_wrappers.__code__
+NORMALIZE_PATTERNS = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    # Имена точек сохранения Django: s<id потока>_x<номер>.
+    (re.compile(r'"s\d+_x\d+"'), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+)
+
+
+def normalize_sql(sql):
+    """SQL без литералов и параметров для группировки одинаковых запросов."""
+    for pattern, replacement in NORMALIZE_PATTERNS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def caller_frames():
+    """Кадры стека снаружи от цепочки обёрток execute_wrapper.
+
+    Сами обёртки (и чужие, например из middleware) местом вызова
+    запроса не считаются.
+    """
+    frame = sys._getframe(1)
+    while frame is not None:
+        if frame.f_code is EXECUTE_WITH_WRAPPERS:
+            frame = frame.f_back
+            break
+        frame = frame.f_back
+    while frame is not None:
+        yield frame
+        frame = frame.f_back
+
+
+def find_caller():
+    """Представление запроса и первый кадр стека из кода проекта."""
+    base_dir = str(settings.BASE_DIR)
+    view = frame_info = None
+    for frame in caller_frames():
+        if view is not None and frame_info is not None:
+            break
+        filename = frame.f_code.co_filename
+        if (
+            frame_info is None
+            and filename.startswith(base_dir)
+            and filename != __file__
+            and 'site-packages' not in filename
+        ):
+            frame_info = (
+                f'{filename[len(base_dir) + 1:]}:{frame.f_lineno} '
+                f'in {frame.f_code.co_name}'
+            )
+        request = frame.f_locals.get('request')
+        if view is None and issubclass(type(request), HttpRequest):
+            match = request.resolver_match
+            if match is not None:
+                view = match.view_name
+    return view, frame_info
+
+
+def explain(connection, sql, params):
+    """План запроса; курсор без обёрток, чтобы не зациклиться."""
+    prefix = (
+        'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+    )
+    cursor = connection.create_cursor()
+    try:
+        cursor.execute(prefix + sql, params)
+        return [str(row[-1]) for row in cursor.fetchall()]
+    except Exception as error:
+        return [f'EXPLAIN не выполнен: {error}']
+    finally:
+        cursor.close()
+
+
+def log_slow_query(execute, sql, params, many, context):
+    started = time.perf_counter()
+    result = execute(sql, params, many, context)
+    duration = (time.perf_counter() - started) * 1000
+    threshold = settings.SLOW_QUERY_THRESHOLD_MS
+    if threshold and duration >= threshold:
+        record_slow_query(context['connection'], sql, params, many, duration)
+    return result
+
+
+def describe_param(param):
+    """Параметр для журнала: значения строк и байтов не раскрываются."""
+    if isinstance(param, PLAIN_PARAM_TYPES):
+        return repr(param)
+    try:
+        return f'<{type(param).__name__} len={len(param)}>'
+    except TypeError:
+        return f'<{type(param).__name__}>'
+
+
+def record_slow_query(connection, sql, params, many, duration):
+    view, frame = find_caller()
+    plan = None
+    if not many and sql.lstrip()[:6].upper() == 'SELECT':
+        plan = explain(connection, sql, params)
+    logger.warning(json.dumps({
+        'time': timezone.now().isoformat(),
+        'duration_ms': round(duration, 2),
+        'sql': normalize_sql(sql),
+        'params': None if many else [
+            describe_param(param) for param in params or ()
+        ],
+        'view': view,
+        'frame': frame,
+        'plan': plan,
+    }, ensure_ascii=False))
+
+
+def add_wrapper(sender=None, connection=None, **kwargs):
+    if log_slow_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(log_slow_query)
+
+
+def install():
+    """Пишет журнал в SLOW_QUERY_LOG и оборачивает все соединения."""
+    path = Path(settings.SLOW_QUERY_LOG)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if not any(
+        getattr(handler, 'baseFilename', None) == str(path)
+        for handler in logger.handlers
+    ):
+        handler = RotatingFileHandler(
+            path,
+            maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+            backupCount=settings.SLOW_QUERY_LOG_BACKUPS,
+            encoding='utf-8',
+        )
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.WARNING)
+        logger.propagate = False
+    connection_created.connect(add_wrapper)
+    for connection in connections.all():
+        add_wrapper(connection=connection)
+
+
+def iter_entries(path=None):
+    """Записи текущего журнала и его ротированных копий."""
+    path = Path(path or settings.SLOW_QUERY_LOG)
+    files = [path] + [
+        path.with_name(f'{path.name}.{number}')
+        for number in range(1, settings.SLOW_QUERY_LOG_BACKUPS + 1)
+    ]
+    for log_file in files:
+        if not log_file.exists():
+            continue
+        with open(log_file, encoding='utf-8') as lines:
+            for line in lines:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def top_offenders(entries, limit=TOP_LIMIT):
+    """Запросы, сгруппированные по SQL, по убыванию суммарного времени."""
+    groups = defaultdict(lambda: {
+        'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'views': set()
+    })
+    for entry in entries:
+        group = groups[entry['sql']]
+        group['count'] += 1
+        group['total_ms'] += entry['duration_ms']
+        if entry['duration_ms'] >= group['max_ms']:
+            group.update(
+                max_ms=entry['duration_ms'],
+                params=entry['params'],
+                frame=entry['frame'],
+                plan=entry['plan'],
+            )
+        if entry['view']:
+            group['views'].add(entry['view'])
+    offenders = [
+        {
+            'sql': sql,
+            'mean_ms': group['total_ms'] / group['count'],
+            **group,
+            'views': sorted(group['views']),
+        }
+        for sql, group in groups.items()
+    ]
+    offenders.sort(key=lambda offender: offender['total_ms'], reverse=True)
+    return offenders[:limit]
+
+
+def slow_queries_view(request):
+    """Страница админки с самыми затратными запросами."""
+    from django.contrib import admin
+
+    return TemplateResponse(request, 'admin/slow_queries.html', {
+        **admin.site.each_context(request),
+        'title': 'Медленные запросы',
+        'threshold_ms': settings.SLOW_QUERY_THRESHOLD_MS,
+        'offenders': top_offenders(iter_entries()),
+    })
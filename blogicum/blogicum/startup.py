@@ -0,0 +1,230 @@
+"""Профилирование холодного старта manage.py и WSGI/ASGI-воркеров.
+
+Включается переменной окружения BLOGICUM_PROFILE_STARTUP с путём
+к каталогу отчётов. Записывает время импорта каждого модуля (собственное
+и вместе с вложенными импортами), время ready() каждого приложения
+и время вычисления настроек::
+
+    BLOGICUM_PROFILE_STARTUP=/tmp/boot python manage.py check
+    python -m blogicum.startup compare old.json new.json
+"""
+import argparse
+import importlib.abc
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+ENV_VAR = 'BLOGICUM_PROFILE_STARTUP'
+REPORT_LIMIT = 40
+
+
+class TimedLoader:
+    """Обёртка загрузчика, замеряющая exec_module модуля."""
+
+    def __init__(self, loader, profiler):
+        self.loader = loader
+        self.profiler = profiler
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        with self.profiler.measure_import(module.__name__):
+            self.loader.exec_module(module)
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+
+class ImportTimer(importlib.abc.MetaPathFinder):
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(
+                spec.loader, 'exec_module'
+            ):
+                spec.loader = TimedLoader(spec.loader, self.profiler)
+            return spec
+        return None
+
+
+class _Measure:
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        self.profiler.stack.append(0.0)
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.started
+        nested = self.profiler.stack.pop()
+        if self.profiler.stack:
+            self.profiler.stack[-1] += elapsed
+        self.profiler.imports[self.name] = {
+            'self': elapsed - nested,
+            'cumulative': elapsed,
+        }
+
+
+class StartupProfiler:
+
+    def __init__(self, label, report_dir):
+        self.label = label
+        self.report_dir = Path(report_dir)
+        self.imports = {}
+        self.apps = {}
+        self.phases = {}
+        self.stack = []
+        self.started = time.perf_counter()
+        self.finder = ImportTimer(self)
+        self.finished = False
+
+    def measure_import(self, name):
+        return _Measure(self, name)
+
+    def timed(self, storage, name, func):
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                storage[name] = time.perf_counter() - started
+        return wrapper
+
+    def install(self, finish_on_setup=False):
+        sys.meta_path.insert(0, self.finder)
+
+        import django
+        from django.apps.config import AppConfig
+        from django.conf import LazySettings
+
+        LazySettings._setup = self.timed(
+            self.phases, 'settings', LazySettings._setup
+        )
+        create = AppConfig.create.__func__
+
+        def create_app_config(cls, entry):
+            app_config = create(cls, entry)
+            app_config.ready = self.timed(
+                self.apps, app_config.label, app_config.ready
+            )
+            return app_config
+
+        AppConfig.create = classmethod(create_app_config)
+
+        setup = self.timed(self.phases, 'django.setup', django.setup)
+
+        def setup_and_report(*args, **kwargs):
+            setup(*args, **kwargs)
+            if finish_on_setup:
+                self.finish()
+
+        django.setup = setup_and_report
+
+    def finish(self):
+        if self.finished:
+            return None
+        self.finished = True
+        self.phases['total'] = time.perf_counter() - self.started
+        if self.finder in sys.meta_path:
+            sys.meta_path.remove(self.finder)
+        report = {
+            'label': self.label,
+            'phases': self.phases,
+            'apps': self.apps,
+            'imports': self.imports,
+        }
+        self.report_dir.mkdir(parents=True, exist_ok=True)
+        path = self.report_dir / f'{self.label}.json'
+        path.write_text(json.dumps(report, indent=2))
+        path.with_suffix('.txt').write_text(format_report(report))
+        return path
+
+
+def format_report(report, limit=REPORT_LIMIT):
+    lines = [f'Старт {report["label"]}']
+    for name, seconds in report['phases'].items():
+        lines.append(f'{seconds * 1000:10.1f} мс  {name}')
+    lines.append('')
+    lines.append('ready() приложений:')
+    for name, seconds in sorted(
+        report['apps'].items(), key=lambda item: item[1], reverse=True
+    ):
+        lines.append(f'{seconds * 1000:10.1f} мс  {name}')
+    lines.append('')
+    lines.append('Импорт модулей (собственное / суммарное время):')
+    imports = sorted(
+        report['imports'].items(),
+        key=lambda item: item[1]['cumulative'],
+        reverse=True
+    )
+    for name, timing in imports[:limit]:
+        lines.append(
+            f'{timing["self"] * 1000:10.1f} / '
+            f'{timing["cumulative"] * 1000:8.1f} мс  {name}'
+        )
+    return '\n'.join(lines) + '\n'
+
+
+def compare_reports(old, new, limit=REPORT_LIMIT):
+    """Текстовое сравнение двух отчётов по суммарному времени импорта."""
+    lines = []
+    for name in sorted(set(old['phases']) | set(new['phases'])):
+        before = old['phases'].get(name, 0) * 1000
+        after = new['phases'].get(name, 0) * 1000
+        lines.append(
+            f'{before:10.1f} {after:10.1f} {after - before:+10.1f} мс  {name}'
+        )
+    lines.append('')
+    deltas = []
+    for name in set(old['imports']) | set(new['imports']):
+        before = old['imports'].get(name, {}).get('cumulative', 0)
+        after = new['imports'].get(name, {}).get('cumulative', 0)
+        deltas.append((after - before, before, after, name))
+    deltas.sort(key=lambda item: abs(item[0]), reverse=True)
+    for delta, before, after, name in deltas[:limit]:
+        lines.append(
+            f'{before * 1000:10.1f} {after * 1000:10.1f} '
+            f'{delta * 1000:+10.1f} мс  {name}'
+        )
+    return '\n'.join(lines) + '\n'
+
+
+def install(label, finish_on_setup=False):
+    """Включает профилировщик, если задан BLOGICUM_PROFILE_STARTUP."""
+    report_dir = os.environ.get(ENV_VAR)
+    if not report_dir:
+        return None
+    profiler = StartupProfiler(label, report_dir)
+    profiler.install(finish_on_setup=finish_on_setup)
+    return profiler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Сравнение отчётов старта.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    compare = subparsers.add_parser('compare')
+    compare.add_argument('old')
+    compare.add_argument('new')
+    compare.add_argument('--limit', type=int, default=REPORT_LIMIT)
+    args = parser.parse_args()
+    old = json.loads(Path(args.old).read_text())
+    new = json.loads(Path(args.new).read_text())
+    sys.stdout.write(compare_reports(old, new, args.limit))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Хранилище статики с хешами в именах и предсжатыми копиями."""
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.map', '.svg', '.ico', '.json', '.txt', '.html', '.xml',
+)
+MIN_COMPRESS_SIZE = 256
+
+
+def get_encoders():
+    encoders = {'.gz': lambda data: gzip.compress(data, 9, mtime=0)}
+    if brotli is not None:
+        encoders['.br'] = lambda data: brotli.compress(data, quality=11)
+    return encoders
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest-хранилище, которое сжимает файлы при collectstatic.
+
+    Рядом с каждым файлом с хешем в имени кладутся name.gz и, если
+    установлен пакет brotli, name.br. Копия сохраняется, только если
+    она заметно меньше оригинала.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        encoders = get_encoders()
+        for hashed_name in set(self.hashed_files.values()):
+            if not hashed_name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            with self.open(hashed_name) as original:
+                data = original.read()
+            if len(data) < MIN_COMPRESS_SIZE:
+                continue
+            for suffix, encode in encoders.items():
+                compressed = encode(data)
+                if len(compressed) > len(data) * 0.9:
+                    continue
+                compressed_name = hashed_name + suffix
+                if self.exists(compressed_name):
+                    self.delete(compressed_name)
+                self._save(compressed_name, ContentFile(compressed))
+                yield hashed_name, compressed_name, True
@@ -0,0 +1,65 @@
+"""Предварительная компиляция шаблонов при старте воркера.
+
+С кешируемым загрузчиком (TEMPLATE_CACHE) скомпилированные шаблоны
+остаются в памяти процесса, и первые запросы не платят за разбор
+base.html, includes/*.html и шаблонов приложений.
+"""
+import logging
+import os
+import time
+
+from django.template import TemplateSyntaxError, engines
+from django.template.utils import get_app_template_dirs
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_EXTENSIONS = ('.html', '.txt')
+
+
+def iter_template_names(engine):
+    """Имена всех шаблонов из DIRS и каталогов templates приложений."""
+    seen = set()
+    dirs = list(engine.dirs) + list(get_app_template_dirs('templates'))
+    for directory in dirs:
+        for root, _, files in os.walk(directory):
+            for filename in sorted(files):
+                if not filename.endswith(TEMPLATE_EXTENSIONS):
+                    continue
+                name = os.path.relpath(
+                    os.path.join(root, filename), directory
+                ).replace(os.sep, '/')
+                if name not in seen:
+                    seen.add(name)
+                    yield name
+
+
+def precompile_templates(using='django'):
+    """Компилирует все шаблоны и возвращает [(имя, секунды)].
+
+    Шаблоны, которые не удалось разобрать, попадают в лог
+    и в результат не входят.
+    """
+    engine = engines[using].engine
+    timings = []
+    for name in iter_template_names(engine):
+        started = time.perf_counter()
+        try:
+            engine.get_template(name)
+        except TemplateSyntaxError as error:
+            logger.warning('Шаблон %s не скомпилирован: %s', name, error)
+            continue
+        timings.append((name, time.perf_counter() - started))
+    timings.sort(key=lambda item: item[1], reverse=True)
+    return timings
+
+
+def warm_templates(limit=10):
+    """Компилирует шаблоны при старте воркера и пишет самые медленные."""
+    timings = precompile_templates()
+    total = sum(seconds for _, seconds in timings)
+    logger.info(
+        'Скомпилировано шаблонов: %d за %.1f мс', len(timings), total * 1000
+    )
+    for name, seconds in timings[:limit]:
+        logger.info('  %8.2f мс  %s', seconds * 1000, name)
+    return timings
@@ -13,17 +13,17 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.contrib import admin
 from django.conf import settings
-from django.conf.urls.static import static
 from django.urls import include, path
 from django.contrib.auth.forms import UserCreationForm
 from django.views.generic.edit import CreateView
 
 from django.urls import include, path, reverse_lazy
 
+from .metrics import metrics_view
+from .serve import serve_media, serve_static
+
 urlpatterns = [
-    path('admin/', admin.site.urls),
     path('pages/', include('pages.urls', namespace='pages')),
     path('', include('blog.urls', namespace='blog')),
     path('auth/', include('django.contrib.auth.urls')),
@@ -38,7 +38,48 @@ urlpatterns = [
     ),
 ]
 
+if settings.ADMIN_ENABLED:
+    from django.contrib import admin
+
+    from .profiling import profile_download_view, profiles_view
+    from .slowqueries import slow_queries_view
+
+    urlpatterns[:0] = [
+        path(
+            'admin/profiles/',
+            admin.site.admin_view(profiles_view),
+            name='profiles',
+        ),
+        path(
+            'admin/profiles/<str:name>',
+            admin.site.admin_view(profile_download_view),
+            name='profile_download',
+        ),
+        path(
+            'admin/slow-queries/',
+            admin.site.admin_view(slow_queries_view),
+            name='slow_queries',
+        ),
+        path('admin/', admin.site.urls),
+    ]
+
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.server_error'
 
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+urlpatterns += [
+    path('metrics', metrics_view, name='metrics'),
+    path(
+        f'{settings.MEDIA_URL.strip("/")}/<path:path>',
+        serve_media,
+        name='media',
+    ),
+]
+
+if settings.STATIC_MANIFEST:
+    urlpatterns += [
+        path(
+            f'{settings.STATIC_URL.strip("/")}/<path:path>',
+            serve_static,
+            name='static',
+        ),
+    ]
@@ -7,6 +7,8 @@ import sys
 def main():
     """Run administrative tasks."""
     os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+    from blogicum import startup
+    startup.install('manage', finish_on_setup=True)
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
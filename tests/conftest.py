@@ -19,6 +19,7 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -41,6 +42,30 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(scope="session")
+def django_db_modify_db_settings(
+    django_db_modify_db_settings_parallel_suffix, tmp_path_factory
+):
+    # live_server обрабатывает запросы в нескольких потоках, а общая
+    # in-memory база SQLite отвечает им «database table is locked»
+    # сразу, без ожидания блокировки. Файловая база ждёт её.
+    from django.conf import settings
+
+    database = settings.DATABASES["default"]
+    if database["ENGINE"] == "django.db.backends.sqlite3":
+        database.setdefault("TEST", {})["NAME"] = str(
+            tmp_path_factory.mktemp("db") / "test.sqlite3"
+        )
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Id пользователей повторяются между тестами, а кеш — общий.
+    yield
+    for cache in caches.all():
+        cache.clear()
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -93,6 +118,7 @@ pytest_plugins = [
     "fixtures.categories",
     "fixtures.comments",
     "adapters.comment",
+    "plugins.nplusone",
 ]
 
 
@@ -0,0 +1,31 @@
+"""Маркер nplusone: запросы с N+1 в тестах модуля считаются ошибкой.
+
+Модуль включает проверку строкой ``pytestmark = pytest.mark.nplusone``.
+Запросы тестового клиента проверяет NPlusOneMiddleware, и NPlusOneError
+пробрасывается из client.get; фикстура ``nplusone`` проверяет
+произвольный блок кода.
+"""
+import pytest
+from django.test import override_settings
+
+from blogicum.nplusone import detect
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "nplusone: падать при N+1 запросах к БД"
+    )
+
+
+@pytest.fixture(autouse=True)
+def _nplusone_marker(request):
+    if request.node.get_closest_marker("nplusone") is None:
+        yield
+        return
+    with override_settings(NPLUSONE_ENABLED=True, NPLUSONE_RAISE=True):
+        yield
+
+
+@pytest.fixture
+def nplusone():
+    return detect
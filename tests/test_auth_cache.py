@@ -0,0 +1,84 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from blogicum.auth import CACHE_KEY
+
+
+def auth_queries(queries):
+    return [
+        query["sql"] for query in queries
+        if 'FROM "auth_user"' in query["sql"]
+        or "django_session" in query["sql"]
+    ]
+
+
+@pytest.mark.django_db
+def test_cached_user_needs_no_auth_queries(settings, user_client):
+    settings.SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+    user_client.get("/pages/rules/")
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get("/pages/rules/")
+    assert response.context["user"].is_authenticated
+    assert not auth_queries(queries), (
+        "Убедитесь, что пользователь и сессия берутся из кеша."
+    )
+
+
+@pytest.mark.django_db
+def test_profile_edit_refreshes_cached_user(user, user_client):
+    user_client.get("/pages/rules/")
+    response = user_client.post("/profile/edit/", data={
+        "first_name": "Новое",
+        "last_name": "Имя",
+        "username": "renamed",
+        "email": "renamed@example.com",
+    })
+    assert response.status_code == 302
+    response = user_client.get("/pages/rules/")
+    assert response.context["user"].username == "renamed", (
+        "Убедитесь, что правка профиля сбрасывает кеш пользователя."
+    )
+
+
+@pytest.mark.django_db
+def test_password_change_invalidates_other_sessions(user, user_client):
+    user_client.get("/pages/rules/")
+    other = Client()
+    other.force_login(user)
+    other.get("/pages/rules/")
+    user.set_password("new-password-123")
+    user.save()
+    response = other.get("/pages/rules/")
+    assert not response.context["user"].is_authenticated, (
+        "Убедитесь, что после смены пароля прежние сессии недействительны."
+    )
+
+
+@pytest.mark.django_db
+def test_cached_user_has_no_password_hash(user, user_client):
+    user.set_password("old-password-123")
+    user.save()
+    user_client.force_login(user)
+    user_client.get("/pages/rules/")
+    cached, auth_hash = cache.get(CACHE_KEY.format(user.pk))
+    assert "password" not in cached.__dict__, (
+        "Убедитесь, что хеш пароля не попадает в кеш."
+    )
+    assert auth_hash == user.get_session_auth_hash()
+    response = user_client.post("/auth/password_change/", data={
+        "old_password": "old-password-123",
+        "new_password1": "new-password-456",
+        "new_password2": "new-password-456",
+    })
+    assert response.status_code == 302, (
+        "Убедитесь, что смена пароля работает с пользователем из кеша."
+    )
+    user.refresh_from_db()
+    assert user.check_password("new-password-456")
+    response = user_client.get("/pages/rules/")
+    assert response.context["user"].is_authenticated, (
+        "Убедитесь, что после смены пароля текущая сессия сохраняется."
+    )
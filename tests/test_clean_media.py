@@ -0,0 +1,42 @@
+import os
+import time
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+DAY = 24 * 60 * 60
+
+
+@pytest.fixture
+def media_root(tmp_path, settings):
+    settings.MEDIA_ROOT = tmp_path
+    images = tmp_path / "post_images"
+    images.mkdir()
+    old = time.time() - 2 * DAY
+    for name in ("used.jpg", "orphan.jpg", "fresh.jpg"):
+        (images / name).write_bytes(b"x")
+        if name != "fresh.jpg":
+            os.utime(images / name, (old, old))
+    return images
+
+
+@pytest.mark.django_db
+def test_clean_media_removes_only_old_orphans(mixer, user, media_root):
+    mixer.blend("blog.Post", author=user, image="post_images/used.jpg")
+    call_command("clean_media", stdout=StringIO())
+    assert sorted(os.listdir(media_root)) == ["fresh.jpg", "used.jpg"], (
+        "Убедитесь, что команда `clean_media` удаляет только старые файлы,"
+        " на которые не ссылается ни один пост."
+    )
+
+
+@pytest.mark.django_db
+def test_clean_media_dry_run(mixer, user, media_root):
+    mixer.blend("blog.Post", author=user, image="post_images/used.jpg")
+    out = StringIO()
+    call_command("clean_media", "--dry-run", "--batch-size", "1", stdout=out)
+    assert "post_images/orphan.jpg" in out.getvalue()
+    assert len(os.listdir(media_root)) == 3, (
+        "Убедитесь, что с флагом `--dry-run` файлы не удаляются."
+    )
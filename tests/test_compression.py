@@ -0,0 +1,51 @@
+import gzip
+from http import HTTPStatus
+
+import pytest
+
+
+def test_compression_gzip_roundtrip(client, settings):
+    settings.COMPRESSION_MIN_SIZE = 10
+    plain = client.get("/pages/rules/")
+    response = client.get("/pages/rules/", HTTP_ACCEPT_ENCODING="gzip")
+    assert response.status_code == HTTPStatus.OK
+    assert response["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response["Vary"]
+    assert gzip.decompress(response.content) == plain.content
+
+
+def test_compression_skipped_without_accept_encoding(client, settings):
+    settings.COMPRESSION_MIN_SIZE = 10
+    response = client.get("/pages/rules/")
+    assert not response.has_header("Content-Encoding")
+
+
+@pytest.mark.django_db
+def test_compression_pads_csrf_pages(user_client, post_with_published_location):
+    url = f"/posts/{post_with_published_location.id}/"
+    response = user_client.get(url, HTTP_ACCEPT_ENCODING="br, gzip")
+    assert response["Content-Encoding"] == "gzip", (
+        "Убедитесь, что страницы с CSRF-токеном сжимаются только gzip."
+    )
+    assert response.content[3] & 0x08, (
+        "Убедитесь, что на страницах с CSRF-токеном заголовок gzip"
+        " дополняется случайным именем файла."
+    )
+    assert b"csrfmiddlewaretoken" in gzip.decompress(response.content)
+
+
+def test_compression_streaming():
+    from django.http import StreamingHttpResponse
+    from django.test import RequestFactory
+
+    from blogicum.middleware import CompressionMiddleware
+
+    chunks = [b"<p>chunk</p>" * 50] * 3
+    middleware = CompressionMiddleware(
+        lambda request: StreamingHttpResponse(iter(chunks))
+    )
+    request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING="gzip")
+    response = middleware(request)
+    assert response["Content-Encoding"] == "gzip"
+    body = b"".join(response.streaming_content)
+    assert gzip.decompress(body) == b"".join(chunks)
@@ -0,0 +1,52 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count
+from django.utils import timezone
+
+from blog.models import Category
+
+
+@pytest.mark.django_db
+def test_generate_blog_data(PostModel, CommentModel):
+    call_command(
+        "generate_blog_data",
+        "--posts", "300", "--comments", "3000", "--users", "20",
+        "--categories", "10", "--locations", "5",
+        "--batch-size", "128", "--workers", "1",
+        stdout=StringIO(),
+    )
+    assert PostModel.objects.count() == 300
+    assert CommentModel.objects.count() == 3000
+    assert PostModel.objects.filter(pub_date__gt=timezone.now()).exists(), (
+        "Убедитесь, что генератор создаёт отложенные публикации."
+    )
+    top = PostModel.objects.annotate(
+        n=Count("comments")
+    ).order_by("-n").values_list("n", flat=True)
+    assert top[0] > 10 * top[len(top) // 2], (
+        "Убедитесь, что комментарии распределены по постам неравномерно."
+    )
+
+
+@pytest.mark.django_db
+def test_generated_names_do_not_collide(django_user_model):
+    # Генератор начинает с id 2: имена user2 и category-2 уже заняты.
+    django_user_model.objects.create_user("user2")
+    Category.objects.create(title="Занятая", description="", slug="category-2")
+    for _ in range(2):
+        call_command(
+            "generate_blog_data",
+            "--posts", "10", "--comments", "10", "--users", "3",
+            "--categories", "2", "--locations", "1", "--workers", "1",
+            stdout=StringIO(),
+        )
+    assert django_user_model.objects.count() == 7, (
+        "Убедитесь, что сгенерированные имена не совпадают с существующими."
+    )
+    assert Category.objects.count() == 5
+    user = django_user_model.objects.create_user("after-generate")
+    assert user.pk > 7, (
+        "Убедитесь, что после генерации обычные записи получают новые id."
+    )
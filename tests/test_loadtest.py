@@ -0,0 +1,37 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.datagen import DatasetSpec, generate
+
+
+@pytest.mark.django_db(transaction=True)
+def test_loadtest(live_server, tmp_path, CommentModel):
+    generate(DatasetSpec(
+        posts=30, comments=30, users=5, categories=3, locations=3,
+        unpublished_category_ratio=0,
+    ))
+    comments_before = CommentModel.objects.count()
+    output = tmp_path / "load.json"
+    stdout = StringIO()
+    call_command(
+        "loadtest",
+        "--url", live_server.url,
+        "--requests", "60",
+        "--concurrency", "2",
+        "--users", "2",
+        "--output", str(output),
+        stdout=stdout,
+    )
+    routes = json.loads(output.read_text())["routes"]
+    assert routes["total"]["count"] == 60
+    assert routes["total"]["errors"] == 0, stdout.getvalue()
+    for route in ("feed", "post_detail", "comment", "edit_post"):
+        assert route in routes, (
+            f"Убедитесь, что смесь маршрутов включает `{route}`."
+        )
+    assert CommentModel.objects.count() - comments_before == (
+        routes["comment"]["count"]
+    ), "Убедитесь, что комментарии отправляются от имени вошедших авторов."
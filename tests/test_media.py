@@ -0,0 +1,84 @@
+from http import HTTPStatus
+
+import pytest
+
+CONTENT = b"0123456789"
+
+
+@pytest.fixture
+def media_file(tmp_path, settings):
+    settings.MEDIA_ROOT = tmp_path
+    (tmp_path / "post_images").mkdir()
+    (tmp_path / "post_images" / "pic.jpg").write_bytes(CONTENT)
+    (tmp_path / "post_images" / "pic.0123456789ab.jpg").write_bytes(CONTENT)
+    return "/media/post_images/pic.jpg"
+
+
+def read(response):
+    return b"".join(response.streaming_content)
+
+
+def test_media_served_with_validators(client, media_file):
+    response = client.get(media_file)
+    assert response.status_code == HTTPStatus.OK
+    assert read(response) == CONTENT
+    assert response["ETag"]
+    assert response["Accept-Ranges"] == "bytes"
+    assert "immutable" not in response["Cache-Control"]
+
+    response = client.get(media_file, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        "Убедитесь, что при совпадении If-None-Match возвращается 304."
+    )
+
+
+def test_media_range_requests(client, media_file):
+    response = client.get(media_file, HTTP_RANGE="bytes=2-4")
+    assert response.status_code == HTTPStatus.PARTIAL_CONTENT
+    assert read(response) == b"234"
+    assert response["Content-Range"] == "bytes 2-4/10"
+    assert response["Content-Length"] == "3"
+
+    response = client.get(media_file, HTTP_RANGE="bytes=-3")
+    assert read(response) == b"789"
+
+    response = client.get(media_file, HTTP_RANGE="bytes=20-")
+    assert response.status_code == (
+        HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+    )
+
+
+def test_media_hashed_names_are_not_immutable(client, media_file):
+    response = client.get("/media/post_images/pic.0123456789ab.jpg")
+    assert "immutable" not in response["Cache-Control"], (
+        "Убедитесь, что имена медиафайлов не считаются хешами содержимого:"
+        " их выбирают пользователи."
+    )
+
+
+def test_media_sendfile_delegation(client, media_file, settings):
+    settings.MEDIA_SENDFILE_HEADER = "X-Accel-Redirect"
+    response = client.get(media_file)
+    assert response["X-Accel-Redirect"] == (
+        "/protected-media/post_images/pic.jpg"
+    )
+    assert response.content == b""
+
+
+def test_static_precompressed_variant(rf, tmp_path, settings):
+    from blogicum.serve import serve_static
+
+    settings.STATIC_ROOT = tmp_path
+    (tmp_path / "app.0123456789ab.css").write_bytes(b"body{}" * 100)
+    (tmp_path / "app.0123456789ab.css.gz").write_bytes(b"gz")
+    request = rf.get("/", HTTP_ACCEPT_ENCODING="br, gzip;q=0.8")
+    response = serve_static(request, "app.0123456789ab.css")
+    assert response["Content-Encoding"] == "gzip"
+    assert response["Content-Type"] == "text/css"
+    assert response["Vary"] == "Accept-Encoding"
+    assert "immutable" in response["Cache-Control"]
+    assert read(response) == b"gz"
+
+    request = rf.get("/", HTTP_ACCEPT_ENCODING="gzip;q=0")
+    response = serve_static(request, "app.0123456789ab.css")
+    assert not response.has_header("Content-Encoding")
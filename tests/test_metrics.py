@@ -0,0 +1,82 @@
+import json
+
+import pytest
+from django.core.cache import cache
+
+from blogicum import metrics
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint(
+    client, user_client, settings, post_with_published_location
+):
+    settings.METRICS_RENDER_SAMPLE_RATE = 1
+    settings.METRICS_TOKEN = "scraper-token"
+    client.get("/")
+    cache.get("metrics-test-missing")
+    user_client.post(
+        f"/posts/{post_with_published_location.id}/comment/",
+        data={"text": "Комментарий"},
+    )
+    response = client.get(
+        "/metrics", HTTP_AUTHORIZATION="Bearer scraper-token"
+    )
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+    body = response.content.decode()
+    for sample in (
+        'blogicum_http_request_duration_seconds_bucket{view="blog:index",le="+Inf"}',
+        'blogicum_db_queries_total{view="blog:index"}',
+        'blogicum_cache_requests_total{cache="default:l1",result="miss"}',
+        'blogicum_template_renders_total{template="includes/post_card.html"}',
+        "blogicum_comments_created_total ",
+    ):
+        assert sample in body, f"Убедитесь, что /metrics содержит `{sample}`."
+
+
+def test_metrics_access(client, settings):
+    settings.METRICS_TOKEN = None
+    settings.METRICS_ALLOWED_IPS = ()
+    assert client.get("/metrics").status_code == 403, (
+        "Убедитесь, что без настройки доступа /metrics закрыт для всех."
+    )
+    settings.METRICS_TOKEN = "scraper-token"
+    for header in ("", "Bearer wrong", "scraper-token"):
+        response = client.get("/metrics", HTTP_AUTHORIZATION=header)
+        assert response.status_code == 403, (
+            "Убедитесь, что /metrics не отдаётся без верного токена."
+        )
+    assert client.get(
+        "/metrics", HTTP_AUTHORIZATION="Bearer scraper-token"
+    ).status_code == 200
+    settings.METRICS_TOKEN = None
+    settings.METRICS_ALLOWED_IPS = ("127.0.0.1",)
+    assert client.get("/metrics").status_code == 200
+
+
+def test_metrics_aggregate_worker_files(client, settings, tmp_path):
+    settings.METRICS_DIR = str(tmp_path)
+    settings.METRICS_ALLOWED_IPS = ("127.0.0.1",)
+    other_worker = {
+        "counters": [["blogicum_posts_created_total", [], 5]],
+        "histograms": [],
+    }
+    (tmp_path / "999999.json").write_text(json.dumps(other_worker))
+    before = metrics.registry.counters["blogicum_posts_created_total", ()]
+    body = client.get("/metrics").content.decode()
+    assert f"blogicum_posts_created_total {int(before) + 5}" in body, (
+        "Убедитесь, что /metrics суммирует метрики всех воркеров."
+    )
+
+
+def test_render_timing_sampled(client, settings):
+    settings.METRICS_RENDER_SAMPLE_RATE = 0
+    key = ("blogicum_render_sampled_requests_total", ())
+    before = metrics.registry.counters.get(key, 0)
+    client.get("/pages/rules/")
+    assert metrics.registry.counters.get(key, 0) == before, (
+        "Убедитесь, что рендеринг не замеряется вне доли "
+        "METRICS_RENDER_SAMPLE_RATE."
+    )
+    settings.METRICS_RENDER_SAMPLE_RATE = 1
+    client.get("/pages/rules/")
+    assert metrics.registry.counters[key] == before + 1
@@ -0,0 +1,47 @@
+import pytest
+
+from blogicum.nplusone import NPlusOneError
+
+pytestmark = pytest.mark.nplusone
+
+
+@pytest.fixture
+def discussed_post(mixer, post_with_published_location, CommentModel):
+    for _ in range(3):
+        mixer.blend(
+            f"blog.{CommentModel.__name__}",
+            post=post_with_published_location,
+            author=mixer.blend("auth.User"),
+        )
+    return post_with_published_location
+
+
+@pytest.mark.django_db
+def test_post_detail_has_no_nplusone(client, user_client, discussed_post):
+    for current_client in (client, user_client):
+        response = current_client.get(f"/posts/{discussed_post.id}/")
+        assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_comment_views_have_no_nplusone(
+    mixer, user, user_client, discussed_post, CommentModel
+):
+    comment = mixer.blend(
+        f"blog.{CommentModel.__name__}", post=discussed_post, author=user
+    )
+    for action in ("edit_comment", "delete_comment"):
+        response = user_client.get(
+            f"/posts/{discussed_post.id}/{action}/{comment.id}/"
+        )
+        assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_lazy_loading_in_loop_is_detected(
+    nplusone, discussed_post, CommentModel
+):
+    with pytest.raises(NPlusOneError, match="test_nplusone.py"):
+        with nplusone():
+            for comment in CommentModel.objects.all():
+                comment.author.username
@@ -0,0 +1,17 @@
+from django.core.paginator import Paginator
+from django.template.loader import render_to_string
+
+
+def test_paginator_renders_elided_range(settings):
+    settings.PAGINATION_ON_EACH_SIDE = 2
+    settings.PAGINATION_ON_ENDS = 1
+    page_obj = Paginator(range(10000), 10).page(500)
+    html = render_to_string("includes/paginator.html", {"page_obj": page_obj})
+    assert html.count('class="page-item') < 15, (
+        "Убедитесь, что пагинатор выводит не все номера страниц,"
+        " а только окно вокруг текущей."
+    )
+    for number in (1, 498, 499, 501, 502, 1000):
+        assert f'href="?page={number}"' in html
+    assert 'href="?page=497"' not in html
+    assert "…" in html
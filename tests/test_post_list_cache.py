@@ -0,0 +1,125 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+
+def post_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    return [
+        query["sql"] for query in queries
+        if 'FROM "blog_post"' in query["sql"]
+    ]
+
+
+@pytest.fixture
+def make_post(mixer, user):
+    def make(category, **kwargs):
+        fields = {
+            "author": user,
+            "location": None,
+            "is_published": True,
+            "pub_date": timezone.now() - timedelta(days=1),
+            **kwargs,
+        }
+        return mixer.blend("blog.Post", category=category, **fields)
+    return make
+
+
+@pytest.mark.django_db
+def test_feed_pages_served_from_cache(client, make_post, published_category):
+    post = make_post(published_category, title="Кешируемый пост")
+    response = client.get("/")
+    assert post_queries(client, "/") == [], (
+        "Убедитесь, что страница ленты берётся из кеша."
+    )
+    cached = client.get("/")
+    assert cached.context["page_obj"].paginator.count == 1
+    assert [item.pk for item in cached.context["page_obj"]] == [post.pk]
+    assert cached.content == response.content, (
+        "Убедитесь, что страница из кеша совпадает с прочитанной из БД."
+    )
+
+
+@pytest.mark.django_db
+def test_post_change_keeps_other_categories_cached(
+    client, make_post, published_category, another_category
+):
+    post = make_post(published_category)
+    make_post(another_category, title="Соседний пост")
+    urls = {
+        "feed": "/",
+        "own": f"/category/{published_category.slug}/",
+        "other": f"/category/{another_category.slug}/",
+    }
+    for url in urls.values():
+        client.get(url)
+    post.title = "Новый заголовок"
+    post.save()
+    assert not post_queries(client, urls["other"]), (
+        "Убедитесь, что изменение поста не сбрасывает ленты других категорий."
+    )
+    for name in ("feed", "own"):
+        assert "Новый заголовок" in client.get(urls[name]).content.decode(), (
+            "Убедитесь, что изменение поста сбрасывает ленты, где он показан."
+        )
+
+
+@pytest.mark.django_db
+def test_moved_post_leaves_previous_category(
+    client, make_post, published_category, another_category
+):
+    post = make_post(published_category)
+    url = f"/category/{published_category.slug}/"
+    assert client.get(url).context["page_obj"].paginator.count == 1
+    post.category = another_category
+    post.save()
+    assert client.get(url).context["page_obj"].paginator.count == 0, (
+        "Убедитесь, что пост, перенесённый в другую категорию, пропадает "
+        "из ленты прежней."
+    )
+
+
+@pytest.mark.django_db
+def test_comment_updates_cached_count(
+    client, user_client, make_post, published_category
+):
+    post = make_post(published_category)
+    assert client.get("/").context["page_obj"][0].comment_count == 0
+    user_client.post(f"/posts/{post.id}/comment/", data={"text": "Первый"})
+    assert client.get("/").context["page_obj"][0].comment_count == 1, (
+        "Убедитесь, что новый комментарий обновляет счётчик в ленте."
+    )
+
+
+@pytest.mark.django_db
+def test_author_sees_own_unpublished_posts(
+    client, user, user_client, make_post, published_category
+):
+    make_post(published_category, is_published=False)
+    url = f"/profile/{user.username}/"
+    assert client.get(url).context["paginator"].count == 0
+    assert user_client.get(url).context["paginator"].count == 1, (
+        "Убедитесь, что ленты автора и гостей кешируются раздельно."
+    )
+
+
+@pytest.mark.django_db
+def test_author_rename_updates_feeds(
+    client, user, make_post, published_category
+):
+    post = make_post(published_category)
+    urls = ("/", f"/category/{published_category.slug}/", f"/posts/{post.id}/")
+    for url in urls:
+        client.get(url)
+    user.username = "renamed_author"
+    user.save()
+    for url in urls:
+        assert "@renamed_author" in client.get(url).content.decode(), (
+            "Убедитесь, что смена имени автора обновляет ленты "
+            "и страницы его постов."
+        )
@@ -0,0 +1,111 @@
+import multiprocessing
+import threading
+import time
+
+import pytest
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blogicum.cache import LEASE_KEY, LockedFileBasedCache, get_or_refresh
+
+
+def run_concurrently(target, count):
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(target()))
+        for _ in range(count)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def slow(value, calls, delay=0.2):
+    def compute():
+        calls.append(value)
+        time.sleep(delay)
+        return value
+    return compute
+
+
+def test_concurrent_miss_computes_once():
+    calls = []
+    results = run_concurrently(
+        lambda: get_or_refresh("page", slow("v1", calls)), 8
+    )
+    assert calls == ["v1"], (
+        "Убедитесь, что при промахе значение считает один поток."
+    )
+    assert results == ["v1"] * 8
+
+
+def test_stale_served_during_refresh():
+    calls = []
+    get_or_refresh("page", slow("v1", calls, 0), version=1)
+    started = time.perf_counter()
+    results = run_concurrently(
+        lambda: get_or_refresh("page", slow("v2", calls), version=2), 8
+    )
+    assert calls == ["v1", "v2"], (
+        "Убедитесь, что устаревшее значение пересчитывает один поток."
+    )
+    assert results.count("v1") == 7 and results.count("v2") == 1, (
+        "Убедитесь, что остальные получают устаревшее значение без ожидания."
+    )
+    assert get_or_refresh("page", slow("v3", calls), version=2) == "v2"
+    assert time.perf_counter() - started < 1
+
+
+def test_lease_held_by_other_process():
+    calls = []
+    get_or_refresh("page", slow("v1", calls, 0), version=1)
+    caches["shared"].add(LEASE_KEY.format("page"), True, 10)
+    assert get_or_refresh("page", slow("v2", calls), version=2) == "v1", (
+        "Убедитесь, что при чужой аренде отдаётся устаревшее значение."
+    )
+    assert calls == ["v1"]
+
+
+def refresh_in_process(directory):
+    def compute():
+        with open(f"{directory}/calls", "a") as calls:
+            calls.write("v1\n")
+        time.sleep(0.3)
+        return "v1"
+    cache = LockedFileBasedCache(f"{directory}/cache", {})
+    return get_or_refresh("page", compute, cache=cache)
+
+
+def test_concurrent_miss_computes_once_across_processes(tmp_path):
+    with multiprocessing.get_context("fork").Pool(4) as pool:
+        results = pool.map(refresh_in_process, [str(tmp_path)] * 4)
+    assert results == ["v1"] * 4
+    assert (tmp_path / "calls").read_text() == "v1\n", (
+        "Убедитесь, что при промахе значение считает один процесс."
+    )
+
+
+@pytest.mark.django_db
+def test_post_page_cached_for_anonymous(
+    client, user_client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    assert client.get(url).status_code == 200
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    assert len(queries) == 0, (
+        "Убедитесь, что страница поста отдаётся анонимам из кеша."
+    )
+    user_client.post(f"{url}comment/", data={"text": "Свежий комментарий"})
+    assert "Свежий комментарий" in client.get(url).content.decode(), (
+        "Убедитесь, что новый комментарий сбрасывает кеш страницы поста."
+    )
+    post_with_published_location.is_published = False
+    post_with_published_location.save()
+    assert client.get(url).status_code == 404
+    assert cache.get(f"blog:post_page:{post_with_published_location.id}") \
+        is None
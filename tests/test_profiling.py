@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from blogicum import profiling
+
+
+@pytest.fixture
+def capture_dir(tmp_path, settings):
+    settings.PROFILE_CAPTURE_DIR = tmp_path / "profiles"
+    return settings.PROFILE_CAPTURE_DIR
+
+
+@pytest.mark.django_db
+def test_staff_request_profiled(
+    capture_dir, client, django_user_model, post_with_published_location
+):
+    admin = django_user_model.objects.create_superuser("root", "", "pass")
+    client.force_login(admin)
+    author = post_with_published_location.author.username
+    response = client.get(
+        f"/profile/{author}/",
+        {profiling.QUERY_PARAM: profiling.make_token("all")},
+    )
+    assert response.status_code == 200
+    capture_id = response["X-Profile-Capture"]
+    metadata = json.loads((capture_dir / f"{capture_id}.json").read_text())
+    assert metadata["view"] == "blog:profile"
+    assert metadata["user"] == "root"
+    assert profiling.QUERY_PARAM not in metadata["query"]
+    assert set(metadata["files"]) == {
+        f"{capture_id}.prof", f"{capture_id}.tracemalloc"
+    }, "Убедитесь, что сохраняются профиль cProfile и снимок tracemalloc."
+
+    response = client.get("/admin/profiles/")
+    assert response.status_code == 200
+    assert capture_id in response.content.decode()
+    response = client.get(f"/admin/profiles/{capture_id}.prof")
+    assert response.status_code == 200
+    assert b"".join(response.streaming_content)
+    assert client.get("/admin/profiles/..%2Fdb.sqlite3").status_code == 404
+
+
+@pytest.mark.django_db
+def test_profiling_requires_staff_and_valid_token(
+    capture_dir, user_client, admin_client
+):
+    token = profiling.make_token("cpu")
+    response = user_client.get("/", {profiling.QUERY_PARAM: token})
+    assert not response.has_header("X-Profile-Capture"), (
+        "Убедитесь, что профилирование доступно только сотрудникам."
+    )
+    response = admin_client.get("/", HTTP_X_PROFILE=token + "x")
+    assert not response.has_header("X-Profile-Capture")
+    response = admin_client.get("/", HTTP_X_PROFILE=token)
+    assert response.has_header("X-Profile-Capture")
+    assert not list(capture_dir.glob("*.tracemalloc")), (
+        "Убедитесь, что в режиме cpu снимок памяти не сохраняется."
+    )
@@ -0,0 +1,119 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver, reverse
+
+from blog.datagen import DatasetSpec, generate
+from blog.models import Category, User
+from blog.utils import get_published_posts
+
+DATASET_SIZES = (5, 40)
+
+# Максимум запросов к БД: (аноним, автор поста и комментария).
+# Не зависит от объёма данных, иначе в маршруте появился N+1.
+QUERY_BUDGETS = {
+    "blog:index": (2, 4),
+    "blog:post_detail": (2, 4),
+    "blog:category_posts": (3, 5),
+    "blog:create_post": (0, 4),
+    "blog:edit_profile": (0, 2),
+    "blog:profile": (3, 5),
+    "blog:edit_post": (1, 5),
+    "blog:delete_post": (1, 3),
+    "blog:add_comment": (0, 2),
+    "blog:edit_comment": (0, 3),
+    "blog:delete_comment": (0, 3),
+    "pages:about": (0, 2),
+    "pages:rules": (0, 2),
+}
+
+
+def iter_routes(values):
+    for namespace in ("blog", "pages"):
+        resolver = get_resolver().namespace_dict[namespace][1]
+        for pattern in resolver.url_patterns:
+            if isinstance(pattern, URLResolver):
+                continue
+            name = f"{namespace}:{pattern.name}"
+            kwargs = {key: values[key] for key in pattern.pattern.converters}
+            yield name, reverse(name, kwargs=kwargs)
+
+
+@pytest.fixture(params=DATASET_SIZES, ids=lambda size: f"{size}_posts")
+def dataset(request, db, django_user_model, CommentModel):
+    size = request.param
+    generate(DatasetSpec(
+        posts=size, comments=size * 5, users=5, categories=3, locations=3,
+    ))
+    post = get_published_posts().order_by("-comment_count").first()
+    comment = CommentModel.objects.create(
+        post=post, author=post.author, text="Комментарий автора"
+    )
+    return {
+        "post_id": post.id,
+        "comment_id": comment.id,
+        "category_slug": post.category.slug,
+        "profile": post.author.username,
+        "author": post.author,
+    }
+
+
+def count_queries(client, url):
+    client.get(url)
+    with CaptureQueriesContext(connection) as queries:
+        client.get(url)
+    return len(queries)
+
+
+@pytest.mark.parametrize("authenticated", (False, True), ids=("anonymous", "author"))
+def test_route_query_budgets(client, settings, dataset, authenticated):
+    # Страницы постов и лент из кеша не делают запросов и скрыли бы N+1:
+    # с нулевым временем жизни они собираются заново на каждом запросе.
+    settings.POST_PAGE_CACHE_TIMEOUT = 0
+    settings.POST_LIST_CACHE_TIMEOUT = 0
+    if authenticated:
+        client.force_login(dataset["author"])
+    routes = dict(iter_routes(dataset))
+    assert set(routes) == set(QUERY_BUDGETS), (
+        "Задайте бюджет запросов для каждого маршрута."
+    )
+    over_budget = {}
+    for name, url in routes.items():
+        budget = QUERY_BUDGETS[name][authenticated]
+        queries = count_queries(client, url)
+        if queries > budget:
+            over_budget[name] = (queries, budget)
+    assert not over_budget, f"Превышен бюджет запросов: {over_budget}"
+
+
+def query_plan(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+@pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="План в формате SQLite."
+)
+@pytest.mark.parametrize("feed", ("index", "category", "profile"))
+def test_feed_query_plans_use_index(dataset, feed):
+    posts = {
+        "index": lambda: get_published_posts(),
+        "category": lambda: get_published_posts(
+            posts=Category.objects.get(slug=dataset["category_slug"]).posts.all()
+        ),
+        "profile": lambda: get_published_posts(
+            posts=User.objects.get(username=dataset["profile"]).posts.all()
+        ),
+    }[feed]()
+    plan = query_plan(posts[:10])
+    assert "SCAN blog_post" not in plan, (
+        f"Убедитесь, что лента `{feed}` читается по индексу: {plan}"
+    )
+    assert any(
+        line.startswith("SEARCH blog_post USING INDEX") for line in plan
+    ), f"Убедитесь, что лента `{feed}` читается по индексу: {plan}"
+    assert not any("TEMP B-TREE" in line for line in plan), (
+        f"Убедитесь, что лента `{feed}` не сортируется заново: {plan}"
+    )
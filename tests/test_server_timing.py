@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+
+@pytest.mark.django_db
+def test_server_timing_header(
+    user_client, settings, caplog, post_with_published_location
+):
+    # Анонимам страница поста отдаётся из кеша уже отрисованной.
+    settings.SERVER_TIMING_SAMPLE_RATE = 1
+    with caplog.at_level("INFO", logger="blogicum.timing"):
+        response = user_client.get(
+            f"/posts/{post_with_published_location.id}/"
+        )
+    header = response["Server-Timing"]
+    for metric in ("db;dur=", "view;dur=", "render;dur=", "total;dur="):
+        assert metric in header, (
+            f"Убедитесь, что заголовок Server-Timing содержит `{metric}`."
+        )
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record["view"] == "blog:post_detail"
+    assert record["queries"] > 0
+
+
+def test_server_timing_sampling(client, settings):
+    settings.SERVER_TIMING_SAMPLE_RATE = 0
+    response = client.get("/pages/rules/")
+    assert not response.has_header("Server-Timing")
+
+
+@pytest.mark.django_db
+def test_server_timing_templates(
+    user_client, settings, caplog, post_with_published_location
+):
+    settings.SERVER_TIMING_SAMPLE_RATE = 1
+    with caplog.at_level("INFO", logger="blogicum.timing"):
+        response = user_client.get(
+            f"/posts/{post_with_published_location.id}/"
+        )
+    assert 'tpl;dur=' in response["Server-Timing"]
+    record = json.loads(caplog.records[-1].getMessage())
+    templates = record["templates"]
+    assert templates["blog/detail.html"]["count"] == 1
+    assert templates["includes/comments.html"]["count"] == 1
+    nodes = record["nodes"]
+    assert any(
+        key.startswith("includes/comments.html:") and "bootstrap_form" in key
+        for key in nodes
+    ), "Убедитесь, что время тега bootstrap_form учитывается отдельно."
+    include = next(key for key in nodes if "includes/comments.html\"" in key)
+    assert nodes[include]["total_ms"] >= templates[
+        "includes/comments.html"
+    ]["total_ms"]
@@ -0,0 +1,77 @@
+import os
+import subprocess
+import sys
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.conf import settings as django_settings
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+
+@pytest.mark.django_db
+def test_purge_sessions_in_batches(settings):
+    settings.SESSION_ENGINE = "django.contrib.sessions.backends.db"
+    Session.objects.bulk_create(
+        Session(
+            session_key=f"expired{number}",
+            session_data="",
+            expire_date=timezone.now() - timedelta(days=number + 1),
+        )
+        for number in range(5)
+    )
+    live = SessionStore()
+    live.save()
+    stdout = StringIO()
+    with CaptureQueriesContext(connection) as queries:
+        call_command(
+            "purge_sessions", "--batch-size", "2", "--pause", "0",
+            stdout=stdout,
+        )
+    assert list(Session.objects.values_list("session_key", flat=True)) == [
+        live.session_key
+    ]
+    deletes = [q for q in queries if q["sql"].startswith("DELETE")]
+    assert len(deletes) == 3, (
+        "Убедитесь, что просроченные сессии удаляются пачками."
+    )
+    assert "5" in stdout.getvalue()
+
+
+@pytest.mark.django_db
+def test_cached_sessions_skip_database(settings, user_client):
+    settings.SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+    user_client.get("/")
+    with CaptureQueriesContext(connection) as queries:
+        user_client.get("/")
+    assert not [q for q in queries if "django_session" in q["sql"]], (
+        "Убедитесь, что сессия читается из кеша, а не из БД."
+    )
+
+
+@pytest.mark.parametrize("cache_dir, ok", ((False, False), (True, True)))
+def test_cache_sessions_need_shared_cache(tmp_path, cache_dir, ok):
+    env = {
+        key: value for key, value in os.environ.items()
+        if key != "BLOGICUM_CACHE_DIR"
+    }
+    env["BLOGICUM_SESSION_MODE"] = "cached_db"
+    if cache_dir:
+        env["BLOGICUM_CACHE_DIR"] = str(tmp_path)
+    result = subprocess.run(
+        [sys.executable, "-c", "import blogicum.settings"],
+        cwd=django_settings.BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    assert (result.returncode == 0) is ok, result.stderr
+    if not ok:
+        assert "ImproperlyConfigured" in result.stderr, (
+            "Убедитесь, что сессии в кеше требуют общего для воркеров кеша."
+        )
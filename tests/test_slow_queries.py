@@ -0,0 +1,67 @@
+import pytest
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils.html import escape
+
+from blogicum import slowqueries
+
+
+@pytest.fixture
+def slow_log(tmp_path, settings):
+    settings.SLOW_QUERY_THRESHOLD_MS = 1e-6
+    settings.SLOW_QUERY_LOG = tmp_path / "slow.log"
+    slowqueries.install()
+    yield settings.SLOW_QUERY_LOG
+    connection_created.disconnect(slowqueries.add_wrapper)
+    for connection in connections.all():
+        connection.execute_wrappers.remove(slowqueries.log_slow_query)
+    for handler in slowqueries.logger.handlers[:]:
+        slowqueries.logger.removeHandler(handler)
+        handler.close()
+
+
+def test_params_redacted():
+    assert [
+        slowqueries.describe_param(param)
+        for param in (7, None, "pbkdf2_sha256$secret", b"\x00\x01")
+    ] == ["7", "None", "<str len=20>", "<bytes len=2>"]
+
+
+@pytest.mark.django_db
+def test_password_hash_not_logged(slow_log, django_user_model):
+    user = django_user_model.objects.create_user("writer", "", "pass")
+    user.set_password("another-pass")
+    user.save()
+    log = slow_log.read_text(encoding="utf-8")
+    assert "auth_user" in log
+    assert user.password not in log, (
+        "Убедитесь, что хеши паролей не попадают в журнал запросов."
+    )
+
+
+def test_normalize_sql():
+    assert slowqueries.normalize_sql(
+        "SELECT * FROM t WHERE a = 'x' AND b IN (%s, %s)  LIMIT 10"
+    ) == "SELECT * FROM t WHERE a = ? AND b IN (...) LIMIT ?"
+
+
+@pytest.mark.django_db
+def test_slow_queries_logged_with_plan(
+    slow_log, client, django_user_model, post_with_published_location
+):
+    client.get(f"/posts/{post_with_published_location.id}/")
+    entries = list(slowqueries.iter_entries(slow_log))
+    post_query = next(
+        entry for entry in entries
+        if entry["view"] == "blog:post_detail" and entry["plan"]
+    )
+    assert post_query["frame"], (
+        "Убедитесь, что в журнал попадает место вызова в коде проекта."
+    )
+    assert "%s" not in post_query["sql"]
+
+    admin = django_user_model.objects.create_superuser("root", "", "pass")
+    client.force_login(admin)
+    response = client.get("/admin/slow-queries/")
+    assert response.status_code == 200
+    assert escape(post_query["sql"]) in response.content.decode()
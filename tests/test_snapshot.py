@@ -0,0 +1,53 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+def test_dump_and_load_blog(tmp_path, PostModel, CommentModel):
+    call_command(
+        "generate_blog_data",
+        "--posts", "40", "--comments", "120", "--users", "5",
+        "--categories", "3", "--locations", "2", "--workers", "1",
+        stdout=StringIO(),
+    )
+    created = dict(PostModel.objects.values_list("pk", "created_at"))
+    snapshot = tmp_path / "blog.jsonl.gz"
+    call_command("dump_blog", str(snapshot), stderr=StringIO())
+
+    CommentModel.objects.all().delete()
+    PostModel.objects.all().delete()
+    call_command(
+        "load_blog", str(snapshot), "--batch-size", "7",
+        "--ignore-conflicts", stdout=StringIO(),
+    )
+    assert CommentModel.objects.count() == 120
+    assert dict(
+        PostModel.objects.values_list("pk", "created_at")
+    ) == created, (
+        "Убедитесь, что load_blog сохраняет ключи и даты создания."
+    )
+
+
+@pytest.mark.django_db
+def test_dump_sanitizes_users(tmp_path, django_user_model):
+    admin = django_user_model.objects.create_superuser(
+        "root", "root@example.com", "secret-pass"
+    )
+    backup = tmp_path / "backup.jsonl"
+    call_command(
+        "dump_blog", str(backup), "--keep-credentials", stderr=StringIO()
+    )
+    assert admin.password in backup.read_text(encoding="utf-8")
+    snapshot = tmp_path / "blog.jsonl"
+    call_command("dump_blog", str(snapshot), stderr=StringIO())
+    content = snapshot.read_text(encoding="utf-8")
+    assert admin.password not in content and "root@example.com" not in (
+        content
+    ), "Убедитесь, что снимок не содержит хешей паролей и почты."
+    django_user_model.objects.all().delete()
+    call_command("load_blog", str(snapshot), stdout=StringIO())
+    loaded = django_user_model.objects.get(username="root")
+    assert not loaded.has_usable_password()
+    assert not loaded.is_superuser and not loaded.is_staff
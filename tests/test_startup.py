@@ -0,0 +1,109 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+
+from blogicum.startup import compare_reports, format_report
+
+
+def run(args, tmp_path, **env):
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=settings.BASE_DIR,
+        env={
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": "blogicum.settings",
+            "DJANGO_DB_NAME": str(tmp_path / "db.sqlite3"),
+            **env,
+        },
+        capture_output=True,
+        text=True,
+    )
+
+
+def test_startup_report(tmp_path):
+    reports = tmp_path / "boot"
+    result = run(
+        ["manage.py", "check"], tmp_path,
+        BLOGICUM_PROFILE_STARTUP=str(reports),
+    )
+    assert result.returncode == 0, result.stderr
+    report = json.loads((reports / "manage.json").read_text())
+    assert report["label"] == "manage"
+    assert {"settings", "django.setup", "total"} <= set(report["phases"]), (
+        "Убедитесь, что отчёт содержит фазы старта."
+    )
+    assert report["phases"]["total"] >= report["phases"]["django.setup"]
+    assert {"blog", "pages", "admin"} <= set(report["apps"]), (
+        "Убедитесь, что в отчёт попадает время ready() приложений."
+    )
+    timing = report["imports"]["blog.models"]
+    assert 0 <= timing["self"] <= timing["cumulative"], (
+        "Убедитесь, что для импортов пишется собственное и суммарное время."
+    )
+    assert (reports / "manage.txt").read_text() == format_report(report)
+
+
+def test_compare_reports():
+    old = {
+        "phases": {"total": 0.5},
+        "imports": {
+            "slow": {"self": 0.1, "cumulative": 0.3},
+            "same": {"self": 0.01, "cumulative": 0.01},
+        },
+    }
+    new = {
+        "phases": {"total": 0.25, "settings": 0.01},
+        "imports": {
+            "slow": {"self": 0.1, "cumulative": 0.1},
+            "same": {"self": 0.01, "cumulative": 0.01},
+            "added": {"self": 0.05, "cumulative": 0.05},
+        },
+    }
+    lines = compare_reports(old, new).splitlines()
+    assert lines[0].split() == ["0.0", "10.0", "+10.0", "мс", "settings"]
+    assert lines[1].split() == ["500.0", "250.0", "-250.0", "мс", "total"]
+    assert [line.split()[-1] for line in lines[3:]] == [
+        "slow", "added", "same"
+    ], "Убедитесь, что импорты отсортированы по модулю изменения."
+    assert compare_reports(old, new, limit=1).splitlines()[-1].endswith(
+        "slow"
+    )
+
+
+def test_admin_disabled(tmp_path):
+    code = (
+        "import json, django\n"
+        "django.setup()\n"
+        "from django.conf import settings\n"
+        "from django.urls import Resolver404, get_resolver, resolve\n"
+        "names = set(get_resolver().reverse_dict)\n"
+        "found = []\n"
+        "for url in ('/admin/', '/admin/profiles/', '/admin/slow-queries/'):\n"
+        "    try:\n"
+        "        resolve(url)\n"
+        "        found.append(url)\n"
+        "    except Resolver404:\n"
+        "        pass\n"
+        "print(json.dumps({\n"
+        "    'apps': settings.INSTALLED_APPS,\n"
+        "    'names': sorted(n for n in names if isinstance(n, str)),\n"
+        "    'namespaces': sorted(get_resolver().namespace_dict),\n"
+        "    'found': found,\n"
+        "}))\n"
+    )
+    result = run(["-c", code], tmp_path, BLOGICUM_ADMIN="0")
+    assert result.returncode == 0, result.stderr
+    urls = json.loads(result.stdout)
+    assert "django.contrib.admin" not in urls["apps"]
+    assert urls["found"] == [], (
+        "Убедитесь, что при BLOGICUM_ADMIN=0 маршруты админки, профилей "
+        "и медленных запросов не подключаются."
+    )
+    assert not {"profiles", "profile_download", "slow_queries"} & set(
+        urls["names"]
+    )
+    assert "admin" not in urls["namespaces"]
+    assert {"blog", "pages"} <= set(urls["namespaces"])
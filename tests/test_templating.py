@@ -0,0 +1,72 @@
+import copy
+from io import StringIO
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings as django_settings
+from django.core.management import call_command
+
+from blogicum.templating import precompile_templates, warm_templates
+
+
+def template_names():
+    dirs = [Path(django_settings.TEMPLATES_DIR)] + [
+        Path(config.path) / "templates" for config in apps.get_app_configs()
+    ]
+    return {
+        path.relative_to(directory).as_posix()
+        for directory in dirs if directory.is_dir()
+        for pattern in ("*.html", "*.txt")
+        for path in directory.rglob(pattern)
+    }
+
+
+def with_template_dir(settings, directory):
+    templates = copy.deepcopy(settings.TEMPLATES)
+    templates[0]["DIRS"] = [*templates[0]["DIRS"], directory]
+    settings.TEMPLATES = templates
+
+
+def test_precompile_covers_all_templates():
+    timings = precompile_templates()
+    names = [name for name, _ in timings]
+    assert set(names) == template_names(), (
+        "Убедитесь, что компилируются шаблоны из `templates/` "
+        "и из каталогов приложений."
+    )
+    assert len(names) == len(set(names))
+    assert all(seconds >= 0 for _, seconds in timings)
+    assert [seconds for _, seconds in timings] == sorted(
+        (seconds for _, seconds in timings), reverse=True
+    ), "Убедитесь, что шаблоны отсортированы от самых медленных."
+
+
+def test_syntax_error_is_logged_and_skipped(tmp_path, settings, caplog):
+    (tmp_path / "broken.html").write_text("{% if %}")
+    (tmp_path / "fine.txt").write_text("{{ value }}")
+    with_template_dir(settings, tmp_path)
+    with caplog.at_level("WARNING", logger="blogicum.templating"):
+        names = [name for name, _ in precompile_templates()]
+    assert "broken.html" not in names
+    assert "fine.txt" in names
+    assert any("broken.html" in record.getMessage()
+               for record in caplog.records), (
+        "Убедитесь, что шаблон с ошибкой попадает в лог."
+    )
+
+
+def test_warm_templates_logs_slowest(caplog):
+    with caplog.at_level("INFO", logger="blogicum.templating"):
+        timings = warm_templates(limit=3)
+    messages = [record.getMessage() for record in caplog.records]
+    assert messages[0].startswith(f"Скомпилировано шаблонов: {len(timings)}")
+    assert len(messages) == 4
+    assert timings[0][0] in messages[1]
+
+
+def test_compile_templates_command():
+    out = StringIO()
+    call_command("compile_templates", "--limit", "2", stdout=out)
+    lines = out.getvalue().splitlines()
+    assert len(lines) == 3
+    assert lines[-1].startswith(f"Шаблонов: {len(template_names())},")
@@ -0,0 +1,101 @@
+import multiprocessing
+
+import pytest
+from django.core.cache import caches
+
+from blogicum.cache import L1Store, LockedFileBasedCache, TieredCache
+
+OPTIONS = {"GENERATION_CHECK_INTERVAL": 0, "L1_TIMEOUT": 60}
+
+
+@pytest.fixture
+def worker():
+    """Кеш отдельного воркера: свой L1 перед общим L2."""
+
+    def make():
+        cache = TieredCache("shared", {"OPTIONS": OPTIONS})
+        cache.l1 = L1Store(max_entries=100, max_bytes=10_000)
+        return cache
+
+    return make
+
+
+def test_l1_serves_without_l2(worker):
+    cache = worker()
+    cache.set("key", "value")
+    caches["shared"].set(cache.make_key("key"), "changed in L2")
+    assert cache.get("key") == "value", (
+        "Убедитесь, что значения читаются из L1 без обращения к L2."
+    )
+
+
+def test_delete_reaches_other_workers(worker):
+    first, second = worker(), worker()
+    first.set("key", "value")
+    assert second.get("key") == "value"
+    first.delete("key")
+    assert second.get("key") is None, (
+        "Убедитесь, что удаление доходит до L1 других процессов."
+    )
+    second.set("other", 1)
+    first.delete("missing")
+    second.delete("third")
+    assert second.get("other") == 1, (
+        "Убедитесь, что по журналу удалений L1 очищается выборочно."
+    )
+
+
+def test_l1_size_accounting():
+    store = L1Store(max_entries=2, max_bytes=100)
+    store.set("a", b"x" * 40, 60)
+    store.set("b", b"x" * 40, 60)
+    store.get("a")
+    store.set("c", b"x" * 40, 60)
+    assert set(store.entries) == {"a", "c"}
+    assert store.bytes == 80
+    store.set("huge", b"x" * 200, 60)
+    assert "huge" not in store.entries
+
+
+def test_named_generations(worker):
+    first, second = worker(), worker()
+    before = second.generations("category:1", "author:2")
+    first.bump("category:1")
+    after = second.generations("category:1", "author:2")
+    assert after[0] != before[0]
+    assert after[1] == before[1]
+
+
+def test_named_generations_are_bounded(worker):
+    cache = worker()
+    cache.l1 = L1Store(max_entries=2, max_bytes=10_000)
+    first = cache.generations("post:1", "post:2")
+    cache.generations("post:3")
+    cache.bump("post:4")
+    assert list(cache.l1.named) == ["post:3", "post:4"], (
+        "Убедитесь, что число запомненных поколений ограничено."
+    )
+    assert cache.generations("post:1", "post:2") == first
+
+
+def hammer(directory):
+    cache = LockedFileBasedCache(directory, {})
+    for _ in range(50):
+        cache.incr("counter")
+    return cache.add("lease", True, 10)
+
+
+def test_locked_file_cache_is_atomic(tmp_path):
+    cache = LockedFileBasedCache(str(tmp_path), {})
+    cache.set("counter", 0)
+    with multiprocessing.get_context("fork").Pool(4) as pool:
+        added = pool.map(hammer, [str(tmp_path)] * 4)
+    assert cache.get("counter") == 200, (
+        "Убедитесь, что incr() файлового кеша не теряет приращений "
+        "при одновременной работе процессов."
+    )
+    assert added.count(True) == 1, (
+        "Убедитесь, что add() файлового кеша удаётся только одному процессу."
+    )
+    cache.clear()
+    assert (tmp_path / LockedFileBasedCache.lock_name).exists()
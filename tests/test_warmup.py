@@ -0,0 +1,77 @@
+import os
+import subprocess
+import sys
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+from blog import views
+from blog.warmup import warmup
+from blogicum import metrics
+
+
+@pytest.mark.django_db
+def test_warmup_command(many_posts_with_published_locations):
+    out = StringIO()
+    call_command("warmup", "--pages", "2", stdout=out)
+    output = out.getvalue()
+    for step in ("urls", "templates", "lookups", "pages"):
+        assert step in output, (
+            f"Убедитесь, что команда `warmup` выполняет шаг `{step}`."
+        )
+
+
+@pytest.mark.django_db
+def test_warmup_survives_page_errors(
+    monkeypatch, caplog, many_posts_with_published_locations
+):
+    def broken(*args, **kwargs):
+        raise RuntimeError("сломанная страница")
+
+    monkeypatch.setattr(views.CategoryView, "get", broken)
+    key = ("blogicum_http_requests_total", (
+        ("view", "blog:index"), ("method", "GET"), ("status", "200"),
+    ))
+    before = metrics.registry.counters.get(key, 0)
+    with caplog.at_level("INFO", logger="blogicum.warmup"):
+        timings = warmup(pages=2)
+    assert "pages" in timings, (
+        "Убедитесь, что ошибка одной страницы не прерывает прогрев."
+    )
+    assert "сломанная страница" in caplog.text
+    assert "Прогрев завершён" in caplog.text
+    assert metrics.registry.counters.get(key, 0) == before, (
+        "Убедитесь, что запросы прогрева не попадают в метрики."
+    )
+
+
+def test_wsgi_warmup_keeps_admin_urls(tmp_path):
+    # Прогрев при импорте blogicum.urls до autodiscover админки
+    # оставлял admin.site.urls пустым до конца жизни процесса.
+    code = (
+        "import blogicum.wsgi\n"
+        "from django.urls import reverse\n"
+        "print(reverse('admin:blog_post_changelist'))\n"
+    )
+    env = {
+        **os.environ,
+        "BLOGICUM_WARMUP": "1",
+        "DJANGO_DB_NAME": str(tmp_path / "db.sqlite3"),
+        "DJANGO_SETTINGS_MODULE": "blogicum.settings",
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=settings.BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    assert "Прогрев завершён" in result.stderr, (
+        "Убедитесь, что WSGI-воркер прогревается при BLOGICUM_WARMUP=1."
+    )
+    assert result.stdout.strip() == "/admin/blog/post/", (
+        "Убедитесь, что прогрев при старте не ломает маршруты админки."
+    )